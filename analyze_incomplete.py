@@ -8,44 +8,47 @@ import re
 import sys
 from pathlib import Path
 import fitz  # PyMuPDF
-import pytesseract
-from PIL import Image
-import tempfile
 
-def extract_text_with_ocr(pdf_path, page_num):
-    """Extract text from a page using OCR"""
-    try:
-        doc = fitz.open(pdf_path)
-        if page_num >= len(doc):
-            return ""
-
-        page = doc[page_num]
-        # Full page at high resolution for better OCR
-        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
+from document_context import DocumentContext
+from ocr_engines import get_engine
+from text_backends import get_backend
+from text_cache import file_hash, get_default_cache, ocr_config
 
-        # Convert to PIL Image
-        img_data = pix.tobytes("png")
 
-        # Create temp file for OCR
-        temp_img = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-        temp_img.write(img_data)
-        temp_img.close()
+def _cached(pdf_path, page_num, config, compute):
+    """Run compute through the persistent text cache when it's enabled"""
+    cache = get_default_cache()
+    if cache is None:
+        return compute() or ""
+    return cache.get_or_compute(file_hash(pdf_path), page_num, config, compute) or ""
 
-        # Perform OCR
-        text = pytesseract.image_to_string(Image.open(temp_img.name))
+def extract_text_with_ocr(pdf_path, page_num):
+    """Extract text from a page using OCR (cached across runs)"""
+    # Same rendering as InfoSubProcessor's full-page OCR, so they share entries
+    return _cached(pdf_path, page_num, ocr_config("fitz", "x2", "gray"),
+                   lambda: _ocr_page(pdf_path, page_num))
 
-        # Cleanup
-        os.unlink(temp_img.name)
-        doc.close()
+def _ocr_page(pdf_path, page_num):
+    """OCR one page, None on failure"""
+    try:
+        with DocumentContext(pdf_path, use_cache=False) as context:
+            if page_num >= context.page_count:
+                return ""
 
-        return text
+            # Full page at high resolution for better OCR, straight from the pixmap
+            return get_engine().image_to_string(context.render_page(page_num, zoom=2))
 
     except Exception as e:
         print(f"OCR error on page {page_num}: {e}")
-        return ""
+        return None
 
 def extract_regular_text(pdf_path, page_num):
-    """Extract regular text from PDF"""
+    """Extract regular text from PDF (cached across runs)"""
+    return _cached(pdf_path, page_num, get_backend("pymupdf").cache_config(),
+                   lambda: _page_text(pdf_path, page_num))
+
+def _page_text(pdf_path, page_num):
+    """PyMuPDF text for one page, None on failure"""
     try:
         doc = fitz.open(pdf_path)
         if page_num >= len(doc):
@@ -58,7 +61,7 @@ def extract_regular_text(pdf_path, page_num):
 
     except Exception as e:
         print(f"Text extraction error on page {page_num}: {e}")
-        return ""
+        return None
 
 def find_potential_file_numbers(text):
     """Look for potential file number patterns"""
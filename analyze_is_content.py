@@ -6,6 +6,9 @@ import pdfplumber
 from pathlib import Path
 import re
 
+from document_context import DocumentContext
+from page_classifier import PAGE_BLANK, PAGE_SCANNED
+
 def analyze_is_content():
     """Analyze the content of the IS PDF to find markers"""
 
@@ -59,19 +62,18 @@ def analyze_is_content():
                     if match:
                         print(f"📋 Found index number: {match.group()}")
 
-        # Check if document is scanned (no text)
-        print("\n\nChecking if document is scanned...")
-        empty_pages = 0
-        for i, page in enumerate(pdf.pages):
-            text = page.extract_text() or ""
-            if len(text.strip()) < 50:
-                empty_pages += 1
+    # Check if document is scanned (no text layer), page by page
+    print("\n\nChecking if document is scanned...")
+    with DocumentContext(input_file) as context:
+        page_types = context.page_types
+    scanned_pages = page_types.count(PAGE_SCANNED)
+    blank_pages = page_types.count(PAGE_BLANK)
+    text_pages = len(page_types) - scanned_pages - blank_pages
 
-        if empty_pages > len(pdf.pages) / 2:
-            print(f"⚠️ Document appears to be scanned ({empty_pages}/{len(pdf.pages)} pages have no text)")
-            print("OCR may be needed for proper processing")
-        else:
-            print(f"✅ Document has text ({len(pdf.pages) - empty_pages}/{len(pdf.pages)} pages have text)")
+    if scanned_pages:
+        print(f"⚠️ {scanned_pages}/{len(page_types)} pages are scanned images with no text layer")
+        print("OCR may be needed for proper processing")
+    print(f"✅ {text_pages}/{len(page_types)} pages have a text layer, {blank_pages} blank")
 
 if __name__ == "__main__":
     analyze_is_content()
\ No newline at end of file
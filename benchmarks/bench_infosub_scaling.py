@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+InfoSubProcessor scaling benchmark
+Shows process_pdf time per page staying flat as the batch grows, now that the
+blank-page map comes from boundary detection instead of reopening the PDF
+with pdfplumber for every page written
+"""
+
+import argparse
+import logging
+import tempfile
+from pathlib import Path
+
+import pdfplumber
+
+from bench_utils import build_batch, timed
+from infosub_processor import InfoSubProcessor
+
+
+def legacy_blank_check(pdf_path: Path, processor: InfoSubProcessor) -> int:
+    """Old write-loop behaviour: reopen the file to test each page for blankness"""
+    with pdfplumber.open(pdf_path) as pdf:
+        total_pages = len(pdf.pages)
+
+    blank = 0
+    for page_num in range(total_pages):
+        with pdfplumber.open(pdf_path) as pdf:
+            page_text = pdf.pages[page_num].extract_text() or ""
+            if processor.is_blank_page(page_text):
+                blank += 1
+    return blank
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark InfoSubProcessor scaling on text-layer IS batches')
+    parser.add_argument('--sizes', default='50,100,200,300',
+                       help='Comma separated batch sizes in pages (default: 50,100,200,300)')
+    parser.add_argument('--legacy', action='store_true',
+                       help='Also time the old per-page pdfplumber reopen blank check')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    print(f"{'pages':>6} {'process_pdf s':>14} {'ms/page':>8}" + (f" {'legacy blank s':>15}" if args.legacy else ""))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in sizes:
+            batch = build_batch('is_text', size, Path(temp_dir) / f"is_batch_{size}.pdf")
+            processor = InfoSubProcessor(output_dir=str(Path(temp_dir) / f"out_{size}"))
+            _, elapsed = timed(processor.process_pdf, str(batch))
+
+            line = f"{size:>6} {elapsed:>14.2f} {elapsed / size * 1000:>8.1f}"
+            if args.legacy:
+                _, legacy_elapsed = timed(legacy_blank_check, batch, processor)
+                line += f" {legacy_elapsed:>15.2f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Keyword classification benchmark
+Pages/sec for the per-page keyword decisions (IS detector scores, document
+type, jurisdiction, priority, IS start/continuation/blank markers): each
+decision case-folding the page and running its own substring checks, the way
+the classifiers used to, against one scan of the shared keyword automaton
+per page with every decision read from the hit vector. Both scanner backends
+are timed when pyahocorasick is installed, and with --extra the tables grow
+by that many (absent) keywords to show how each approach scales.
+"""
+
+import argparse
+import logging
+import random
+import string
+
+from bench_utils import sample_pdfs, timed
+from document_context import DocumentContext
+import keyword_scanner as kw
+from keyword_scanner import KeywordScanner, _ahocorasick_available
+
+
+def page_texts(kinds):
+    texts = []
+    for kind in kinds:
+        for pdf_path in sample_pdfs(kind):
+            with DocumentContext(pdf_path, use_cache=False) as context:
+                texts.extend(context.get_page_text(i) for i in range(context.page_count))
+    return texts
+
+
+def substring_decisions(text: str, extra=()):
+    """Every decision with its own case folding and `in` checks"""
+    scores = [sum(pattern in text for pattern in table)
+              for table in (kw.IS_TITLE, kw.IS_SECONDARY, kw.LTD_INDICATORS)]
+    text_lower = text.lower()
+    document_type = next((name for name, terms in kw.DOCUMENT_TYPE_TERMS
+                          if any(term in text_lower for term in terms)), None)
+    jurisdiction = [sum(term in text_lower for term in terms) for terms in kw.JURISDICTION_TERMS.values()]
+    priority = any(term in text_lower for term in kw.HIGH_PRIORITY_TERMS)
+    text_upper = text.strip().upper()
+    start = any(marker.upper() in text_upper for marker in kw.IS_START_MARKERS)
+    continuation = any(marker.upper() in text.upper() for marker in kw.IS_CONTINUATION_MARKERS)
+    blank = any(indicator in text.lower() for indicator in kw.BLANK_PAGE_INDICATORS)
+    routed = any(term in text.lower() for term in extra)
+    return scores, document_type, jurisdiction, priority, start, continuation, blank, routed
+
+
+def hit_vector_decisions(scanner: KeywordScanner, text: str, extra=()):
+    """Every decision from one scan"""
+    hits = scanner.scan(text)
+    scores = [sum(hits.has(pattern, case_sensitive=True) for pattern in table)
+              for table in (kw.IS_TITLE, kw.IS_SECONDARY, kw.LTD_INDICATORS)]
+    document_type = next((name for name, terms in kw.DOCUMENT_TYPE_TERMS if hits.any(terms)), None)
+    jurisdiction = [hits.count(terms) for terms in kw.JURISDICTION_TERMS.values()]
+    return (scores, document_type, jurisdiction, hits.any(kw.HIGH_PRIORITY_TERMS), hits.any(kw.IS_START_MARKERS),
+            hits.any(kw.IS_CONTINUATION_MARKERS), hits.any(kw.BLANK_PAGE_INDICATORS), hits.any(extra))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark keyword classification')
+    parser.add_argument('--kinds', default='is_text', help='Comma separated sample sets (default: is_text)')
+    parser.add_argument('--repeat', type=int, default=20, help='Passes over the pages (default: 20)')
+    parser.add_argument('--extra', default='0,200,1000',
+                        help='Comma separated counts of keywords to add to the tables (default: 0,200,1000)')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    texts = page_texts(args.kinds.split(','))
+    if not texts:
+        print("No sample PDFs found")
+        return
+    # Fresh strings each pass, so the scanner's same-text shortcut doesn't count
+    passes = [[text.encode().decode() for text in texts] for _ in range(args.repeat)]
+    scans = len(texts) * args.repeat
+    print(f"{len(texts)} pages, {sum(map(len, texts)) // len(texts)} chars/page, "
+          f"{len(kw.KEYWORDS.keywords)} keywords, {args.repeat} passes\n")
+    backends = ['ahocorasick', 'find'] if _ahocorasick_available() else ['find']
+    print(f"{'extra':>6}  {'substring pages/s':>17}  " + "  ".join(f"{backend + ' pages/s':>19}" for backend in backends))
+
+    rng = random.Random(0)
+    for count in map(int, args.extra.split(',')):
+        # Lower-case letters and digits, so they never occur in the samples
+        extra = [''.join(rng.choices(string.ascii_lowercase, k=6)) + str(rng.randrange(10 ** 6))
+                 for _ in range(count)]
+        expected, seconds = timed(lambda: [substring_decisions(text, extra) for page in passes for text in page])
+        columns = []
+        for backend in backends:
+            scanner = KeywordScanner(kw.KEYWORDS.keywords | set(extra), backend)
+            actual, backend_seconds = timed(lambda: [hit_vector_decisions(scanner, text, extra)
+                                                     for page in passes for text in page])
+            assert actual == expected, f"{backend} disagrees with the substring checks"
+            columns.append(f"{scans / backend_seconds:>10,.0f} ({seconds / backend_seconds:>4.1f}x)")
+        print(f"{count:>6}  {scans / seconds:>17,.0f}  " + "  ".join(f"{column:>19}" for column in columns))
+
+if __name__ == "__main__":
+    main()
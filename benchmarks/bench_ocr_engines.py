@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+OCR engine benchmark
+OCRs the same region crops from the scanned IS samples with every installed
+engine and reports crops/sec, plus how often each engine's text matches the
+first engine's. Region crops are where per-call process start and model load
+dominate, so that's what's measured.
+"""
+
+import argparse
+import logging
+
+from bench_utils import sample_pdfs, timed
+from document_context import DocumentContext
+from ocr_engines import available_engines, get_engine
+from page_regions import REGIONS, get_regions
+
+
+def render_crops(num_crops: int):
+    """Start-marker and top-third crops rendered the way the processors render them"""
+    crops = []
+    regions = [(1.5, get_regions('IS', 'start_marker')[0]), (2, REGIONS['top_third'])]
+    while len(crops) < num_crops:
+        for pdf_path in sample_pdfs('is_scanned'):
+            with DocumentContext(pdf_path, use_cache=False) as context:
+                for page_num in range(min(2, context.page_count)):
+                    for zoom, region in regions:
+                        crops.append(context.render_page(page_num, zoom=zoom, region=region))
+                        if len(crops) == num_crops:
+                            return crops
+    return crops
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark OCR engines on region crops')
+    parser.add_argument('--crops', type=int, default=40,
+                       help='Number of crops to OCR per engine (default: 40)')
+    parser.add_argument('--config', default='--psm 6 --oem 1',
+                       help='Tesseract options for every call (default: "--psm 6 --oem 1")')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    crops = render_crops(args.crops)
+    print(f"{len(crops)} crops, config {args.config!r}\n")
+    print(f"{'engine':>10}  {'version':>8}  {'seconds':>7}  {'crops/s':>7}  {'same text':>9}")
+
+    reference = None
+    for name in available_engines():
+        engine = get_engine(name)
+        try:
+            # First call loads the model; measure steady state
+            engine.image_to_string(crops[0], config=args.config)
+            texts, seconds = timed(lambda: [engine.image_to_string(crop, config=args.config)
+                                            for crop in crops])
+        except Exception as e:
+            print(f"{name:>10}  unavailable: {e}")
+            continue
+        reference = reference or texts
+        same = sum(a.strip() == b.strip() for a, b in zip(texts, reference))
+        print(f"{name:>10}  {engine.version():>8}  {seconds:>7.2f}  {len(crops) / seconds:>7.1f}  "
+              f"{same:>4}/{len(crops)}")
+
+
+if __name__ == "__main__":
+    main()
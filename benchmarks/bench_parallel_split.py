@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Parallel split benchmark
+Times split_pdf on an LTD batch with 1..N extraction workers and checks the
+documents match the serial run. Speed-up is bounded by the cores available.
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from bench_utils import build_unique_batch, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark split_pdf with a process pool')
+    parser.add_argument('--pages', type=int, default=1000,
+                       help='LTD batch size in pages (default: 1000)')
+    parser.add_argument('--workers', default='1,2,4,8,16',
+                       help='Comma separated worker counts (default: 1,2,4,8,16)')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    # Measure extraction, not cache lookups
+    os.environ['MAILROOM_CACHE'] = '0'
+    from pdf_splitter import PDFSplitter
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        batch = build_unique_batch(args.pages, temp_dir / "ltd_batch.pdf", image_px=0)
+
+        print(f"{args.pages}-page LTD batch, {os.cpu_count()} CPUs\n")
+        print(f"{'workers':>7}  {'docs':>5}  {'seconds':>7}  {'pages/s':>7}  {'speed-up':>8}  {'same':>4}")
+        baseline = None
+        for workers in (int(n) for n in args.workers.split(',')):
+            splitter = PDFSplitter(output_dir=str(temp_dir / f"out_{workers}"))
+            with contextlib.redirect_stdout(io.StringIO()):
+                docs, seconds = timed(splitter.split_pdf, str(batch), workers=workers)
+            docs = [(doc['output_file'], doc['pages']) for doc in docs]
+            if baseline is None:
+                baseline = (docs, seconds)
+            print(f"{workers:>7}  {len(docs):>5}  {seconds:>7.2f}  {args.pages / seconds:>7.1f}  "
+                  f"{baseline[1] / seconds:>7.2f}x  {'yes' if docs == baseline[0] else 'NO':>4}")
+
+
+if __name__ == "__main__":
+    main()
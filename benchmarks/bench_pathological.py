@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Pathological OCR text benchmark
+Milliseconds per page for every extraction pattern (all file number sets,
+the splitter's debtor/address/file number lookups, the IS index and file
+number lookups, the IS attorney check) on pages of OCR garbage built to
+make a backtracking engine go quadratic or worse: label words repeated
+without the value that completes them, one endless line, noise. Each shape
+is timed at growing page sizes on re and, when google-re2 is installed, on
+RE2 (see regex_engine), checking both extract the same values. With RE2
+the time per page should grow with the page size, not its square; the
+default sizes are small because re already takes seconds at 8000.
+"""
+
+import argparse
+import logging
+import random
+import re
+import string
+import tempfile
+
+from bench_utils import timed
+import regex_engine
+import rule_profiler
+from file_number_patterns import PATTERN_SETS
+from infosub_processor import InfoSubProcessor
+from is_postprocessor import ATTORNEY_PATTERNS
+from pdf_splitter import PDFSplitter
+
+
+def repeat_to(unit: str, size: int) -> str:
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def noise(size: int) -> str:
+    rng = random.Random(size)
+    alphabet = string.ascii_letters + string.digits + string.punctuation + " " * 10 + "\n"
+    return "".join(rng.choices(alphabet, k=size))
+
+
+# Page shape -> text of a given size
+SHAPES = {
+    # "Attorney.*Creditor" and "Attorn.*for.*Creditor" without a Creditor
+    'attorney': lambda size: repeat_to("Attorney for ", size),
+    # Debtor/address lookups on one line with no end
+    'to_line': lambda size: repeat_to("To: Re: Debtor: x ", size),
+    # File number and index labels without their values
+    'labels': lambda size: repeat_to("Our File Number: File No. Index No. Case No. #", size),
+    'noise': noise,
+}
+
+
+def extract_page(splitter: PDFSplitter, infosub: InfoSubProcessor, text: str):
+    """Every pattern lookup the extractors make on a page"""
+    values = [pattern_set.scan(text) for pattern_set in PATTERN_SETS.values()]
+    values += [splitter.extract_file_number(text), splitter.extract_debtor_name(text),
+               splitter.extract_address(text)]
+    values += [infosub.extract_file_number(text), infosub.extract_index_number(text)]
+    values += [bool(rule_profiler.search(f'is_attorney.{i}', pattern, text, re.IGNORECASE | re.DOTALL))
+               for i, pattern in enumerate(ATTORNEY_PATTERNS)]
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark extraction on pathological OCR text')
+    parser.add_argument('--sizes', default='2000,4000,8000',
+                        help='Comma separated page sizes in characters (default: 2000,4000,8000)')
+    parser.add_argument('--shapes', default=','.join(SHAPES),
+                        help=f'Comma separated page shapes (default: {",".join(SHAPES)})')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        splitter = PDFSplitter(output_dir=temp_dir)
+        infosub = InfoSubProcessor(output_dir=temp_dir)
+        engines = regex_engine.available_engines()
+        print(f"{'shape':<10} {'chars':>7}  " + "  ".join(f"{engine + ' ms/page':>14}" for engine in engines))
+        for shape in args.shapes.split(','):
+            for size in map(int, args.sizes.split(',')):
+                text = SHAPES[shape](size)
+                columns, results = [], []
+                for engine in engines:
+                    regex_engine.set_engine(engine)
+                    extract_page(splitter, infosub, text[:100])  # Compile outside the timing
+                    values, seconds = timed(extract_page, splitter, infosub, text)
+                    results.append(values)
+                    columns.append(f"{seconds * 1e3:>14,.1f}")
+                assert all(values == results[0] for values in results), f"engines disagree on {shape}"
+                print(f"{shape:<10} {size:>7}  " + "  ".join(columns))
+        regex_engine.set_engine('re')
+
+
+if __name__ == "__main__":
+    main()
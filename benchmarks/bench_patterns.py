@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+File number pattern benchmark
+Scans/sec per pattern set on the text of the IS samples: one scan of the
+set's compiled alternation against one re.search per pattern, the way the
+extractors used to look file numbers up. Also checks both ways find the same
+best candidate on every page.
+"""
+
+import argparse
+import logging
+import re
+
+from bench_utils import sample_pdfs, timed
+from document_context import DocumentContext
+from file_number_patterns import PATTERN_SETS
+
+
+def page_texts(kind: str):
+    with_text = []
+    for pdf_path in sample_pdfs(kind):
+        with DocumentContext(pdf_path, use_cache=False) as context:
+            with_text.extend(context.get_page_text(i) for i in range(context.page_count))
+    return with_text
+
+
+def search_each(pattern_set, text: str):
+    """First match of the first pattern that matches (the old lookup)"""
+    for _, regex in pattern_set:
+        match = re.search(regex, text, pattern_set.flags)
+        if match:
+            return match.group(1)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark file number pattern scans')
+    parser.add_argument('--kind', default='is_text', help='Sample set to read page text from (default: is_text)')
+    parser.add_argument('--repeat', type=int, default=20, help='Passes over the pages (default: 20)')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    texts = page_texts(args.kind)
+    if not texts:
+        print("No sample PDFs found")
+        return
+    print(f"{len(texts)} pages, {sum(map(len, texts)) // len(texts)} chars/page, {args.repeat} passes\n")
+    print(f"{'set':>13}  {'patterns':>8}  {'search scans/s':>14}  {'set scans/s':>11}  {'speedup':>7}  {'same':>5}")
+
+    scans = len(texts) * args.repeat
+    for name, pattern_set in PATTERN_SETS.items():
+        _, search_seconds = timed(lambda: [search_each(pattern_set, text)
+                                           for _ in range(args.repeat) for text in texts])
+        _, set_seconds = timed(lambda: [pattern_set.scan(text) for _ in range(args.repeat) for text in texts])
+        same = all(search_each(pattern_set, text) == next((c.value for c in pattern_set.scan(text)), None)
+                   for text in texts)
+        print(f"{name:>13}  {len(pattern_set):>8}  {scans / search_seconds:>14,.0f}  {scans / set_seconds:>11,.0f}  "
+              f"{search_seconds / set_seconds:>6.1f}x  {'yes' if same else 'no':>5}")
+
+
+if __name__ == "__main__":
+    main()
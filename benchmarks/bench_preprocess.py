@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+OCR preprocessing benchmark
+Times the PIL filter chains the extractors and trainers used against the
+NumPy steps in image_preprocess, in ms/page on 300 dpi renders of the
+scanned IS samples, and one stacked call against a loop over region crops.
+"""
+
+import argparse
+import logging
+
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+
+from bench_utils import sample_pdfs, timed
+from document_context import DocumentContext
+from image_preprocess import preprocessor, stack
+from page_regions import REGIONS
+
+
+def _aggressive(image):
+    if image.width < 2000:
+        image = image.resize((2000, int(image.height * 2000 / image.width)), Image.Resampling.LANCZOS)
+    image = image.point(lambda p: p > 128 and 255)
+    image = image.filter(ImageFilter.MedianFilter(size=3))
+    image = ImageEnhance.Contrast(image).enhance(3.0)
+    return image.filter(ImageFilter.SHARPEN)
+
+
+# (name, PIL chain as the call sites had it, equivalent step chain)
+CHAINS = [
+    ("fast contrast", lambda image: ImageEnhance.Contrast(image).enhance(2.0), "contrast"),
+    ("enhance", lambda image: ImageOps.autocontrast(image, cutoff=1).filter(ImageFilter.SHARPEN), "enhance"),
+    ("trainer enhanced", lambda image: ImageEnhance.Contrast(image.filter(ImageFilter.MedianFilter(size=3)))
+     .enhance(2.5).filter(ImageFilter.SHARPEN), "median+contrast:2.5+sharpen"),
+    ("trainer aggressive", _aggressive, "upscale:2000+binarize:128+median+contrast:3+sharpen"),
+    ("tuner heavy", lambda image: ImageEnhance.Brightness(ImageEnhance.Contrast(
+        image.filter(ImageFilter.MedianFilter(size=3))).enhance(2.5).filter(ImageFilter.SHARPEN)).enhance(1.2),
+     "median+contrast:2.5+sharpen+brightness:1.2"),
+]
+
+
+def render(num_pages: int, zoom: float, region=None):
+    """Grayscale renders of the scanned IS samples, repeated up to num_pages"""
+    images = []
+    while len(images) < num_pages:
+        for pdf_path in sample_pdfs('is_scanned'):
+            with DocumentContext(pdf_path, use_cache=False) as context:
+                for page_num in range(context.page_count):
+                    images.append(context.render_page(page_num, zoom=zoom, region=region))
+                    if len(images) == num_pages:
+                        return images
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PIL vs NumPy OCR preprocessing')
+    parser.add_argument('--pages', type=int, default=8, help='300 dpi pages per chain (default: 8)')
+    parser.add_argument('--crops', type=int, default=64, help='Top-third crops for the batch run (default: 64)')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    pages = render(args.pages, 300 / 72)
+    print(f"{len(pages)} pages at 300 dpi ({pages[0].width}x{pages[0].height})\n")
+    print(f"{'chain':>20}  {'PIL ms/page':>11}  {'NumPy ms/page':>13}  {'speedup':>7}  {'same':>5}")
+    for name, pil_chain, spec in CHAINS:
+        process = preprocessor(spec)
+        expected, pil_seconds = timed(lambda: [pil_chain(page) for page in pages])
+        actual, np_seconds = timed(lambda: [process(page) for page in pages])
+        same = all(a.tobytes() == b.tobytes() for a, b in zip(expected, actual))
+        print(f"{name:>20}  {pil_seconds / len(pages) * 1000:>11.1f}  {np_seconds / len(pages) * 1000:>13.1f}  "
+              f"{pil_seconds / np_seconds:>6.1f}x  {'yes' if same else 'no':>5}")
+
+    # Same-sized region crops: loop vs one (N, H, W) call
+    crops = render(args.crops, 1.5, REGIONS['top_third'])
+    process = preprocessor("autocontrast:1+median+otsu")
+    _, loop_seconds = timed(lambda: [process(np.asarray(crop)) for crop in crops])
+    batch = stack(crops)
+    _, batch_seconds = timed(lambda: process(batch))
+    print(f"\n{len(crops)} top-third crops, autocontrast+median+otsu: "
+          f"loop {loop_seconds / len(crops) * 1000:.2f} ms/crop, "
+          f"stacked {batch_seconds / len(crops) * 1000:.2f} ms/crop")
+
+
+if __name__ == "__main__":
+    main()
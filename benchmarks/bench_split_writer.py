@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Split writer benchmark
+Writes the same split with a PyPDF2 PdfWriter per document (the previous
+approach) and with split_writer.write_splits, and reports output throughput.
+Page counts of every output are checked against the split jobs.
+"""
+
+import argparse
+import logging
+import tempfile
+from pathlib import Path
+
+import fitz  # PyMuPDF
+from PyPDF2 import PdfReader, PdfWriter
+
+from bench_utils import build_batch, build_unique_batch, timed
+from split_writer import write_splits
+
+
+def split_pypdf2(batch: Path, jobs):
+    """One PdfReader, one PdfWriter per output document"""
+    with open(batch, 'rb') as f:
+        reader = PdfReader(f)
+        for pages, output_path in jobs:
+            writer = PdfWriter()
+            for page_num in pages:
+                writer.add_page(reader.pages[page_num])
+            with open(output_path, 'wb') as out:
+                writer.write(out)
+
+
+def chunk_jobs(num_pages: int, pages_per_doc: int, output_dir: Path):
+    """Fixed-size split jobs writing into output_dir"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return [(range(start, min(start + pages_per_doc, num_pages)), output_dir / f"doc_{start:05d}.pdf")
+            for start in range(0, num_pages, pages_per_doc)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PyPDF2 vs grafted split writing')
+    parser.add_argument('--is-pages', type=int, default=1001,
+                       help='IS batch size in pages, split every 7 (default: 1001)')
+    parser.add_argument('--ltd-pages', type=int, default=1000,
+                       help='LTD batch size in pages, split every 2 (default: 1000)')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        batches = [
+            ('IS', build_batch('is_text', args.is_pages, temp_dir / "is_batch.pdf"), args.is_pages, 7),
+            ('LTD', build_unique_batch(args.ltd_pages, temp_dir / "ltd_batch.pdf"), args.ltd_pages, 2),
+        ]
+
+        print(f"{'batch':>5}  {'input MB':>8}  {'writer':>7}  {'docs':>5}  {'seconds':>7}  {'MB/s':>7}  {'same':>4}")
+        for name, batch, num_pages, pages_per_doc in batches:
+            input_mb = batch.stat().st_size / 1024 / 1024
+            for writer, split in (('pypdf2', split_pypdf2), ('graft', write_splits)):
+                jobs = chunk_jobs(num_pages, pages_per_doc, temp_dir / f"{name}_{writer}")
+                _, seconds = timed(split, batch, jobs)
+                output_mb = sum(path.stat().st_size for _, path in jobs) / 1024 / 1024
+                counts = [fitz.open(str(path)).page_count for _, path in jobs]
+                same = counts == [len(pages) for pages, _ in jobs]
+                print(f"{name:>5}  {input_mb:>8.1f}  {writer:>7}  {len(jobs):>5}  {seconds:>7.2f}  "
+                      f"{output_mb / seconds:>7.1f}  {'yes' if same else 'NO':>4}")
+
+
+if __name__ == "__main__":
+    main()
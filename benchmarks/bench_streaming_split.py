@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Streaming split memory benchmark
+Splits the same batch with split_pdf and iter_split_pdf, each in a fresh
+process, and reports peak resident memory next to the input size. Streaming
+should stay roughly flat as the batch grows; split_pdf grows with the file.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_utils import build_unique_batch
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process
+
+    VmHWM is reset on exec; ru_maxrss is not, so on Linux it would report the
+    parent's peak from building the batch.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def run_child(mode: str, batch: str, output_dir: str):
+    """Split once and print documents, seconds and peak RSS as JSON"""
+    logging.disable(logging.WARNING)
+    from pdf_splitter import PDFSplitter
+
+    splitter = PDFSplitter(output_dir=output_dir)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'stream':
+            documents = sum(1 for _ in splitter.iter_split_pdf(batch))
+        else:
+            documents = len(splitter.split_pdf(batch))
+    seconds = time.perf_counter() - start
+    print(json.dumps({'documents': documents, 'seconds': seconds, 'peak_mb': peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark peak memory of streaming vs batch splitting')
+    parser.add_argument('--pages', default='200,400,800',
+                       help='Comma separated batch sizes in pages (default: 200,400,800)')
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'BATCH', 'OUTPUT'),
+                       help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    # Measure extraction, not cache lookups
+    env = dict(os.environ, MAILROOM_CACHE='0')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        print(f"{'pages':>5}  {'input MB':>8}  {'mode':>6}  {'docs':>5}  {'seconds':>7}  {'peak MB':>7}")
+        for num_pages in (int(n) for n in args.pages.split(',')):
+            batch = build_unique_batch(num_pages, temp_dir / f"batch_{num_pages}.pdf")
+            input_mb = batch.stat().st_size / 1024 / 1024
+            for mode in ('batch', 'stream'):
+                output_dir = temp_dir / f"{mode}_{num_pages}"
+                result = subprocess.run(
+                    [sys.executable, __file__, '--child', mode, str(batch), str(output_dir)],
+                    env=env, capture_output=True, text=True, check=True
+                )
+                stats = json.loads(result.stdout.strip().splitlines()[-1])
+                print(f"{num_pages:>5}  {input_mb:>8.1f}  {mode:>6}  {stats['documents']:>5}  "
+                      f"{stats['seconds']:>7.2f}  {stats['peak_mb']:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
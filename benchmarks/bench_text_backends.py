@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Text extraction backend benchmark
+Reports pages/sec per backend and how often each backend's text yields the
+same IS file number as the pdfplumber reference and the known file number
+"""
+
+import argparse
+import logging
+import re
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from bench_utils import SAMPLE_DIRS, sample_pdfs, timed
+from document_context import DocumentContext
+from ocr_test_and_tune import OCRTester
+from pdf_splitter import PDFSplitter
+from text_backends import DEFAULT_BACKEND, available_backends
+
+
+def expected_file_number(pdf_path: Path, ground_truth: Dict[str, str]) -> Optional[str]:
+    """Known file number: OCR ground truth, or the IS_<file number>.pdf name"""
+    if pdf_path.name in ground_truth:
+        return ground_truth[pdf_path.name]
+    match = re.match(r'IS_([A-Z0-9]+)\.pdf$', pdf_path.name)
+    return match.group(1) if match else None
+
+
+def extract_all(pdf_path: Path, backend: str) -> List[str]:
+    """Extract every page with a fresh context so nothing is cached"""
+    with DocumentContext(pdf_path, backend=backend, use_cache=False) as context:
+        return [context.get_page_text(i) for i in range(context.page_count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark text extraction backends')
+    parser.add_argument('--kinds', default='is_text,is_scanned',
+                       help=f'Comma separated sample sets (choices: {", ".join(SAMPLE_DIRS)})')
+    parser.add_argument('--repeat', type=int, default=3,
+                       help='Timed passes per backend, best is reported (default: 3)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    pdfs = [path for kind in args.kinds.split(',') for path in sample_pdfs(kind)]
+    if not pdfs:
+        print("No sample PDFs found")
+        return
+
+    ground_truth = OCRTester().ground_truth
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Only the file-number helpers are used, nothing is written
+        splitter = PDFSplitter(output_dir=temp_dir)
+
+    results = {}
+    for backend in available_backends():
+        best = None
+        for _ in range(args.repeat):
+            texts, seconds = timed(lambda: {path: extract_all(path, backend) for path in pdfs})
+            best = seconds if best is None else min(best, seconds)
+        file_numbers = {path: splitter.extract_is_file_number(pages) for path, pages in texts.items()}
+        total_pages = sum(len(pages) for pages in texts.values())
+        results[backend] = (total_pages, best, file_numbers)
+
+    reference = results[DEFAULT_BACKEND][2]
+    print(f"{len(pdfs)} PDFs from {args.kinds}\n")
+    print(f"{'backend':>10}  {'pages':>5}  {'seconds':>7}  {'pages/s':>7}  "
+          f"{'agree ref':>9}  {'correct':>7}")
+    for backend, (total_pages, seconds, file_numbers) in results.items():
+        agree = sum(file_numbers[path] == reference[path] for path in pdfs)
+        correct = sum(file_numbers[path] == expected_file_number(path, ground_truth) for path in pdfs)
+        print(f"{backend:>10}  {total_pages:>5}  {seconds:>7.2f}  {total_pages / seconds:>7.1f}  "
+              f"{agree:>4}/{len(pdfs):<4}  {correct:>3}/{len(pdfs):<3}")
+
+
+if __name__ == "__main__":
+    main()
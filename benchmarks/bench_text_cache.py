@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Persistent text cache benchmark
+Runs the splitter, InfoSub processor and IS post-processor twice on the same
+batch against an empty cache file: the second (warm) run should skip text
+extraction entirely
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from bench_utils import build_batch, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold vs warm runs with the persistent text cache')
+    parser.add_argument('--pages', type=int, default=70,
+                       help='IS batch size in pages (default: 70)')
+    args = parser.parse_args()
+
+    # InfoSub logs a warning per incomplete document
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        # Must be set before the first DocumentContext opens the default cache
+        os.environ['MAILROOM_CACHE_PATH'] = str(temp_dir / "cache.sqlite")
+        from infosub_processor import InfoSubProcessor
+        from is_postprocessor import ISPostProcessor
+        from pdf_splitter import PDFSplitter
+        from text_cache import get_default_cache
+
+        batch = build_batch('is_text', args.pages, temp_dir / "batch.pdf")
+
+        runs = {
+            'PDFSplitter (IS)': lambda out: PDFSplitter(output_dir=out).split_pdf(str(batch), doc_type="IS"),
+            'InfoSubProcessor': lambda out: InfoSubProcessor(output_dir=out).process_pdf(str(batch)),
+            'ISPostProcessor': lambda out: ISPostProcessor().process_directory(
+                str(temp_dir / "PDFSplitter (IS)-cold"), validate_splits=True),
+        }
+
+        print(f"{args.pages}-page IS batch\n")
+        print(f"{'step':>18}  {'cold s':>7}  {'warm s':>7}  {'speedup':>7}")
+        for name, run in runs.items():
+            times = []
+            for label in ('cold', 'warm'):
+                out = str(temp_dir / f"{name}-{label}")
+                with contextlib.redirect_stdout(io.StringIO()):
+                    _, seconds = timed(run, out)
+                times.append(seconds)
+            print(f"{name:>18}  {times[0]:>7.2f}  {times[1]:>7.2f}  {times[0] / times[1]:>6.1f}x")
+
+        stats = get_default_cache().stats()
+        print(f"\nCache: {stats['entries']} entries, {stats['bytes'] / 1024:.0f} KB, "
+              f"{stats['hits']} hits / {stats['misses']} misses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""
+pytest setup: the suite gets its own text/OCR cache, so it never reads or
+writes the developer's ~/.cache/virtual_mailroom cache
+"""
+
+import os
+import tempfile
+
+_cache_dir = tempfile.TemporaryDirectory(prefix="mailroom_test_cache_")
+os.environ['MAILROOM_CACHE_PATH'] = os.path.join(_cache_dir.name, "text_cache.sqlite")
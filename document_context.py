@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Shared per-PDF Document Context
+Parses an input PDF once and caches per-page text/OCR results so the detector,
+splitters, post-processor and AI enrichment don't each reopen the file.
+Results are also written through to the persistent TextCache so repeat runs
+on the same PDF skip extraction and OCR.
+"""
+
+import logging
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PyPDF2 import PdfReader
+import pdfplumber
+
+import page_classifier
+from text_backends import DEFAULT_BACKEND, get_backend
+from text_cache import TextCache, file_hash, get_default_cache, region_key
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentContext:
+    """One parsed handle per input PDF with a lazily filled page text cache"""
+
+    def __init__(self, pdf_path, backend: str = DEFAULT_BACKEND,
+                 cache: Optional[TextCache] = None, use_cache: bool = True,
+                 orientation=None):
+        """
+        Args:
+            pdf_path: Input PDF
+            backend: Default text extraction backend (see text_backends)
+            cache: Persistent cache to use instead of the process default
+            use_cache: Set False to skip the persistent cache entirely
+            orientation: page_orientation.Orientation already known for the
+                         scans (e.g. from an earlier file of the same run)
+        """
+        self.pdf_path = Path(pdf_path)
+        # Default extractor for get_page_text; validated up front so a bad
+        # --text-backend value fails before any work is done
+        self.backend = get_backend(backend).name
+        self.cache = (cache or get_default_cache()) if use_cache else None
+        self._pdf_hash = None
+        self._page_count = None
+        self._reader = None
+        self._reader_file = None
+        self._plumber = None
+        self._fitz_doc = None
+
+        # (method, page_num) -> extracted text
+        self._text_cache: Dict[Tuple[str, int], str] = {}
+        # (method, page_num, bbox) -> region text
+        self._region_cache: Dict[Tuple[str, int, Tuple[float, ...]], str] = {}
+        # (page_num, quick_mode, config) -> OCR text
+        self._ocr_cache: Dict[Tuple[int, bool, str], str] = {}
+        # page_num -> page_classifier type
+        self._page_types: Dict[int, str] = {}
+
+        # Per-page blank flags, filled in by InfoSubProcessor boundary detection
+        self.blank_pages: Optional[List[bool]] = None
+
+        # Correction applied to every render (see detect_orientation); None
+        # until detected or given
+        self.orientation = orientation
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def reader(self) -> PdfReader:
+        """PyPDF2 reader, opened on first use"""
+        if self._reader is None:
+            # Given a path PdfReader loads the whole file into memory; a file
+            # handle lets it seek, so large batches aren't held twice
+            self._reader_file = open(self.pdf_path, 'rb')
+            self._reader = PdfReader(self._reader_file)
+        return self._reader
+
+    @property
+    def plumber(self):
+        """pdfplumber document, opened on first use"""
+        if self._plumber is None:
+            self._plumber = pdfplumber.open(str(self.pdf_path))
+        return self._plumber
+
+    @property
+    def fitz_doc(self):
+        """PyMuPDF document for OCR rendering and the pymupdf backend, opened on first use"""
+        if self._fitz_doc is None:
+            import fitz  # PyMuPDF is only needed for OCR / the pymupdf backend
+            self._fitz_doc = fitz.open(str(self.pdf_path))
+        return self._fitz_doc
+
+    def render_page(self, page_num: int, zoom: float = 2.0,
+                    region: Optional[Tuple[float, float, float, float]] = None,
+                    correct: bool = True):
+        """
+        Render a page to a grayscale PIL image for OCR
+
+        The image wraps the pixmap samples directly: no PNG encode/decode and
+        no temp file, and the fitz document stays open between pages.
+
+        Args:
+            page_num: Page number (0-indexed)
+            zoom: Scale from PDF points (2.0 renders at 144 dpi)
+            region: Fractional (x0, top, x1, bottom) bbox to render instead of
+                    the full page, in the straightened page's coordinates
+            correct: Apply the context's orientation correction, if any
+
+        Returns:
+            PIL Image in mode 'L'
+        """
+        if correct and self.orientation is not None and not self.orientation.upright:
+            # The region is only known on the straightened page: render the
+            # whole page, straighten it, then crop
+            image = self.orientation.apply(self.render_page(page_num, zoom, correct=False))
+            if region is None:
+                return image
+            x0, top, x1, bottom = region
+            return image.crop((round(x0 * image.width), round(top * image.height),
+                               round(x1 * image.width), round(bottom * image.height)))
+
+        import fitz
+        from PIL import Image
+
+        page = self.fitz_doc[page_num]
+        clip = None
+        if region is not None:
+            rect = page.rect
+            x0, top, x1, bottom = region
+            clip = fitz.Rect(x0 * rect.width, top * rect.height,
+                             x1 * rect.width, bottom * rect.height)
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, colorspace=fitz.csGRAY)
+        return Image.frombuffer('L', (pix.width, pix.height), pix.samples, 'raw', 'L', pix.stride, 1)
+
+    def detect_orientation(self, pages: List[int], engine: Optional[str] = None):
+        """
+        Work out once how this file's scans are rotated and skewed
+
+        Later renders (and OCR pool workers) apply the correction, so one
+        crooked scanner run doesn't send every page up the OCR ladder.
+        Results are kept in the persistent cache like the page count.
+
+        Args:
+            pages: Candidate page numbers to estimate from, e.g. the scanned pages
+            engine: OCR engine for orientation detection (see ocr_engines)
+
+        Returns:
+            page_orientation.Orientation now applied to renders
+        """
+        import page_orientation
+        from ocr_engines import get_engine
+
+        if self.orientation is not None:
+            return self.orientation
+        # Rotation comes from the engine, so its results are kept apart
+        config = f"{page_orientation.CACHE_CONFIG}:{get_engine(engine).cache_config()}"
+        cached = self.cache.get(self.pdf_hash, -1, config) if self.cache else None
+        if cached is not None:
+            self.orientation = page_orientation.Orientation.parse(cached)
+        else:
+            self.orientation = page_orientation.detect_orientation(self, pages, engine)
+            if self.cache:
+                self.cache.put(self.pdf_hash, -1, config, self.orientation.key())
+        return self.orientation
+
+    @property
+    def pdf_hash(self) -> str:
+        """Content hash of the input, the persistent cache key"""
+        if self._pdf_hash is None:
+            self._pdf_hash = file_hash(self.pdf_path)
+        return self._pdf_hash
+
+    @property
+    def page_count(self) -> int:
+        if self._page_count is None:
+            # Cached as page -1 so fully cached reruns don't parse the page tree
+            cached = self.cache.get(self.pdf_hash, -1, "page_count") if self.cache else None
+            if cached is not None:
+                self._page_count = int(cached)
+            else:
+                self._page_count = len(self.reader.pages)
+                if self.cache:
+                    self.cache.put(self.pdf_hash, -1, "page_count", str(self._page_count))
+        return self._page_count
+
+    def get_page_type(self, page_num: int) -> str:
+        """
+        Classify a page as text layer, scanned, blank or mixed (see page_classifier)
+
+        Reads the content stream operators only, so it's much cheaper than
+        extracting the page's text; results are cached like page text.
+        """
+        if page_num not in self._page_types:
+            config = page_classifier.CACHE_CONFIG
+            page_type = self.cache.get(self.pdf_hash, page_num, config) if self.cache else None
+            if page_type is None:
+                page_type = page_classifier.classify_page(self.reader.pages[page_num])
+                if self.cache:
+                    self.cache.put(self.pdf_hash, page_num, config, page_type)
+            self._page_types[page_num] = page_type
+        return self._page_types[page_num]
+
+    @property
+    def page_types(self) -> List[str]:
+        """Page type for every page, classified in one pass on first use"""
+        return [self.get_page_type(i) for i in range(self.page_count)]
+
+    def get_page_text(self, page_num: int, method: Optional[str] = None) -> str:
+        """
+        Get text for a single page, extracting it only on first request
+
+        Args:
+            page_num: Page number (0-indexed)
+            method: Backend name from text_backends ('pdfplumber', 'pypdf2',
+                    'pymupdf'); defaults to the context's configured backend
+
+        Returns:
+            Extracted text ("" if the page has no text layer)
+        """
+        method = method or self.backend
+        key = (method, page_num)
+        if key in self._text_cache:
+            return self._text_cache[key]
+
+        backend = get_backend(method)
+        text = self.cache.get(self.pdf_hash, page_num, backend.cache_config()) if self.cache else None
+        if text is None:
+            text = backend.extract_page(self, page_num)
+            if self.cache:
+                self.cache.put(self.pdf_hash, page_num, backend.cache_config(), text)
+
+        self._text_cache[key] = text
+        return text
+
+    def set_page_text(self, page_num: int, text: str, method: Optional[str] = None):
+        """Store page text produced as a by-product of another extraction"""
+        method = method or self.backend
+        if (method, page_num) in self._text_cache:
+            return
+        self._text_cache[(method, page_num)] = text
+        if self.cache:
+            self.cache.put(self.pdf_hash, page_num, get_backend(method).cache_config(), text)
+
+    def get_region_text(self, page_num: int, bbox: Tuple[float, float, float, float],
+                        method: Optional[str] = None) -> str:
+        """
+        Get text inside a region of a page (see page_regions)
+
+        Args:
+            page_num: Page number (0-indexed)
+            bbox: (x0, top, x1, bottom) as fractions of the page size
+            method: Backend name; defaults to the context's configured backend
+
+        Returns:
+            Region text
+        """
+        return self.get_regions_text(page_num, [bbox], method)[0]
+
+    def get_regions_text(self, page_num: int, bboxes: List[Tuple[float, float, float, float]],
+                         method: Optional[str] = None) -> List[str]:
+        """Get text for several regions of a page, cropping uncached ones in one pass"""
+        method = method or self.backend
+        backend = get_backend(method)
+        keys = [(method, page_num, tuple(bbox)) for bbox in bboxes]
+        missing = []
+        for key in keys:
+            if key in self._region_cache:
+                continue
+            cached = (self.cache.get(self.pdf_hash, page_num, backend.cache_config(), region_key(key[2]))
+                      if self.cache else None)
+            if cached is not None:
+                self._region_cache[key] = cached
+            else:
+                missing.append(key)
+        if missing:
+            texts = backend.extract_regions(self, page_num, [key[2] for key in missing])
+            self._region_cache.update(zip(missing, texts))
+            if self.cache:
+                for key, text in zip(missing, texts):
+                    self.cache.put(self.pdf_hash, page_num, backend.cache_config(), text, region_key(key[2]))
+        return [self._region_cache[key] for key in keys]
+
+    def get_text_range(self, start_page: int, end_page: int,
+                       method: Optional[str] = None, separator: str = "\n") -> str:
+        """Join text for an inclusive page range (0-indexed)"""
+        end_page = min(end_page, self.page_count - 1)
+        return separator.join(self.get_page_text(i, method) for i in range(start_page, end_page + 1))
+
+    def get_ocr_text(self, page_num: int, quick_mode: bool = False,
+                     config: str = "") -> Optional[str]:
+        """
+        Return cached OCR text for a page, or None if it hasn't been OCR'd
+
+        Args:
+            page_num: Page number (0-indexed)
+            quick_mode: Region-only (quick) OCR vs full page
+            config: OCR settings string (see text_cache.ocr_config); results
+                    are only persisted across runs when this is given
+        """
+        key = (page_num, quick_mode, config)
+        if key not in self._ocr_cache and config and self.cache:
+            cached = self.cache.get(self.pdf_hash, page_num, config)
+            if cached is not None:
+                self._ocr_cache[key] = cached
+        return self._ocr_cache.get(key)
+
+    def set_ocr_text(self, page_num: int, text: str, quick_mode: bool = False,
+                     config: str = "", persist: bool = True):
+        """Store OCR text for a page (persist=False keeps it in memory only)"""
+        self._ocr_cache[(page_num, quick_mode, config)] = text
+        if persist and config and self.cache:
+            self.cache.put(self.pdf_hash, page_num, config, text)
+
+    def prefetch(self, regions: Optional[List[Tuple[float, float, float, float]]] = None,
+                 method: Optional[str] = None, workers: int = 1, pages: Optional[range] = None):
+        """
+        Extract full-page (and region) text for many pages up front
+
+        With workers > 1 the pages are sharded into contiguous ranges across a
+        process pool, each worker opening the PDF on its own. Results are
+        stored in page order, so later reads are plain cache hits and callers
+        see exactly what serial extraction would have produced.
+
+        Args:
+            regions: Fractional bboxes to extract alongside each page
+            method: Backend name; defaults to the context's configured backend
+            workers: Worker processes (1 extracts in this process)
+            pages: Page numbers to fetch (all pages by default)
+        """
+        method = method or self.backend
+        regions = [tuple(bbox) for bbox in regions or []]
+        pages = range(self.page_count) if pages is None else pages
+        todo = [page_num for page_num in pages
+                if (method, page_num) not in self._text_cache
+                or any((method, page_num, bbox) not in self._region_cache for bbox in regions)]
+        if not todo:
+            return
+
+        if workers <= 1:
+            for page_num in todo:
+                _extract_page_and_regions(self, page_num, regions, method)
+            return
+
+        # A few shards per worker so one slow range doesn't leave the rest idle
+        shard_size = -(-len(todo) // (workers * 4))
+        shards = [todo[i:i + shard_size] for i in range(0, len(todo), shard_size)]
+        logger.info(f"Extracting {len(todo)} pages with {workers} workers")
+        with self.process_pool(workers, method) as pool:
+            for shard, results in zip(shards, pool.map(partial(_extract_shard, regions), shards)):
+                for page_num, (text, region_texts) in zip(shard, results):
+                    self._text_cache.setdefault((method, page_num), text)
+                    for bbox, region_text in zip(regions, region_texts):
+                        self._region_cache.setdefault((method, page_num, bbox), region_text)
+
+    def process_pool(self, workers: int, method: Optional[str] = None) -> ProcessPoolExecutor:
+        """
+        Process pool whose workers each hold their own context on this PDF
+
+        Jobs submitted to it read that context with worker_context(), so each
+        worker parses the file once however many jobs it runs. Workers share
+        the persistent cache file but open their own connection to it, and
+        straighten renders the way this context does.
+
+        Args:
+            workers: Worker processes
+            method: Default text backend for the worker contexts
+        """
+        init_args = (str(self.pdf_path), method or self.backend,
+                     str(self.cache.path) if self.cache else None,
+                     self.cache.max_bytes if self.cache else None, self.orientation)
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args)
+
+    def release_pages(self, start_page: int, end_page: int):
+        """
+        Drop in-memory text and OCR results for pages start_page..end_page
+
+        Used by streaming consumers once a document has been written; the
+        persistent cache keeps its copy. Parsed PDF objects (content streams,
+        images) are dropped too: both parsers otherwise keep every object they
+        resolve for the life of the handle, and re-read them on demand.
+        """
+        pages = range(start_page, end_page + 1)
+        self._text_cache = {k: v for k, v in self._text_cache.items() if k[1] not in pages}
+        self._region_cache = {k: v for k, v in self._region_cache.items() if k[1] not in pages}
+        self._ocr_cache = {k: v for k, v in self._ocr_cache.items() if k[0] not in pages}
+
+        # Parser internals, so looked up defensively: after an upgrade that
+        # renames them pages are still released, just not the parsed objects
+        caches = []
+        if self._reader is not None:
+            caches.append(getattr(self._reader, 'resolved_objects', None))
+        if self._plumber is not None:
+            doc = getattr(self._plumber, 'doc', None)
+            caches += [getattr(doc, '_cached_objs', None), getattr(doc, '_parsed_objs', None)]
+        for cache in caches:
+            if isinstance(cache, dict):
+                cache.clear()
+
+    def close(self):
+        """Release parsed handles (cached text is kept)"""
+        if self._plumber is not None:
+            self._plumber.close()
+            self._plumber = None
+        if self._fitz_doc is not None:
+            self._fitz_doc.close()
+            self._fitz_doc = None
+        if self._reader_file is not None:
+            self._reader_file.close()
+            self._reader_file = None
+        self._reader = None
+
+
+def _extract_page_and_regions(context: DocumentContext, page_num: int,
+                              regions: List[Tuple[float, ...]], method: str) -> Tuple[str, List[str]]:
+    # Regions first: pdfplumber primes the full-page text from the same parse
+    region_texts = context.get_regions_text(page_num, regions, method) if regions else []
+    return context.get_page_text(page_num, method), region_texts
+
+
+# Per-process context for DocumentContext.process_pool workers, so each
+# worker parses the file once rather than once per job
+_worker_context: Optional[DocumentContext] = None
+
+
+def worker_context() -> DocumentContext:
+    """The calling process-pool worker's DocumentContext (see DocumentContext.process_pool)"""
+    if _worker_context is None:
+        raise RuntimeError("worker_context() called outside a DocumentContext.process_pool worker")
+    return _worker_context
+
+
+def _init_worker(pdf_path: str, method: str, cache_path: Optional[str], cache_max_bytes: Optional[int],
+                 orientation=None):
+    global _worker_context
+    # SQLite connections can't be shared with the parent, open our own
+    cache = TextCache(cache_path, cache_max_bytes) if cache_path else None
+    _worker_context = DocumentContext(pdf_path, backend=method, cache=cache, use_cache=cache is not None,
+                                      orientation=orientation)
+
+
+def _extract_shard(regions: List[Tuple[float, ...]], pages: List[int]) -> List[Tuple[str, List[str]]]:
+    """Process-pool worker for DocumentContext.prefetch"""
+    context = worker_context()
+    results = [_extract_page_and_regions(context, page_num, regions, context.backend) for page_num in pages]
+    # The parent keeps the results; don't hold a second copy here
+    context.release_pages(pages[0], pages[-1])
+    return results
+
+
+class PageTextSequence(Sequence):
+    """
+    Read-only list of page texts that extracts a page only when indexed
+
+    Slicing returns another lazy view, so helpers that look at a few pages of
+    a document never cause the rest of it to be extracted. Results are
+    memoized by the underlying DocumentContext.
+    """
+
+    def __init__(self, context: DocumentContext, method: Optional[str] = None,
+                 regions: Optional[List[Tuple[float, float, float, float]]] = None,
+                 pages: Optional[range] = None):
+        """
+        Args:
+            context: DocumentContext to read from
+            method: Backend name; defaults to the context's configured backend
+            regions: If given, each item is the joined text of these regions
+                     instead of the full page
+            pages: Page numbers covered by this view (all pages by default)
+        """
+        self.context = context
+        self.method = method
+        self.regions = regions
+        self._pages = pages if pages is not None else range(context.page_count)
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PageTextSequence(self.context, self.method, self.regions, self._pages[index])
+
+        page_num = self._pages[index]
+        if self.regions:
+            return "\n".join(self.context.get_regions_text(page_num, self.regions, self.method))
+        return self.context.get_page_text(page_num, self.method)
+
+
+def parse_page_range(pages: str) -> Tuple[int, int]:
+    """
+    Convert a manifest page string like "8-14" into a 0-indexed inclusive range
+
+    Args:
+        pages: 1-indexed page range as written by the processors
+
+    Returns:
+        Tuple of (start_page, end_page)
+    """
+    start, _, end = pages.partition('-')
+    return int(start) - 1, int(end or start) - 1
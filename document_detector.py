@@ -4,9 +4,12 @@ Document Type Auto-Detection
 Analyzes PDF content to determine if it's LTD or IS document type
 """
 
-import pdfplumber
 import logging
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+
+import keyword_scanner
+from document_context import DocumentContext
+from text_backends import DEFAULT_BACKEND
 
 logger = logging.getLogger(__name__)
 
@@ -14,165 +17,171 @@ logger = logging.getLogger(__name__)
 class DocumentTypeDetector:
     """Detects document types from PDF content"""
     
-    def __init__(self):
+    def __init__(self, text_backend: str = DEFAULT_BACKEND):
         """Initialize detector with patterns"""
-        # Information Subpoena patterns (check first - more specific)
-        self.is_patterns = [
-            "INFORMATION SUBPOENA WITH RESTRAINING NOTICE",
-            "information subpoena with restraining notice"
-        ]
-        
-        # LTD (Legal/Debt Collection) patterns
-        self.ltd_patterns = [
-            "Our File Number:",
-            "our file number:",
-            "File Number:",
-            "file number:",
-            "To:",  # Common in collection letters
-            "Notice of",
-            "Legal Notice"
-        ]
-        
-        # Secondary IS indicators
-        self.is_secondary = [
-            "EXEMPTION CLAIM FORM",
-            "exemption claim form",
-            "File No.",
-            "file no."
-        ]
+        # Extractor used when no shared DocumentContext is passed in
+        self.text_backend = text_backend
+
+    # Patterns come from the rules file on each use, so edits reach running
+    # detectors; matched case-sensitively, from one scan per page (see keyword_scanner)
+    @property
+    def is_patterns(self) -> List[str]:
+        """Information Subpoena patterns (check first - more specific)"""
+        return keyword_scanner.IS_TITLE
+
+    @property
+    def ltd_patterns(self) -> List[str]:
+        """LTD (Legal/Debt Collection) patterns"""
+        return keyword_scanner.LTD_INDICATORS
+
+    @property
+    def is_secondary(self) -> List[str]:
+        """Secondary IS indicators"""
+        return keyword_scanner.IS_SECONDARY
     
-    def detect_document_type(self, pdf_path: str, max_pages_to_check: int = 5) -> Tuple[str, float]:
+    def detect_document_type(self, pdf_path: str, max_pages_to_check: int = 5,
+                             context: Optional[DocumentContext] = None) -> Tuple[str, float]:
         """
         Detect document type by analyzing PDF content
         
         Args:
             pdf_path: Path to PDF file
             max_pages_to_check: Maximum pages to analyze (for performance)
+            context: Shared DocumentContext; page text extracted here is
+                     reused by the processor that runs next
             
         Returns:
             Tuple of (document_type, confidence_score)
             document_type: 'IS', 'LTD', or 'UNKNOWN'
             confidence_score: 0.0 to 1.0
         """
+        ctx = context or DocumentContext(pdf_path, backend=self.text_backend)
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                total_pages = len(pdf.pages)
-                pages_to_check = min(max_pages_to_check, total_pages)
-                
-                is_score = 0.0
-                ltd_score = 0.0
-                
-                for i in range(pages_to_check):
-                    page_text = pdf.pages[i].extract_text() or ""
-                    
-                    # Check for Information Subpoena patterns
-                    for pattern in self.is_patterns:
-                        if pattern in page_text:
-                            is_score += 1.0  # Strong indicator
-                            logger.debug(f"Found IS pattern '{pattern}' on page {i+1}")
-                    
-                    # Check secondary IS patterns
-                    for pattern in self.is_secondary:
-                        if pattern in page_text:
-                            is_score += 0.3  # Weaker indicator
-                            logger.debug(f"Found IS secondary pattern '{pattern}' on page {i+1}")
-                    
-                    # Check for LTD patterns
-                    for pattern in self.ltd_patterns:
-                        if pattern in page_text:
-                            ltd_score += 0.5
-                            logger.debug(f"Found LTD pattern '{pattern}' on page {i+1}")
-                
-                # Normalize scores
-                max_possible_is = pages_to_check * 1.0 + pages_to_check * 0.3 * len(self.is_secondary)
-                max_possible_ltd = pages_to_check * 0.5 * len(self.ltd_patterns)
-                
-                if max_possible_is > 0:
-                    is_confidence = min(is_score / max_possible_is, 1.0)
-                else:
-                    is_confidence = 0.0
+            total_pages = ctx.page_count
+            pages_to_check = min(max_pages_to_check, total_pages)
+            
+            is_score = 0.0
+            ltd_score = 0.0
+            
+            for i in range(pages_to_check):
+                hits = keyword_scanner.scan(ctx.get_page_text(i))
                 
-                if max_possible_ltd > 0:
-                    ltd_confidence = min(ltd_score / max_possible_ltd, 1.0)
-                else:
-                    ltd_confidence = 0.0
+                # Check for Information Subpoena patterns
+                for pattern in self.is_patterns:
+                    if hits.has(pattern, case_sensitive=True):
+                        is_score += 1.0  # Strong indicator
+                        logger.debug(f"Found IS pattern '{pattern}' on page {i+1}")
                 
-                # Decision logic
-                if is_score > 0.0:  # Any IS pattern found
-                    return "IS", is_confidence
-                elif ltd_score > 0.0:  # Any LTD pattern found
-                    return "LTD", ltd_confidence
-                else:
-                    return "UNKNOWN", 0.0
+                # Check secondary IS patterns
+                for pattern in self.is_secondary:
+                    if hits.has(pattern, case_sensitive=True):
+                        is_score += 0.3  # Weaker indicator
+                        logger.debug(f"Found IS secondary pattern '{pattern}' on page {i+1}")
                 
+                # Check for LTD patterns
+                for pattern in self.ltd_patterns:
+                    if hits.has(pattern, case_sensitive=True):
+                        ltd_score += 0.5
+                        logger.debug(f"Found LTD pattern '{pattern}' on page {i+1}")
+            
+            # Normalize scores
+            max_possible_is = pages_to_check * 1.0 + pages_to_check * 0.3 * len(self.is_secondary)
+            max_possible_ltd = pages_to_check * 0.5 * len(self.ltd_patterns)
+            
+            if max_possible_is > 0:
+                is_confidence = min(is_score / max_possible_is, 1.0)
+            else:
+                is_confidence = 0.0
+            
+            if max_possible_ltd > 0:
+                ltd_confidence = min(ltd_score / max_possible_ltd, 1.0)
+            else:
+                ltd_confidence = 0.0
+            
+            # Decision logic
+            if is_score > 0.0:  # Any IS pattern found
+                return "IS", is_confidence
+            elif ltd_score > 0.0:  # Any LTD pattern found
+                return "LTD", ltd_confidence
+            else:
+                return "UNKNOWN", 0.0
+            
         except Exception as e:
             logger.error(f"Error analyzing PDF {pdf_path}: {e}")
             return "UNKNOWN", 0.0
+        finally:
+            if context is None:
+                ctx.close()
     
-    def quick_detect(self, pdf_path: str) -> str:
+    def quick_detect(self, pdf_path: str, context: Optional[DocumentContext] = None) -> str:
         """
         Quick detection - just returns document type
         
         Args:
             pdf_path: Path to PDF file
+            context: Shared DocumentContext (optional)
             
         Returns:
             'IS', 'LTD', or 'UNKNOWN'
         """
-        doc_type, _ = self.detect_document_type(pdf_path, max_pages_to_check=3)
+        doc_type, _ = self.detect_document_type(pdf_path, max_pages_to_check=3, context=context)
         return doc_type
     
-    def analyze_first_page(self, pdf_path: str) -> dict:
+    def analyze_first_page(self, pdf_path: str, context: Optional[DocumentContext] = None) -> dict:
         """
         Analyze just the first page for quick detection
         
         Args:
             pdf_path: Path to PDF file
+            context: Shared DocumentContext (optional)
             
         Returns:
             Dict with analysis results
         """
+        ctx = context or DocumentContext(pdf_path, backend=self.text_backend)
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                if len(pdf.pages) == 0:
-                    return {"type": "UNKNOWN", "reason": "No pages found"}
-                
-                first_page = pdf.pages[0].extract_text() or ""
-                
-                # Check for definitive IS marker
-                for pattern in self.is_patterns:
-                    if pattern in first_page:
-                        return {
-                            "type": "IS",
-                            "reason": f"Found '{pattern}' on first page",
-                            "confidence": 0.95
-                        }
-                
-                # Check for LTD patterns
-                ltd_matches = []
-                for pattern in self.ltd_patterns:
-                    if pattern in first_page:
-                        ltd_matches.append(pattern)
-                
-                if ltd_matches:
+            if ctx.page_count == 0:
+                return {"type": "UNKNOWN", "reason": "No pages found"}
+            
+            hits = keyword_scanner.scan(ctx.get_page_text(0))
+            
+            # Check for definitive IS marker
+            for pattern in self.is_patterns:
+                if hits.has(pattern, case_sensitive=True):
                     return {
-                        "type": "LTD", 
-                        "reason": f"Found LTD patterns: {ltd_matches}",
-                        "confidence": len(ltd_matches) * 0.2
+                        "type": "IS",
+                        "reason": f"Found '{pattern}' on first page",
+                        "confidence": 0.95
                     }
-                
+            
+            # Check for LTD patterns
+            ltd_matches = []
+            for pattern in self.ltd_patterns:
+                if hits.has(pattern, case_sensitive=True):
+                    ltd_matches.append(pattern)
+            
+            if ltd_matches:
                 return {
-                    "type": "UNKNOWN",
-                    "reason": "No recognizable patterns found",
-                    "confidence": 0.0
+                    "type": "LTD", 
+                    "reason": f"Found LTD patterns: {ltd_matches}",
+                    "confidence": len(ltd_matches) * 0.2
                 }
-                
+            
+            return {
+                "type": "UNKNOWN",
+                "reason": "No recognizable patterns found",
+                "confidence": 0.0
+            }
+            
         except Exception as e:
             return {
                 "type": "UNKNOWN",
                 "reason": f"Error: {e}",
                 "confidence": 0.0
             }
+        finally:
+            if context is None:
+                ctx.close()
 
 
 def main():
@@ -188,17 +197,18 @@ def main():
     
     print(f"Analyzing: {pdf_file}")
     
-    # Quick detection
-    quick_result = detector.quick_detect(pdf_file)
-    print(f"Quick Detection: {quick_result}")
-    
-    # Detailed detection
-    doc_type, confidence = detector.detect_document_type(pdf_file)
-    print(f"Detailed Detection: {doc_type} (confidence: {confidence:.2f})")
-    
-    # First page analysis
-    first_page = detector.analyze_first_page(pdf_file)
-    print(f"First Page Analysis: {first_page}")
+    with DocumentContext(pdf_file) as context:
+        # Quick detection
+        quick_result = detector.quick_detect(pdf_file, context=context)
+        print(f"Quick Detection: {quick_result}")
+        
+        # Detailed detection
+        doc_type, confidence = detector.detect_document_type(pdf_file, context=context)
+        print(f"Detailed Detection: {doc_type} (confidence: {confidence:.2f})")
+        
+        # First page analysis
+        first_page = detector.analyze_first_page(pdf_file, context=context)
+        print(f"First Page Analysis: {first_page}")
 
 
 if __name__ == "__main__":
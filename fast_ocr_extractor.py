@@ -7,23 +7,46 @@ Optimized for speed on large PDFs (up to 50MB)
 import re
 import os
 import sys
+import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-import pytesseract
-from pdf2image import convert_from_path
-from PIL import Image, ImageEnhance
+from typing import Dict, Optional, Set, Tuple
 import concurrent.futures
 import time
 
+import file_number_patterns
+import regex_engine
+import rule_profiler
+from document_context import DocumentContext
+from image_preprocess import preprocessor
+from ocr_engines import available_engines, get_engine
+from ocr_ladder import OCRLadder, Rung
+from ocr_profiles import get_profile
+from page_classifier import PAGE_BLANK, PAGE_MIXED, PAGE_SCANNED, PAGE_TEXT
+from page_regions import REGIONS
+from text_cache import file_hash
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Directory mode results, one JSON line per file
+RESULTS_FILE = "fast_ocr_results.jsonl"
+
 
 class FastOCRExtractor:
     """Fast OCR extraction focused on file numbers"""
 
-    def __init__(self):
+    def __init__(self, ocr_engine: Optional[str] = None, doc_type: str = 'default',
+                 profiles: Optional[str] = None):
+        """
+        Args:
+            ocr_engine: OCR engine name (see ocr_engines); default picks the
+                        in-process engine when it's installed
+            doc_type: Document type whose trained file number profile to use
+            profiles: Profile file (see ocr_profiles)
+        """
+        self.ocr_engine = get_engine(ocr_engine).name
+
         # File number patterns (1L+7N, 2L+6N, 8N)
         self.valid_patterns = [
             re.compile(r'^[A-Z]\d{7}$'),     # L2501375
@@ -34,16 +57,28 @@ class FastOCRExtractor:
         # Quick OCR config for speed
         self.fast_config = "--psm 6 -c tessedit_do_invert=0 --oem 1"
 
+        # Cheapest render first; step up only while no valid file number is read
+        top_third = (REGIONS['top_third'],)
+        rungs = [
+            Rung('top_third', 1.5, top_third, 'contrast', self.fast_config),
+            Rung('top_third_200dpi', 200 / 72, top_third, 'contrast', self.fast_config),
+        ]
+        # A trained profile replaces the built-in crops
+        profile = get_profile(doc_type, 'file_number', profiles)
+        if profile:
+            logger.info(f"Using trained {doc_type} file number profile ({profile.dpi} dpi, "
+                        f"{profile.config or 'default config'}, preprocess {profile.preprocess})")
+            rungs = [profile.rung()]
+        self.file_number_ladder = OCRLadder(rungs + [
+            Rung('page_300dpi_enhanced', 300 / 72, None, 'enhance', self.fast_config),
+        ], self.ocr_engine)
+
     def quick_preprocess(self, image):
-        """Minimal preprocessing for speed"""
-        # Just grayscale and contrast
-        image = image.convert('L')
-        enhancer = ImageEnhance.Contrast(image)
-        image = enhancer.enhance(2.0)
-        return image
+        """Minimal preprocessing for speed: grayscale and contrast"""
+        return preprocessor('contrast')(image)
 
-    def extract_file_number_from_image(self, image) -> Optional[str]:
-        """Extract file number from a single image"""
+    def ocr_image(self, image) -> Optional[str]:
+        """OCR the top third of a page image, None on failure"""
         try:
             # Quick preprocessing
             processed = self.quick_preprocess(image)
@@ -53,119 +88,268 @@ class FastOCRExtractor:
             cropped = processed.crop((0, 0, width, height // 3))
 
             # Run OCR on cropped region
-            text = pytesseract.image_to_string(cropped, config=self.fast_config)
+            return get_engine(self.ocr_engine).image_to_string(cropped, config=self.fast_config)
+        except Exception as e:
+            logger.debug(f"Error processing image: {e}")
+            return None
+
+    def extract_file_number_from_image(self, image) -> Optional[str]:
+        """Extract file number from a single image"""
+        text = self.ocr_image(image)
+        return self.extract_file_number_from_text(text) if text else None
 
+    def extract_file_number_from_text(self, text: str) -> Optional[str]:
+        """Extract file number from OCR text of the top third of a page"""
+        try:
             # Clean common OCR errors (but keep original for fallback)
             cleaned_text = text.replace('|', '1').replace('l', '1').replace('I', '1')
             cleaned_text = cleaned_text.replace('O', '0').replace('o', '0')
 
-            # Look for file number patterns
-            # Search near keywords first
-            patterns = [
-                r'File\s*No[.:]*\s*([A-Z0-9]{6,8})',
-                r'Account\s*#?\s*([A-Z0-9]{6,8})',
-                r'\b([A-Z]\d{7})\b',
-                r'\b([A-Z]{2}\d{6})\b',
-                r'\b(\d{8})\b',
-            ]
-
+            # Labelled numbers first, then bare numbers (see file_number_patterns.OCR_TOP)
             # Try both cleaned and original text
             for text_version in [cleaned_text.upper(), text.upper()]:
-                for pattern in patterns:
-                    matches = re.findall(pattern, text_version, re.MULTILINE)
-                    for match in matches:
-                        cleaned = re.sub(r'[^A-Z0-9]', '', match)
-
-                        # Apply smart OCR corrections for file numbers
-                        # Only fix first character if it's "1" and should be "L"
-                        if len(cleaned) == 8 and cleaned[0] == '1':
-                            # Check if it matches the pattern with L instead
-                            corrected = 'L' + cleaned[1:]
-                            if re.match(r'^[A-Z]\d{7}$', corrected):
-                                cleaned = corrected
-
-                        # Validate against our patterns
-                        for valid_pattern in self.valid_patterns:
-                            if valid_pattern.match(cleaned):
-                                return cleaned
+                for candidate in file_number_patterns.OCR_TOP.scan(text_version):
+                    cleaned = file_number_patterns.normalize(candidate.value)
+
+                    # Apply smart OCR corrections for file numbers
+                    # Only fix first character if it's "1" and should be "L"
+                    if len(cleaned) == 8 and cleaned[0] == '1':
+                        # Check if it matches the pattern with L instead
+                        corrected = 'L' + cleaned[1:]
+                        if self.valid_patterns[0].match(corrected):
+                            cleaned = corrected
+
+                    # Validate against our patterns
+                    for valid_pattern in self.valid_patterns:
+                        if valid_pattern.match(cleaned):
+                            return cleaned
 
         except Exception as e:
-            logger.debug(f"Error processing image: {e}")
+            logger.debug(f"Error parsing OCR text: {e}")
 
         return None
 
     def process_pdf_fast(self, pdf_path: Path, max_pages: int = 2) -> Optional[str]:
-        """Fast PDF processing - only check first few pages"""
+        """Fast PDF processing - only check first few pages (see extract)"""
+        return self.extract(pdf_path, max_pages)['file_number']
+
+    def extract(self, pdf_path: Path, max_pages: int = 2) -> Dict:
+        """Find the file number on the first pages of a PDF
+
+        Each page's type decides how it is read: blank pages are skipped,
+        text-layer pages are read without OCR, and scanned pages (or mixed
+        pages whose text layer has no file number) are OCR'd up the
+        escalation ladder, from a low-resolution crop to a 300 dpi page.
+
+        Returns:
+            Record with file_number (None if not found), page (1-indexed),
+            source ("text layer" or "OCR <rung>"), seconds and, if the file
+            couldn't be read, error
+        """
+        start_time = time.time()
+        record = {"file_number": None, "page": None, "source": None}
         try:
-            start_time = time.time()
             logger.info(f"Processing: {pdf_path.name}")
 
-            # Convert only first few pages at lower DPI for speed
-            images = convert_from_path(
-                pdf_path,
-                dpi=200,  # Lower DPI for speed
-                first_page=1,
-                last_page=min(max_pages, 2),
-                fmt='jpeg',
-                thread_count=2
-            )
-
-            # Process pages
-            for i, image in enumerate(images):
-                file_number = self.extract_file_number_from_image(image)
-                if file_number:
+            last_page = min(max_pages, 2)
+
+            with DocumentContext(pdf_path) as context:
+                # Each OCR rung renders only the page (or crop) it reads, and
+                # only if that result isn't cached
+                for i in range(min(last_page, context.page_count)):
+                    page_type = context.get_page_type(i)
+                    if page_type == PAGE_BLANK:
+                        continue
+
+                    file_number = None
+                    source = "text layer"
+                    if page_type in (PAGE_TEXT, PAGE_MIXED):
+                        file_number = self.extract_file_number_from_text(
+                            context.get_region_text(i, REGIONS['top_third']))
+
+                    if not file_number and page_type in (PAGE_SCANNED, PAGE_MIXED):
+                        # Estimated once per file, from the first page OCR'd
+                        context.detect_orientation([i], self.ocr_engine)
+                        file_number, _, rung = self.file_number_ladder.read(
+                            context, i, self.extract_file_number_from_text)
+                        source = f"OCR {rung}"
+
+                    if file_number:
+                        elapsed = time.time() - start_time
+                        logger.info(f"  ✅ Found: {file_number} (page {i+1} {source}, {elapsed:.1f}s)")
+                        record.update(file_number=file_number, page=i + 1, source=source)
+                        break
+                else:
                     elapsed = time.time() - start_time
-                    logger.info(f"  ✅ Found: {file_number} (page {i+1}, {elapsed:.1f}s)")
-                    return file_number
-
-            elapsed = time.time() - start_time
-            logger.info(f"  ❌ No file number found ({elapsed:.1f}s)")
-            return None
+                    logger.info(f"  ❌ No file number found ({elapsed:.1f}s)")
 
         except Exception as e:
             logger.error(f"  ⚠️  Error: {e}")
-            return None
-
-    def process_directory(self, input_dir: str):
-        """Process all PDFs in directory"""
+            record["error"] = str(e)
+
+        record["seconds"] = round(time.time() - start_time, 3)
+        return record
+
+    def process_directory(self, input_dir: str, output: Optional[str] = None,
+                          workers: Optional[int] = None, max_pages: int = 2) -> Optional[Dict]:
+        """
+        Process all PDFs in a directory, appending one JSON line per file
+
+        Files are processed concurrently and each record is written as soon
+        as its file finishes, so memory stays flat however large the folder.
+        Rerunning with the same output resumes: files whose content hash
+        already has a record (including copies under another name) are
+        skipped, except those that failed with an error, which are retried.
+
+        Args:
+            input_dir: Directory of PDFs
+            output: JSONL results file (default: fast_ocr_results.jsonl in input_dir)
+            workers: Worker processes (None or 1 processes files in this process)
+            max_pages: Pages to check per file
+
+        Returns:
+            Summary counts and OCR ladder hit rates for this run
+        """
         input_path = Path(input_dir)
-        pdf_files = list(input_path.glob("*.pdf")) + list(input_path.glob("*.PDF"))
+        pdf_files = sorted(list(input_path.glob("*.pdf")) + list(input_path.glob("*.PDF")))
 
         if not pdf_files:
             logger.error(f"No PDF files found in {input_dir}")
-            return
+            return None
+
+        output_path = Path(output) if output else input_path / RESULTS_FILE
+        done = load_done_hashes(output_path)
+        workers = workers if workers and workers > 1 else 1
 
         results = {
             "total": len(pdf_files),
+            "processed": 0,
+            "skipped": 0,
             "success": 0,
-            "files": {}
+            "output": str(output_path),
         }
 
-        logger.info(f"Processing {len(pdf_files)} files with fast OCR")
+        logger.info(f"Processing {len(pdf_files)} files with fast OCR "
+                    f"({len(done)} already in {output_path.name}, {workers} worker(s))")
         logger.info("="*50)
 
-        for pdf_file in pdf_files:
-            file_number = self.process_pdf_fast(pdf_file)
-            results["files"][pdf_file.name] = file_number
-            if file_number:
+        start_time = time.time()
+
+        def write(pdf_file: Path, digest: str, record: Dict, out):
+            record = {"file": pdf_file.name, "path": str(pdf_file), "sha256": digest, **record}
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            results["processed"] += 1
+            if record["file_number"]:
                 results["success"] += 1
+            rate = results["processed"] / max(time.time() - start_time, 1e-9)
+            logger.info(f"[{results['processed'] + results['skipped']}/{results['total']}] {pdf_file.name}: "
+                        f"{record['file_number'] or 'NOT FOUND'} ({rate:.2f} files/s)")
+
+        def pending_files():
+            """(file, content hash) still to do; duplicates of a queued file are skipped too"""
+            for pdf_file in pdf_files:
+                try:
+                    digest = file_hash(pdf_file)
+                except OSError as e:
+                    logger.error(f"Can't read {pdf_file.name}: {e}")
+                    continue
+                if digest in done:
+                    results["skipped"] += 1
+                    continue
+                done.add(digest)
+                yield pdf_file, digest
+
+        with open(output_path, 'a') as out:
+            if out.tell() and not _ends_with_newline(output_path):
+                out.write("\n")  # Don't glue the next record onto a torn line
+            if workers == 1:
+                for pdf_file, digest in pending_files():
+                    write(pdf_file, digest, self.extract(pdf_file, max_pages), out)
+            else:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                    # A few files per worker in flight keeps them busy without
+                    # queueing the whole folder
+                    in_flight = {}
+                    for pdf_file, digest in pending_files():
+                        if len(in_flight) >= workers * 4:
+                            finished, _ = concurrent.futures.wait(
+                                in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                            for future in finished:
+                                self._collect(future, *in_flight.pop(future), out, write)
+                        in_flight[pool.submit(_extract_job, self, pdf_file, max_pages)] = (pdf_file, digest)
+                    for future in concurrent.futures.as_completed(in_flight):
+                        self._collect(future, *in_flight[future], out, write)
+
+        elapsed = time.time() - start_time
+
+        # How often each OCR escalation rung was needed
+        results["ocr_ladder"] = self.file_number_ladder.hit_rates()
+        results["files_per_second"] = round(results["processed"] / elapsed, 3) if elapsed > 0 else None
 
         # Print summary
         logger.info("="*50)
         logger.info("SUMMARY")
         logger.info("="*50)
-        success_rate = (results["success"] / results["total"]) * 100 if results["total"] > 0 else 0
-        logger.info(f"Success Rate: {results['success']}/{results['total']} ({success_rate:.1f}%)")
-
-        logger.info("\nResults:")
-        for filename, file_number in results["files"].items():
-            if file_number:
-                logger.info(f"  {filename}: {file_number}")
-            else:
-                logger.info(f"  {filename}: NOT FOUND")
+        success_rate = (results["success"] / results["processed"]) * 100 if results["processed"] > 0 else 0
+        logger.info(f"Success Rate: {results['success']}/{results['processed']} ({success_rate:.1f}%)")
+        logger.info(f"Skipped (already done): {results['skipped']}")
+        logger.info(f"Throughput: {results['processed']} files in {elapsed:.1f}s "
+                    f"({results['files_per_second'] or 0:.2f} files/s)")
+        for rung_name, counts in results["ocr_ladder"]["rungs"].items():
+            logger.info(f"  OCR rung {rung_name}: {counts['hits']}/{counts['attempts']} pages")
+        logger.info(f"Results: {output_path}")
 
         return results
 
+    def _collect(self, future, pdf_file: Path, digest: str, out, write):
+        """Write a worker's record and fold its OCR ladder and rule profile counters into ours"""
+        try:
+            record, counters, misses, rule_stats = future.result()
+        except Exception as e:
+            # The worker itself died (e.g. killed); the file is retried next run
+            logger.error(f"  ⚠️  Worker failed on {pdf_file.name}: {e}")
+            return
+        self.file_number_ladder.merge(counters, misses)
+        rule_profiler.PROFILER.merge(rule_stats)
+        write(pdf_file, digest, record, out)
+
+
+def load_done_hashes(output_path: Path) -> Set[str]:
+    """
+    Content hashes already recorded in a JSONL results file
+
+    Records with an error (OCR timeout, locked file, ...) don't count, so
+    those files are retried; a torn last line is ignored.
+    """
+    done = set()
+    if not output_path.exists():
+        return done
+    with open(output_path) as f:
+        for line_num, line in enumerate(f, 1):
+            try:
+                record = json.loads(line)
+                if "error" not in record:
+                    done.add(record["sha256"])
+            except (ValueError, KeyError, TypeError):
+                if line.strip():
+                    logger.warning(f"{output_path.name}:{line_num}: unreadable record, ignored")
+    return done
+
+
+def _ends_with_newline(path: Path) -> bool:
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _extract_job(extractor: FastOCRExtractor, pdf_path: Path, max_pages: int) -> Tuple[Dict, Dict, int, Dict]:
+    """Process-pool worker: one file's record plus the OCR ladder and rule profile counts it added"""
+    ladder = extractor.file_number_ladder
+    ladder.reset()
+    record = extractor.extract(pdf_path, max_pages)
+    return record, ladder.counters, ladder.misses, rule_profiler.PROFILER.take()
+
 
 def main():
     import argparse
@@ -173,10 +357,30 @@ def main():
     parser = argparse.ArgumentParser(description='Fast OCR extraction for file numbers')
     parser.add_argument('input', help='PDF file or directory to process')
     parser.add_argument('--pages', type=int, default=2, help='Max pages to check (default: 2)')
+    parser.add_argument('--ocr-engine', default=None, choices=['auto'] + available_engines(),
+                       help='OCR engine (default: tesserocr if installed, else tesseract)')
+    parser.add_argument('--doc-type', default='default',
+                       help='Document type whose trained OCR profile to use (default: default)')
+    parser.add_argument('--profiles', default=None,
+                       help='OCR profile file from the trainers (default: ocr_profiles.json)')
+    parser.add_argument('-j', '--workers', type=int,
+                       help='Directory mode: process this many files at once (default: serial)')
+    parser.add_argument('-o', '--output', default=None,
+                       help=f'Directory mode: JSONL results file, appended to and resumed from '
+                            f'(default: {RESULTS_FILE} in the directory)')
+    parser.add_argument('--profile-rules', metavar='REPORT', default=None,
+                       help='Write per-pattern calls, hits and timings to REPORT (.json for JSON)')
+    parser.add_argument('--regex-engine', default=None, choices=['auto'] + regex_engine.available_engines(),
+                       help='Regex engine for the extraction patterns (default: MAILROOM_REGEX_ENGINE or re)')
 
     args = parser.parse_args()
+    if args.profile_rules:
+        rule_profiler.enable(args.profile_rules)
+    if args.regex_engine:
+        regex_engine.set_engine(args.regex_engine)
 
-    extractor = FastOCRExtractor()
+    extractor = FastOCRExtractor(ocr_engine=args.ocr_engine, doc_type=args.doc_type,
+                                 profiles=args.profiles)
 
     input_path = Path(args.input)
     if input_path.is_file():
@@ -186,7 +390,7 @@ def main():
         else:
             print("No file number found")
     elif input_path.is_dir():
-        extractor.process_directory(args.input)
+        extractor.process_directory(args.input, args.output, args.workers, args.pages)
     else:
         logger.error(f"{args.input} is not a valid file or directory")
         sys.exit(1)
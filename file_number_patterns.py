@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+File Number Patterns
+Every extractor's file number label/value patterns, as sets defined in the
+rules file (mailroom_rules.json). Each set is compiled once per process
+into a single alternation with a named group per pattern, so a page is
+scanned once for all of its labels instead of once per pattern. Matches
+come back as candidates ranked the way the extractors used to try them:
+by pattern order, then by position on the page.
+"""
+
+import re
+import string
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+import regex_engine
+import rule_profiler
+
+# Pattern with exactly one capturing group around the value
+LabelPattern = Tuple[str, str]
+
+_NOT_ALNUM = re.compile(r'[^A-Z0-9]')
+# Length-preserving case folding, so offsets match the original text
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+class Candidate(NamedTuple):
+    """One label/value match on a page"""
+    value: str   # Captured value as it appears in the text
+    label: str   # Name of the pattern that matched
+    rank: int    # Index of that pattern in its set (0 = preferred)
+    start: int   # Offset of the match in the text
+
+
+def normalize(value: str) -> str:
+    """Upper-case a captured value and drop anything but letters and digits"""
+    return _NOT_ALNUM.sub('', value.strip().upper())
+
+
+def _has_top_level_alternation(regex: str) -> bool:
+    """Whether a pattern has a | outside any group or character class"""
+    depth = 0
+    in_class = escaped = False
+    for char in regex:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return True
+    return False
+
+
+def _fold_regex(regex: str) -> str:
+    """Lower-case a pattern's literals and ranges, leaving escapes (\\S, \\D) alone"""
+    folded = []
+    escaped = False
+    for char in regex:
+        folded.append(char if escaped else char.lower())
+        escaped = not escaped and char == '\\'
+    return "".join(folded)
+
+
+def _branch(regex: str) -> str:
+    """
+    One pattern as a branch of the set's alternation
+
+    The branch consumes exactly one character and checks the rest in a
+    lookahead, so matches may overlap. Starting with a plain literal lets
+    sre skip ahead to the characters some label begins with instead of
+    trying every branch at every offset.
+    """
+    if _has_top_level_alternation(regex):
+        # The prefixes below would only apply to the first alternative
+        return f"(?=(?:{regex}))[\\s\\S]"
+    if regex[0].isalnum() and regex[1:2] not in ('*', '+', '?', '{'):
+        return f"{regex[0]}(?={regex[1:]})"
+    if regex.startswith('\\b'):
+        # Cheaper to rule out off word boundaries before entering the lookahead
+        return f"\\b(?={regex[2:]})[\\s\\S]"
+    return f"(?={regex})[\\s\\S]"
+
+
+class PatternSet:
+    """
+    Label/value patterns compiled into one alternation
+
+    Matches may overlap ("Our File Number:" and the "File Number:" inside it
+    are both found); where several patterns match at the same offset only
+    the earliest in the set is kept. Case-insensitive sets are compiled
+    lower-cased and matched against an ASCII-folded copy of the text (same
+    offsets), since sre can't skip ahead on case-insensitive literals.
+    """
+
+    def __init__(self, patterns: Sequence[LabelPattern], flags: int = re.IGNORECASE | re.MULTILINE,
+                 name: str = 'patterns'):
+        """
+        Args:
+            patterns: (label, regex) in order of preference; each regex has
+                      one capturing group around the value (the first that
+                      matched is taken when alternatives have their own)
+            flags: re flags for the whole set
+            name: Set name in rule profiles
+        """
+        self.patterns = tuple(patterns)
+        self.flags = flags
+        self.name = name
+        self.fold = bool(flags & re.IGNORECASE)
+        branches = []
+        # Capturing group number in the alternation -> rank of its pattern,
+        # and each pattern's group numbers
+        self.group_ranks = [None]
+        self.value_groups = []
+        for rank, (_, regex) in enumerate(self.patterns):
+            groups = re.compile(regex, flags).groups
+            if not groups:
+                raise ValueError(f"Pattern has no capturing group: {regex}")
+            self.value_groups.append(range(len(self.group_ranks), len(self.group_ranks) + groups))
+            self.group_ranks += [rank] * groups
+            branches.append(_branch(_fold_regex(regex) if self.fold else regex))
+        self.regex = re.compile("|".join(branches), flags & ~re.IGNORECASE)
+
+    def scan(self, text: str) -> List[Candidate]:
+        """
+        Every label/value match in one pass over the text
+
+        Returns:
+            Candidates by rank, then position (values as cased in the text)
+        """
+        if rule_profiler.PROFILER.enabled:
+            return self._profiled_scan(text)
+        return self._scan(text)
+
+    def _scan(self, text: str) -> List[Candidate]:
+        if regex_engine.ENGINE != 're':
+            return self._scan_each(text)
+        candidates = []
+        for match in self.regex.finditer(text.translate(_ASCII_LOWER) if self.fold else text):
+            if match.lastindex is None:
+                continue  # Matched by an alternative without a value
+            rank = self.group_ranks[match.lastindex]
+            group = next(group for group in self.value_groups[rank] if match.start(group) >= 0)
+            value = text[match.start(group):match.end(group)]
+            candidates.append(Candidate(value, self.patterns[rank][0], rank, match.start()))
+        candidates.sort(key=lambda candidate: (candidate.rank, candidate.start))
+        return candidates
+
+    def _scan_each(self, text: str) -> List[Candidate]:
+        """
+        Pattern by pattern, for engines without lookahead (RE2): the same
+        candidates, except that one pattern's matches don't overlap each other
+        """
+        best = {}
+        for rank, (label, regex) in enumerate(self.patterns):
+            for match in regex_engine.compile(regex, self.flags).finditer(text):
+                # Lowest rank at each offset, as in the alternation
+                if match.lastindex is not None and match.start() not in best:
+                    value = next(value for value in match.groups() if value is not None)
+                    best[match.start()] = Candidate(value, label, rank, match.start())
+        return sorted(best.values(), key=lambda candidate: (candidate.rank, candidate.start))
+
+    def _profiled_scan(self, text: str) -> List[Candidate]:
+        """scan, timing the set and then each of its patterns searched alone"""
+        profiler = rule_profiler.PROFILER
+        start = time.perf_counter()
+        candidates = self._scan(text)
+        profiler.record(self.name, f"<set of {len(self)}>", time.perf_counter() - start, bool(candidates))
+        for label, regex in self.patterns:
+            single = regex_engine.compile(regex, self.flags)
+            start = time.perf_counter()
+            match = single.search(text)
+            profiler.record(f"{self.name}.{label}", regex, time.perf_counter() - start, match is not None)
+        return candidates
+
+    def first(self, text: str, accept: Optional[Callable[[str], Optional[str]]] = None) -> Optional[str]:
+        """
+        Best value the caller accepts
+
+        Args:
+            text: Page text
+            accept: Maps a captured value to the file number to return, or
+                    None to try the next candidate (default: normalize)
+
+        Returns:
+            The first accepted value, or None
+        """
+        accept = accept or normalize
+        for candidate in self.scan(text):
+            value = accept(candidate.value)
+            if value:
+                return value
+        return None
+
+    def __iter__(self):
+        return iter(self.patterns)
+
+    def __len__(self):
+        return len(self.patterns)
+
+
+def __getattr__(name: str):
+    """
+    The compiled sets of the rules file, by upper-case name (LETTER,
+    IS_SIGNATURE, ...), or all of them by name as PATTERN_SETS
+
+    Looked up on each access, so an edited rules file takes effect without
+    re-importing (see rule_registry).
+    """
+    import rule_registry
+
+    pattern_sets = rule_registry.current().pattern_sets
+    if name == 'PATTERN_SETS':
+        return pattern_sets
+    if name.isupper() and name.lower() in pattern_sets:
+        return pattern_sets[name.lower()]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
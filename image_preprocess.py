@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Image Preprocessing for OCR
+NumPy versions of the preprocessing steps (contrast, autocontrast, Otsu and
+adaptive thresholds, median denoise, sharpen, upscale). Every step takes a
+grayscale uint8 array, either one image (H, W) or a stack of same-sized
+crops (N, H, W) handled in one call, and statistics such as the mean or the
+histogram are taken per image. Steps are chained by name, e.g.
+"median+contrast:2.5+sharpen", which is how rungs, profiles and the
+trainers describe preprocessing.
+"""
+
+import sys
+from typing import Callable, Dict, Iterable, List
+
+import numpy as np
+from PIL import Image
+
+
+def to_array(image) -> np.ndarray:
+    """Grayscale uint8 array from a PIL image or an array (RGB(A) arrays are converted)"""
+    if isinstance(image, Image.Image):
+        return np.asarray(image if image.mode == 'L' else image.convert('L'))
+    array = np.asarray(image)
+    if array.ndim >= 3 and array.shape[-1] in (3, 4):
+        # ITU-R 601-2 luma, as PIL's convert('L')
+        rgb = array[..., :3].astype(np.uint32)
+        array = (rgb[..., 0] * 19595 + rgb[..., 1] * 38470 + rgb[..., 2] * 7471 + 0x8000) >> 16
+    return array.astype(np.uint8, copy=False)
+
+
+def stack(images: Iterable) -> np.ndarray:
+    """(N, H, W) array from same-sized images, for batch preprocessing"""
+    return np.stack([to_array(image) for image in images])
+
+
+LEVELS = np.arange(256, dtype=np.float64)
+
+# Byte values of each uint16 pair of pixels, in memory order
+_PAIRS = np.arange(65536, dtype=np.uint16)
+_FIRST, _SECOND = (_PAIRS & 255, _PAIRS >> 8) if sys.byteorder == 'little' else (_PAIRS >> 8, _PAIRS & 255)
+
+
+def _clip(values: np.ndarray) -> np.ndarray:
+    """Saturate to uint8, truncating like PIL's blend"""
+    return np.clip(values, 0, 255).astype(np.uint8)
+
+
+def _images(array: np.ndarray) -> np.ndarray:
+    """(N, H, W) view of one image or a stack"""
+    return array.reshape((-1,) + array.shape[-2:])
+
+
+def _pixel_pairs(image: np.ndarray):
+    """Contiguous pixels viewed two per uint16, or None for odd sizes"""
+    flat = np.ascontiguousarray(image).reshape(-1)
+    return flat.view(np.uint16) if flat.size % 2 == 0 else None
+
+
+def _histogram(image: np.ndarray) -> np.ndarray:
+    """256-bin histogram, counting pixel pairs (half the elements to bin)"""
+    pairs = _pixel_pairs(image)
+    if pairs is None:
+        return np.bincount(image.ravel(), minlength=256)
+    counts = np.bincount(pairs, minlength=65536).reshape(256, 256)
+    return counts.sum(axis=0) + counts.sum(axis=1)
+
+
+def _lookup(lut: np.ndarray, image: np.ndarray) -> np.ndarray:
+    """Map pixels through a 256-entry table, two pixels per lookup"""
+    pairs = _pixel_pairs(image)
+    if pairs is None:
+        return np.take(lut, image)
+    table = lut[_FIRST].astype(np.uint16)
+    table.view(np.uint8).reshape(-1, 2)[:, 1 if sys.byteorder == 'little' else 0] = lut[_SECOND]
+    return np.take(table, pairs).view(np.uint8).reshape(image.shape)
+
+
+def _per_image_lut(array: np.ndarray, make_lut: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+    """
+    Map every image through its own lookup table built from its pixels
+
+    Per-pixel work is one table lookup; statistics are per image, so a stack
+    is mapped image by image (each small enough to stay in cache).
+    """
+    if array.ndim == 2:
+        return _lookup(make_lut(array), array)
+    return np.stack([_lookup(make_lut(image), image) for image in _images(array)]).reshape(array.shape)
+
+
+def _binary(mask: np.ndarray) -> np.ndarray:
+    """255 where mask is set, 0 elsewhere"""
+    return mask.view(np.uint8) * np.uint8(255)
+
+
+def contrast(array: np.ndarray, factor=2.0) -> np.ndarray:
+    """Scale distances from the image mean (ImageEnhance.Contrast)"""
+    factor = float(factor)
+
+    def lut(image):
+        mean = np.floor(int(image.sum(dtype=np.uint64)) / image.size + 0.5)
+        return _clip(mean + factor * (LEVELS - mean))
+    return _per_image_lut(array, lut)
+
+
+def brightness(array: np.ndarray, factor=1.2) -> np.ndarray:
+    """Scale intensities (ImageEnhance.Brightness)"""
+    table = _clip(LEVELS * float(factor))
+    return _per_image_lut(array, lambda image: table)
+
+
+def autocontrast(array: np.ndarray, cutoff=1) -> np.ndarray:
+    """
+    Stretch each image's histogram to 0-255 after ignoring the darkest and
+    lightest cutoff percent of pixels (ImageOps.autocontrast)
+    """
+    cutoff = float(cutoff)
+
+    def lut(image):
+        hist = _histogram(image)
+        cut = hist.sum() * cutoff // 100
+        # Lowest and highest bins that survive trimming `cut` pixels from each end
+        lo = np.argmax(np.cumsum(hist) > cut)
+        hi = 255 - np.argmax(np.cumsum(hist[::-1]) > cut)
+        if hi <= lo:
+            return np.arange(256, dtype=np.uint8)
+        scale = 255.0 / (hi - lo)
+        return _clip(np.trunc(LEVELS * scale - lo * scale))
+    return _per_image_lut(array, lut)
+
+
+def binarize(array: np.ndarray, threshold=128) -> np.ndarray:
+    """White above a fixed threshold, black otherwise"""
+    return _binary(array > float(threshold))
+
+
+def _otsu_lut(image: np.ndarray) -> np.ndarray:
+    """Binarizing table at the threshold maximizing between-class variance"""
+    hist = _histogram(image).astype(np.float64)
+    weights = np.cumsum(hist)
+    means = np.cumsum(hist * LEVELS)
+    total, total_mean = weights[-1], means[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (total_mean * weights - total * means) ** 2 / (weights * (total - weights))
+    threshold = np.nan_to_num(between).argmax()
+    return _binary(LEVELS > threshold)
+
+
+def otsu(array: np.ndarray) -> np.ndarray:
+    """Binarize each image at the threshold that best separates its histogram (Otsu)"""
+    return _per_image_lut(array, _otsu_lut)
+
+
+def _shifted(array: np.ndarray, size: int) -> List[np.ndarray]:
+    """Every (dy, dx) neighbour view of an edge-padded image, window size x size"""
+    margin = size // 2
+    pad = [(0, 0)] * (array.ndim - 2) + [(margin, margin), (margin, margin)]
+    padded = np.pad(array, pad, mode='edge')
+    height, width = array.shape[-2:]
+    return [padded[..., dy:dy + height, dx:dx + width] for dy in range(size) for dx in range(size)]
+
+
+def _median3(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """Elementwise median of three arrays"""
+    return np.maximum(np.minimum(a, b), np.minimum(np.maximum(a, b), c))
+
+
+def median(array: np.ndarray, size=3) -> np.ndarray:
+    """Median of each size x size neighbourhood (ImageFilter.MedianFilter)"""
+    size = int(size)
+    if size != 3:
+        return np.median(np.stack(_shifted(array, size)), axis=0).astype(np.uint8)
+    # Sort each vertical triple once; the 3x3 median is then the median of
+    # (largest low, median of middles, smallest high) across the three columns
+    pad = [(0, 0)] * (array.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(array, pad, mode='edge')
+    up, mid, down = padded[..., :-2, :], padded[..., 1:-1, :], padded[..., 2:, :]
+    low, high = np.minimum(up, mid), np.maximum(up, mid)
+    middle = np.maximum(low, np.minimum(high, down))
+    low, high = np.minimum(low, down), np.maximum(high, down)
+    width = array.shape[-1]
+
+    def columns(values):
+        return values[..., :width], values[..., 1:width + 1], values[..., 2:]
+    lows, middles, highs = columns(low), columns(middle), columns(high)
+    return _median3(np.maximum(np.maximum(lows[0], lows[1]), lows[2]),
+                    _median3(*middles),
+                    np.minimum(np.minimum(highs[0], highs[1]), highs[2]))
+
+
+def sharpen(array: np.ndarray) -> np.ndarray:
+    """3x3 sharpen with border pixels kept as they are (ImageFilter.SHARPEN)"""
+    if min(array.shape[-2:]) < 3:
+        return array.copy()
+    wide = array.astype(np.int16)
+    # 3x3 box sums, separably
+    rows = wide[..., :, :-2] + wide[..., :, 1:-1]
+    rows += wide[..., :, 2:]
+    box = rows[..., :-2, :] + rows[..., 1:-1, :]
+    box += rows[..., 2:, :]
+    # (32 * center - 2 * neighbours) / 16, rounded: (34 * center - 2 * box + 8) >> 4
+    value = wide[..., 1:-1, 1:-1] * np.int16(34)
+    value -= box * np.int16(2)
+    value += np.int16(8)
+    value >>= 4
+    out = array.copy()
+    out[..., 1:-1, 1:-1] = np.clip(value, 0, 255)
+    return out
+
+
+def upscale(array: np.ndarray, width=2000) -> np.ndarray:
+    """Lanczos-resize images narrower than width up to it"""
+    width = int(width)
+    height, current = array.shape[-2:]
+    if current >= width:
+        return array
+    size = (width, int(height * width / current))
+    images = array.reshape(-1, height, current)
+    resized = [np.asarray(Image.fromarray(image).resize(size, Image.Resampling.LANCZOS)) for image in images]
+    return np.stack(resized).reshape(array.shape[:-2] + resized[0].shape)
+
+
+def _gaussian_kernel(size: int) -> np.ndarray:
+    """1-D Gaussian taps with OpenCV's default sigma for the size"""
+    sigma = 0.3 * ((size - 1) * 0.5 - 1) + 0.8
+    taps = np.exp(-((np.arange(size) - size // 2) ** 2) / (2 * sigma ** 2))
+    return taps / taps.sum()
+
+
+def adaptive(array: np.ndarray, block=11, offset=2) -> np.ndarray:
+    """
+    Gaussian adaptive threshold followed by a 3x3 median, for uneven
+    lighting (cv2.adaptiveThreshold + cv2.medianBlur)
+    """
+    block = int(block)
+    taps = _gaussian_kernel(block)
+    margin = block // 2
+    source = array.astype(np.float32)
+    # Separable blur: rows, then columns, edges replicated
+    pad = [(0, 0)] * (array.ndim - 2)
+    rows = np.pad(source, pad + [(0, 0), (margin, margin)], mode='edge')
+    blurred = sum(tap * rows[..., :, i:i + array.shape[-1]] for i, tap in enumerate(taps))
+    cols = np.pad(blurred, pad + [(margin, margin), (0, 0)], mode='edge')
+    blurred = sum(tap * cols[..., i:i + array.shape[-2], :] for i, tap in enumerate(taps))
+    binary = np.where(source > np.floor(blurred + 0.5) - float(offset), 255, 0).astype(np.uint8)
+    return median(binary, 3)
+
+
+STEPS: Dict[str, Callable] = {
+    'contrast': contrast,
+    'brightness': brightness,
+    'autocontrast': autocontrast,
+    'binarize': binarize,
+    'otsu': otsu,
+    'adaptive': adaptive,
+    'median': median,
+    'sharpen': sharpen,
+    'upscale': upscale,
+}
+
+# Named chains of steps joined with "+"; anything else is parsed as a chain
+PREPROCESSORS: Dict[str, str] = {
+    'none': '',
+    'contrast': 'contrast',
+    # Stretch contrast and sharpen, for faint or soft scans
+    'enhance': 'autocontrast:1+sharpen',
+}
+
+
+def preprocessor(spec: str) -> Callable:
+    """
+    Resolve a preprocessing name or chain into one function
+
+    Args:
+        spec: Key of PREPROCESSORS, or steps like "median+contrast:2.5+sharpen"
+              ("name:arg" passes one argument to a step)
+
+    Returns:
+        Function taking a PIL image (returns a PIL image) or a uint8 array,
+        one image or an (N, H, W) stack (returns an array)
+    """
+    chain = PREPROCESSORS.get(spec, spec)
+    steps = []
+    for step in filter(None, chain.split('+')):
+        name, _, arg = step.partition(':')
+        if name not in STEPS:
+            raise ValueError(f"Unknown preprocessing step {name!r} in {spec!r}")
+        steps.append((STEPS[name], (arg,) if arg else ()))
+
+    def apply(image):
+        if not steps:
+            return image
+        array = to_array(image)
+        for step, args in steps:
+            array = step(array, *args)
+        return Image.fromarray(array) if isinstance(image, Image.Image) else array
+    return apply
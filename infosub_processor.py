@@ -10,13 +10,21 @@ import logging
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-import pdfplumber
-from PyPDF2 import PdfReader, PdfWriter
 import PyPDF2
-import fitz  # PyMuPDF for OCR
-from PIL import Image
-import pytesseract
-import tempfile
+
+import file_number_patterns
+import keyword_scanner
+import regex_engine
+import rule_profiler
+import rule_registry
+from document_context import DocumentContext
+from ocr_engines import available_engines, get_engine
+from ocr_ladder import OCRLadder, Rung, ocr_rung, uncovered_bands
+from ocr_profiles import load_profiles
+from ocr_pool import OCRExecutor
+from page_classifier import PAGE_BLANK, PAGE_MIXED, PAGE_SCANNED
+from page_regions import get_regions
+from split_writer import write_pages
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,44 +33,56 @@ logger = logging.getLogger(__name__)
 class InfoSubProcessor:
     """Processor for Information Subpoena with Restraining Notice documents"""
     
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output",
+                 regions: Optional[Dict[str, Dict[str, List]]] = None,
+                 ocr_engine: Optional[str] = None, profiles: Optional[str] = None):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.processed_documents = []
-        
-        # Document boundary markers (flexible patterns to handle line breaks and OCR variations)
-        self.start_markers = [
-            "INFORMATION SUBPOENA WITH RESTRAINING NOTICE",
-            "information subpoena with restraining notice",
-            "INFORMATION SUBPOENA WITH",  # Partial match for line break cases
-            "information subpoena with",
-            "INFORMATION SUBPOENA",  # Even more flexible
-            "information subpoena"
-        ]
-        
-        # File number patterns for IS documents (FIRM FILE NUMBERS ONLY - NOT INDEX NUMBERS)
-        # Only match actual firm file numbers, not court case index numbers
-        # Enhanced to include letter-prefixed patterns found in analysis
-        self.file_patterns = [
-            r'Firm\s+File\s+No[.:]?\s*([A-Z]{0,2}\d{6,8})',  # Firm File No. - conclusive IS pattern
-            r'File\s+No[.:]?\s*([A-Z]{0,2}\d{6,8})',  # File No. with 0-2 letter prefix
-            r'File\s+Number[.:]?\s*([A-Z]{0,2}\d{6,8})',  # File Number
-            r'Our\s+File\s+No[.:]?\s*([A-Z]{0,2}\d{6,8})',  # Our File No
-            r'Attorney\s+File\s+No[.:]?\s*([A-Z]{0,2}\d{6,8})',  # Attorney File No
-            r'Client\s+File\s+No[.:]?\s*([A-Z]{0,2}\d{6,8})',  # Client File No
-            # Account Number patterns found in analysis (L prefix examples)
-            r'Account\s+Number[.:]?\s*([A-Z]{0,2}\d{6,8})',  # Account Number
-            r'Account\s+No[.:]?\s*([A-Z]{0,2}\d{6,8})',  # Account No
-            # More flexible patterns for various formats
-            r'(?:Firm|File|Our|Attorney|Client)\s+(?:File\s+)?No[.:]?\s*([A-Z]{0,2}\d{6,8})',
-            r'(?:File|Firm)\s*#\s*([A-Z]{0,2}\d{6,8})',  # File # format
-        ]
-        
-        # Additional document types that are part of the same subpoena
-        self.continuation_markers = [
-            "EXEMPTION CLAIM FORM",
-            "exemption claim form"
-        ]
+
+        # Quick-mode OCR reads only the region where the subpoena title sits
+        self.start_marker_region = get_regions('IS', 'start_marker', regions)[0]
+        # Resolved to a concrete engine name so OCR pool workers use the same one
+        self.ocr_engine = get_engine(ocr_engine).name
+        # Trained profiles (see ocr_profiles) replace the built-in first rungs
+        trained = load_profiles(profiles)
+        start_profile = trained.get(('IS', 'start_marker'))
+        file_number_profile = trained.get(('IS', 'file_number'))
+        self.quick_rung = (start_profile.rung('start_marker') if start_profile
+                           else Rung('start_marker', 1.5, (self.start_marker_region,)))
+        # Full pages stitch in the quick-mode header instead of OCRing it again
+        self.page_rung = Rung('page', 2, None, reuse=(self.quick_rung,))
+        # File numbers: signature/account block crops first, then the full
+        # page, then a 300 dpi enhanced render, until one passes the format rules
+        self.file_number_ladder = OCRLadder([
+            file_number_profile.rung('file_number_regions') if file_number_profile
+            else Rung('file_number_regions', 1.5, tuple(get_regions('IS', 'file_number', regions))),
+            self.page_rung,
+            Rung('page_300dpi_enhanced', 300 / 72, None, 'enhance'),
+        ], self.ocr_engine)
+
+    # Markers and patterns come from the rules file on each use, so edits
+    # reach running processors (see rule_registry)
+    @property
+    def start_markers(self) -> List[str]:
+        """
+        Document boundary markers (flexible patterns to handle line breaks and OCR
+        variations), matched case-insensitively from one scan per page (see keyword_scanner)
+        """
+        return keyword_scanner.IS_START_MARKERS
+
+    @property
+    def file_patterns(self) -> file_number_patterns.PatternSet:
+        """
+        File number patterns for IS documents (FIRM FILE NUMBERS ONLY - NOT INDEX NUMBERS),
+        compiled once and shared with the other extractors (see file_number_patterns)
+        """
+        return file_number_patterns.IS_FIRM
+
+    @property
+    def continuation_markers(self) -> List[str]:
+        """Additional document types that are part of the same subpoena"""
+        return keyword_scanner.IS_CONTINUATION_MARKERS
     
     def extract_file_number(self, text: str) -> Optional[str]:
         """
@@ -76,22 +96,10 @@ class InfoSubProcessor:
             File number or None if not found
         """
         # First try to find File No. - proper 6-8 digit file numbers
-        file_patterns = [
-            r'Firm\s+File\s+No[.:]?\s*([A-Z]?\d{6,8})',  # Firm File No
-            r'File\s+No[.:]?\s*([A-Z]?\d{6,8})',  # File No
-            r'Our\s+File\s+No[.:]?\s*([A-Z]?\d{6,8})',  # Our File No
-            r'Attorney\s+File\s+No[.:]?\s*([A-Z]?\d{6,8})',  # Attorney File No
-            r'Client\s+File\s+No[.:]?\s*([A-Z]?\d{6,8})',  # Client File No
-        ]
-
-        for pattern in file_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                file_number = match.group(1).strip().upper()
-                file_number = re.sub(r'[^A-Z0-9]', '', file_number)
-                file_number = self._apply_ocr_corrections(file_number)
-                if len(file_number) >= 6:  # Proper file number length requirement
-                    return file_number
+        for candidate in self.file_patterns.scan(text):
+            file_number = self._apply_ocr_corrections(file_number_patterns.normalize(candidate.value))
+            if len(file_number) >= 6:  # Proper file number length requirement
+                return file_number
 
         # Do NOT fall back to Index numbers - only return actual firm file numbers
         # If no firm file number found, return None (document should be marked incomplete)
@@ -112,8 +120,8 @@ class InfoSubProcessor:
             r'Case\s+No[.]?\s*([A-Z0-9\-/]+)',
         ]
 
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for i, pattern in enumerate(patterns):
+            match = rule_profiler.search(f'index_number.{i}', pattern, text, re.IGNORECASE)
             if match:
                 index_no = match.group(1).strip().upper()
                 index_no = re.sub(r'[^A-Z0-9\-/]', '', index_no)
@@ -134,26 +142,10 @@ class InfoSubProcessor:
         if not file_number:
             return file_number
 
-        # Common OCR corrections for IS file numbers
-        corrections = {
-            r'^32(\d{6})$': r'J2\1',    # J2 misread as 32
-            r'^3(\d{7})$': r'J\1',       # J misread as 3
-            r'^6(\d{7})$': r'G\1',       # G misread as 6
-            r'^0(\d{7})$': r'G\1',       # G misread as 0
-            r'^1(\d{7})$': r'L\1',       # L misread as 1
-            r'^11(\d{6})$': r'L1\1',    # L1 misread as 11
-            r'^12(\d{6})$': r'L2\1',    # L2 misread as 12
-            r'^I(\d{7})$': r'L\1',       # L misread as I
-            r'^L(\d{6})$': r'L\g<1>0',  # Add missing 0 if too short
-        }
-
-        corrected = file_number
-        for pattern, replacement in corrections.items():
-            if re.match(pattern, file_number):
-                corrected = re.sub(pattern, replacement, file_number)
-                if corrected != file_number:
-                    logger.info(f"OCR correction: {file_number} -> {corrected}")
-                break
+        # Common OCR corrections for IS file numbers (rules file, first match applies)
+        corrected = rule_registry.current().corrections['is_file_number'].apply(file_number)
+        if corrected != file_number:
+            logger.info(f"OCR correction: {file_number} -> {corrected}")
 
         return corrected
     
@@ -167,11 +159,7 @@ class InfoSubProcessor:
         Returns:
             True if page starts a new document
         """
-        text_clean = text.strip().upper()
-        for marker in self.start_markers:
-            if marker.upper() in text_clean:
-                return True
-        return False
+        return keyword_scanner.scan(text).any(self.start_markers)
     
     def is_blank_page(self, text: str) -> bool:
         """
@@ -191,16 +179,8 @@ class InfoSubProcessor:
             return True
         
         # Check for common "blank" page indicators
-        blank_indicators = [
-            'this page intentionally left blank',
-            'blank page',
-            '[blank]'
-        ]
-        
-        text_lower = text.lower()
-        for indicator in blank_indicators:
-            if indicator in text_lower:
-                return True
+        if keyword_scanner.scan(text).any(keyword_scanner.BLANK_PAGE_INDICATORS):
+            return True
         
         return False
     
@@ -214,123 +194,149 @@ class InfoSubProcessor:
         Returns:
             True if page continues current document
         """
-        text_upper = text.upper()
-        for marker in self.continuation_markers:
-            if marker.upper() in text_upper:
-                return True
-        return False
+        return keyword_scanner.scan(text).any(self.continuation_markers)
 
-    def _extract_text_with_ocr(self, pdf_path: str, page_num: int, quick_mode: bool = False) -> str:
+    def ocr_page(self, context: DocumentContext, page_num: int, rung: Rung) -> Optional[str]:
+        """OCR a page as one rung describes (cached per page), None on failure"""
+        return ocr_rung(context, page_num, rung, self.ocr_engine)
+
+    def _extract_text_with_ocr(self, pdf_path: str, page_num: int, quick_mode: bool = False,
+                               context: Optional[DocumentContext] = None) -> str:
         """
         Extract text from a page using OCR
 
         Args:
             pdf_path: Path to PDF file
             page_num: Page number (0-indexed)
-            quick_mode: If True, only OCR top portion of page for faster processing
+            quick_mode: If True, only OCR the start-marker region for faster processing
+            context: Shared DocumentContext; reuses its open fitz document and
+                     caches the OCR result per page (also across runs).
+                     Pages are OCR'd from in-memory grayscale renders
 
         Returns:
             Extracted text from OCR
         """
-        try:
-            doc = fitz.open(pdf_path)
-            if page_num >= len(doc):
-                return ""
-
-            page = doc[page_num]
+        if context is None:
+            with DocumentContext(pdf_path) as ctx:
+                return self._extract_text_with_ocr(pdf_path, page_num, quick_mode, ctx)
 
-            # Get page dimensions
-            rect = page.rect
-
-            # In quick mode, only scan top 30% of page for faster boundary detection
-            if quick_mode:
-                clip_rect = fitz.Rect(0, 0, rect.width, rect.height * 0.3)
-                pix = page.get_pixmap(matrix=fitz.Matrix(1.5, 1.5), clip=clip_rect)
-            else:
-                # Full page at reasonable resolution
-                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-
-            # Convert to PIL Image
-            img_data = pix.tobytes("png")
-
-            # Create temp file for OCR
-            temp_img = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-            temp_img.write(img_data)
-            temp_img.close()
-
-            # Perform OCR
-            text = pytesseract.image_to_string(Image.open(temp_img.name))
-
-            # Clean up temp file
-            os.unlink(temp_img.name)
-            doc.close()
-
-            return text
-
-        except Exception as e:
-            logger.error(f"OCR extraction failed for page {page_num}: {e}")
+        if page_num >= context.page_count:
             return ""
+        return self.ocr_page(context, page_num, self.quick_rung if quick_mode else self.page_rung) or ""
+
+    def _read_file_number(self, ctx: DocumentContext, ocr: OCRExecutor,
+                          page_num: int, known_text: str) -> Tuple[Optional[str], str]:
+        """
+        OCR a scanned page for its file number up the escalation ladder
 
-    def find_document_boundaries(self, pdf_path: str) -> List[Tuple[int, int, str, str]]:
+        Returns:
+            Tuple of (file number, page text); the text covers the whole page,
+            keeping what was already known about it (e.g. the quick-mode
+            header), so later checks for start markers and index numbers see
+            as much as a full-page pass would
+        """
+        file_number, text, rung_name = self.file_number_ladder.read(ctx, page_num, self.extract_file_number, ocr.text)
+        rung = next((rung for rung in self.file_number_ladder.rungs if rung.name == rung_name), None)
+        if rung is not None and rung.regions:
+            text = self._complete_page_text(ocr, page_num, rung, text, known_text)
+        if known_text in text:
+            return file_number, text  # Stitched full page already includes it
+        return file_number, "\n".join(part for part in (known_text, text) if part)
+
+    def _complete_page_text(self, ocr: OCRExecutor, page_num: int, rung: Rung,
+                            crop_text: str, known_text: str) -> str:
+        """
+        Page text around the crops a file number was read from: OCR only the
+        bands neither the crops nor the quick-mode header cover, and stitch
+        them in top to bottom (a full page when the crops aren't full width)
+        """
+        pieces = [(rung.regions, crop_text)]
+        if known_text:
+            pieces.append((self.quick_rung.regions, known_text))
+        bands = uncovered_bands([region for regions, _ in pieces for region in regions])
+        if bands is None:
+            return ocr.text(page_num, self.page_rung)
+        if bands:
+            pieces.append((bands, ocr.text(page_num, Rung('missing_bands', rung.zoom, bands,
+                                                          rung.preprocess, rung.config))))
+        pieces.sort(key=lambda piece: min(region[1] for region in piece[0]))
+        return "\n".join(text for _, text in pieces if text)
+
+    def find_document_boundaries(self, pdf_path: str, context: Optional[DocumentContext] = None,
+                                 workers: Optional[int] = None) -> List[Tuple[int, int, str, str]]:
         """
         Find document boundaries in PDF with smart OCR for scanned documents
 
         Args:
             pdf_path: Path to PDF file
+            context: Shared DocumentContext (optional)
+            workers: OCR worker processes; pages the detector will OCR are
+                     submitted ahead and read back in page order, so the
+                     boundaries are the same as with serial OCR
 
         Returns:
             List of tuples: (start_page, end_page, file_number, index_number)
         """
+        ctx = context or DocumentContext(pdf_path)
+        try:
+            with OCRExecutor(self, ctx, workers) as ocr:
+                return self._find_boundaries_with_context(pdf_path, ctx, ocr)
+        finally:
+            if context is None:
+                ctx.close()
+
+    def _find_boundaries_with_context(self, pdf_path: str, ctx: DocumentContext,
+                                      ocr: OCRExecutor) -> List[Tuple[int, int, str, str]]:
+        """Boundary detection against an open DocumentContext"""
         boundaries = []
         pages_text = []
 
-        # First, try quick text extraction to detect if it's scanned
-        is_scanned = False
+        # Per-page strategy from the classification map: read the text layer,
+        # OCR, or skip. Mixed pages whose text layer is empty are OCR'd too.
+        needs_ocr = []
         try:
-            reader = PyPDF2.PdfReader(pdf_path)
-            num_pages = len(reader.pages)
-
-            # Sample a few pages to check if scanned
-            sample_pages = [0, min(4, num_pages-1), min(10, num_pages-1)]
-            empty_count = 0
-
-            for page_idx in sample_pages:
-                if page_idx < num_pages:
-                    page = reader.pages[page_idx]
-                    text = page.extract_text() or ""
-                    if len(text.strip()) < 50:  # Very little text
-                        empty_count += 1
-
-            # If most sample pages are empty, it's likely scanned
-            is_scanned = empty_count >= len(sample_pages) - 1
-
-            if is_scanned:
-                logger.info(f"Detected scanned document, using OCR strategy for {num_pages} pages")
-                # For scanned docs, scan more frequently for IS documents
-                # IS documents are typically 7 pages each, scan strategically
-                for page_num in range(num_pages):
-                    # OCR first 3 pages and every 3rd page for better boundary detection
-                    # Also scan signature pages (7, 14, 21, 28, etc.)
-                    if page_num < 3 or page_num % 3 == 0 or (page_num + 1) % 7 == 0:
-                        logger.debug(f"OCR scanning page {page_num + 1} (quick mode)")
-                        text = self._extract_text_with_ocr(pdf_path, page_num, quick_mode=True)
-                    else:
-                        text = ""  # Will be filled in later if needed
-                    pages_text.append(text)
-            else:
-                # Not scanned, use PyPDF2 for all pages
-                for page in reader.pages:
-                    text = page.extract_text() or ""
-                    pages_text.append(text)
+            num_pages = ctx.page_count
+            page_types = ctx.page_types
+            counts = {page_type: page_types.count(page_type) for page_type in set(page_types)}
+            logger.info(f"Page types for {num_pages} pages: {counts}")
+
+            for page_num, page_type in enumerate(page_types):
+                if page_type == PAGE_BLANK:
+                    text = ""
+                elif page_type == PAGE_SCANNED:
+                    text = None
+                else:
+                    text = ctx.get_page_text(page_num, "pypdf2")
+                    if page_type == PAGE_MIXED and self.is_blank_page(text):
+                        text = None
+
+                needs_ocr.append(text is None)
+                pages_text.append(text)
+
+            # A batch scanned crooked fails every quick crop; straighten all
+            # renders by what one scanned page shows before any OCR runs
+            if any(needs_ocr):
+                ctx.detect_orientation([page_num for page_num in range(num_pages) if needs_ocr[page_num]],
+                                       self.ocr_engine)
+
+            # IS documents are typically 7 pages each, scan strategically:
+            # OCR first 3 pages and every 3rd page for better boundary detection
+            # Also scan signature pages (7, 14, 21, 28, etc.)
+            quick_pages = [page_num for page_num in range(num_pages) if needs_ocr[page_num]
+                           and (page_num < 3 or page_num % 3 == 0 or (page_num + 1) % 7 == 0)]
+            ocr.submit(quick_pages, self.quick_rung)
+            for page_num in quick_pages:
+                logger.debug(f"OCR scanning page {page_num + 1} (quick mode)")
+                pages_text[page_num] = ocr.text(page_num, self.quick_rung)
+            # The rest will be filled in later if needed
+            pages_text = ["" if text is None else text for text in pages_text]
 
         except Exception as e:
             logger.error(f"Error in boundary detection: {e}")
             # Fallback to PyPDF2
             try:
-                reader = PyPDF2.PdfReader(pdf_path)
-                for page in reader.pages:
-                    text = page.extract_text() or ""
-                    pages_text.append(text)
+                pages_text = [page.extract_text() or "" for page in PyPDF2.PdfReader(pdf_path).pages]
+                needs_ocr = [False] * len(pages_text)
             except:
                 return boundaries
         
@@ -338,6 +344,14 @@ class InfoSubProcessor:
             logger.warning(f"No text found in PDF: {pdf_path}")
             return boundaries
         
+        # Page 2 of each subpoena is OCR'd for its file number; start the
+        # ladder's first rung now so the loop below mostly collects finished
+        # results (higher rungs run on demand)
+        first_rung = self.file_number_ladder.rungs[0]
+        ocr.submit([page_num + 1 for page_num, text in enumerate(pages_text[:-1])
+                    if needs_ocr[page_num + 1] and not self.is_blank_page(text)
+                    and self.is_document_start(text)], first_rung)
+
         current_start = None
         current_file_number = None
         current_index_number = None
@@ -348,10 +362,10 @@ class InfoSubProcessor:
                 logger.debug(f"Skipping blank page {page_num + 1}")
                 continue
 
-            # For scanned docs with empty text, do full OCR if needed
-            if is_scanned and not text and current_start is not None:
+            # For scanned pages with empty text, do full OCR if needed
+            if needs_ocr[page_num] and not text and current_start is not None:
                 # We're in a document, need to check this page
-                text = self._extract_text_with_ocr(pdf_path, page_num, quick_mode=False)
+                text = ocr.text(page_num, self.page_rung)
                 pages_text[page_num] = text
 
             # Extract Index number from this page
@@ -381,12 +395,11 @@ class InfoSubProcessor:
                 current_index_number = page_index
                 logger.info(f"Found new subpoena starting at page {page_num + 1}")
 
-                # For scanned docs, OCR the next page (page 2) for file number
-                if is_scanned and page_num + 1 < len(pages_text):
+                # For scanned pages, OCR the next page (page 2) for file number
+                if page_num + 1 < len(pages_text) and needs_ocr[page_num + 1]:
                     logger.debug(f"OCR scanning page {page_num + 2} for file number")
-                    next_text = self._extract_text_with_ocr(pdf_path, page_num + 1, quick_mode=False)
-                    pages_text[page_num + 1] = next_text
-                    file_number = self.extract_file_number(next_text)
+                    file_number, pages_text[page_num + 1] = self._read_file_number(
+                        ctx, ocr, page_num + 1, pages_text[page_num + 1])
                     if file_number:
                         current_file_number = file_number
                         logger.info(f"Found file number via OCR: {file_number}")
@@ -394,10 +407,10 @@ class InfoSubProcessor:
             # Look for file number on current page if we're in a document
             elif current_start is not None and current_file_number is None:
                 # Check current page for file number
-                if not text and is_scanned:
+                if not text and needs_ocr[page_num]:
                     # Need to OCR this page for file number
                     logger.debug(f"OCR scanning page {page_num + 1} for file number")
-                    text = self._extract_text_with_ocr(pdf_path, page_num, quick_mode=False)
+                    text = ocr.text(page_num, self.page_rung)
                     pages_text[page_num] = text
 
                 file_number = self.extract_file_number(text)
@@ -411,6 +424,9 @@ class InfoSubProcessor:
 
         # After processing all pages, scan all documents for missing file numbers
         logger.info("Performing comprehensive file number scan across all pages...")
+        ocr.submit([scan_page for start, end, file_num, _ in boundaries if file_num is None
+                    for scan_page in range(start, end + 1)
+                    if needs_ocr[scan_page] and not pages_text[scan_page]], first_rung)
         for i, (start, end, file_num, index_num) in enumerate(boundaries):
             if file_num is None:
                 logger.info(f"Scanning all pages of document {i+1} (pages {start+1}-{end+1}) for file number")
@@ -418,25 +434,31 @@ class InfoSubProcessor:
                     # Get or extract text for this page
                     scan_text = pages_text[scan_page] if scan_page < len(pages_text) and pages_text[scan_page] else ""
 
-                    # If no text and this is a scanned doc, OCR this page
-                    if not scan_text and is_scanned and scan_page < len(pages_text):
+                    # If no text and this is a scanned page, OCR this page
+                    if not scan_text and scan_page < len(pages_text) and needs_ocr[scan_page]:
                         logger.debug(f"OCR scanning page {scan_page + 1} for comprehensive file number search")
-                        scan_text = self._extract_text_with_ocr(pdf_path, scan_page, quick_mode=False)
-                        pages_text[scan_page] = scan_text
-
-                    # Check for file number in this page
-                    found_file_number = self.extract_file_number(scan_text)
+                        found_file_number, pages_text[scan_page] = self._read_file_number(ctx, ocr, scan_page, "")
+                    else:
+                        # Check for file number in this page
+                        found_file_number = self.extract_file_number(scan_text)
                     if found_file_number:
                         boundaries[i] = (start, end, found_file_number, index_num)
                         logger.info(f"Found file number on page {scan_page + 1}: {found_file_number}")
                         break
         
+        # Blank status for every page, computed once from the text gathered
+        # above and reused by process_pdf when writing output files. Scanned
+        # pages are never treated as blank (blank detection on OCR text is
+        # unreliable)
+        blank_pages = [not ocr and self.is_blank_page(text) for text, ocr in zip(pages_text, needs_ocr)]
+        ctx.blank_pages = blank_pages
+
         # Filter out documents that are too short (likely errors)
         valid_boundaries = []
         for start, end, file_num, index_num in boundaries:
             non_blank_pages = []
             for i in range(start, end + 1):
-                if not self.is_blank_page(pages_text[i]):
+                if not blank_pages[i]:
                     non_blank_pages.append(i)
             
             if len(non_blank_pages) >= 1:  # At least one non-blank page
@@ -446,12 +468,16 @@ class InfoSubProcessor:
         
         return valid_boundaries
     
-    def process_pdf(self, input_pdf_path: str) -> List[Dict]:
+    def process_pdf(self, input_pdf_path: str, context: Optional[DocumentContext] = None,
+                    workers: Optional[int] = None) -> List[Dict]:
         """
         Process PDF and split into individual subpoena documents
 
         Args:
             input_pdf_path: Path to input PDF
+            context: Shared DocumentContext; boundary detection, blank page
+                     checks and page copying all reuse its parsed handles
+            workers: OCR worker processes for scanned pages (default: serial)
 
         Returns:
             List of processed document info
@@ -461,26 +487,19 @@ class InfoSubProcessor:
             logger.error(f"Input file not found: {input_pdf_path}")
             return []
 
+        ctx = context or DocumentContext(input_pdf_path)
+        try:
+            return self._process_with_context(input_pdf_path, input_path, ctx, workers)
+        finally:
+            if context is None:
+                ctx.close()
+
+    def _process_with_context(self, input_pdf_path: str, input_path: Path,
+                              ctx: DocumentContext, workers: Optional[int] = None) -> List[Dict]:
+        """Split and write subpoena documents using an open DocumentContext"""
         try:
-            reader = PdfReader(input_pdf_path)
-            total_pages = len(reader.pages)
+            total_pages = ctx.page_count
             logger.info(f"Processing {input_path.name}: {total_pages} pages")
-
-            # Detect if document is scanned
-            is_scanned = False
-            sample_pages = [0, min(4, total_pages-1), min(10, total_pages-1)]
-            empty_count = 0
-            for page_idx in sample_pages:
-                if page_idx < total_pages:
-                    page = reader.pages[page_idx]
-                    text = page.extract_text() or ""
-                    if len(text.strip()) < 50:
-                        empty_count += 1
-            is_scanned = empty_count >= len(sample_pages) - 1
-
-            if is_scanned:
-                logger.info("Detected scanned document - skipping blank page detection")
-
         except Exception as e:
             logger.error(f"Error reading PDF: {e}")
             logger.exception("Full traceback:")
@@ -488,7 +507,7 @@ class InfoSubProcessor:
 
         # Find document boundaries
         try:
-            boundaries = self.find_document_boundaries(input_pdf_path)
+            boundaries = self.find_document_boundaries(input_pdf_path, context=ctx, workers=workers)
         except Exception as e:
             logger.error(f"Error finding document boundaries: {e}")
             logger.exception("Full traceback:")
@@ -550,33 +569,21 @@ class InfoSubProcessor:
 
                 output_path = output_subdir / output_filename
 
-                # Create new PDF with only non-blank pages
-                writer = PdfWriter()
-                pages_included = 0
-
+                # Create new PDF with only non-blank pages (blank map was
+                # filled in during boundary detection; it never marks
+                # scanned pages as blank)
+                pages = []
                 for page_num in range(start_page, end_page + 1):
-                    if page_num < len(reader.pages):
-                        # For scanned documents, include all pages
-                        # For text documents, check if blank
-                        if is_scanned:
-                            # Include all pages for scanned docs (blank detection unreliable)
-                            writer.add_page(reader.pages[page_num])
-                            pages_included += 1
+                    if page_num < total_pages:
+                        if not ctx.blank_pages[page_num]:
+                            pages.append(page_num)
                         else:
-                            # Check if page is blank by extracting text
-                            with pdfplumber.open(input_pdf_path) as pdf:
-                                if page_num < len(pdf.pages):
-                                    page_text = pdf.pages[page_num].extract_text() or ""
-                                    if not self.is_blank_page(page_text):
-                                        writer.add_page(reader.pages[page_num])
-                                        pages_included += 1
-                                    else:
-                                        logger.debug(f"Excluding blank page {page_num + 1}")
+                            logger.debug(f"Excluding blank page {page_num + 1}")
+                pages_included = len(pages)
 
                 # Only save if we have pages
                 if pages_included > 0:
-                    with open(output_path, 'wb') as output_file:
-                        writer.write(output_file)
+                    write_pages(ctx.fitz_doc, pages, output_path)
 
                     doc_info = {
                         'file_number': file_number or f"UNKNOWN_{doc_idx + 1:03d}",
@@ -638,6 +645,8 @@ class InfoSubProcessor:
             'processing_date': datetime.now().isoformat(),
             'document_type': 'Information Subpoena with Restraining Notice',
             'total_documents': len(self.processed_documents),
+            # How often each OCR escalation rung found a valid file number
+            'ocr_ladder': self.file_number_ladder.hit_rates(),
             'documents': self.processed_documents
         }
 
@@ -734,6 +743,7 @@ Examples:
   %(prog)s input.pdf                    # Process single PDF
   %(prog)s input.pdf -o custom_output   # Custom output directory
   %(prog)s input.pdf --debug            # Enable debug logging
+  %(prog)s scanned.pdf -j 8             # OCR scanned pages in 8 processes
         """
     )
     
@@ -742,18 +752,33 @@ Examples:
                        help='Output directory (default: output)')
     parser.add_argument('--debug', action='store_true',
                        help='Enable debug logging')
+    parser.add_argument('-j', '--workers', type=int,
+                       help='OCR scanned pages in this many processes (default: serial)')
+    parser.add_argument('--ocr-engine', default=None, choices=['auto'] + available_engines(),
+                       help='OCR engine (default: tesserocr if installed, else tesseract)')
+    parser.add_argument('--profiles', default=None,
+                       help='OCR profile file from the trainers (default: ocr_profiles.json)')
+    parser.add_argument('--profile-rules', metavar='REPORT', default=None,
+                       help='Write per-pattern calls, hits and timings to REPORT (.json for JSON)')
+    parser.add_argument('--regex-engine', default=None, choices=['auto'] + regex_engine.available_engines(),
+                       help='Regex engine for the extraction patterns (default: MAILROOM_REGEX_ENGINE or re)')
     
     args = parser.parse_args()
     
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
+    if args.profile_rules:
+        rule_profiler.enable(args.profile_rules)
+    if args.regex_engine:
+        regex_engine.set_engine(args.regex_engine)
     
     if not os.path.exists(args.input_pdf):
         print(f"Error: Input file '{args.input_pdf}' not found")
         return 1
     
-    processor = InfoSubProcessor(output_dir=args.output)
-    results = processor.process_pdf(args.input_pdf)
+    processor = InfoSubProcessor(output_dir=args.output, ocr_engine=args.ocr_engine,
+                                 profiles=args.profiles)
+    results = processor.process_pdf(args.input_pdf, workers=args.workers)
     
     if results:
         processor.print_summary()
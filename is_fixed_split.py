@@ -5,8 +5,8 @@ IS documents are typically 7-8 pages each
 """
 import sys
 from pathlib import Path
-from PyPDF2 import PdfReader, PdfWriter
-import pdfplumber
+from document_context import DocumentContext
+from split_writer import write_splits
 import re
 import logging
 
@@ -39,19 +39,18 @@ def split_is_fixed(input_pdf, output_dir="is_split_output", pages_per_doc=7):
     output_path.mkdir(exist_ok=True)
 
     try:
-        reader = PdfReader(input_pdf)
-        total_pages = len(reader.pages)
-        logger.info(f"Input PDF has {total_pages} pages")
-
         # Extract all text for file number detection
         all_text = []
-        with pdfplumber.open(input_pdf) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text() or ""
-                all_text.append(text)
+        with DocumentContext(input_pdf, backend="pdfplumber") as context:
+            total_pages = context.page_count
+            logger.info(f"Input PDF has {total_pages} pages")
+
+            for page_num in range(total_pages):
+                all_text.append(context.get_page_text(page_num))
 
         doc_count = 0
         results = []
+        split_jobs = []  # (pages, output file), written together below
 
         for start_page in range(0, total_pages, pages_per_doc):
             end_page = min(start_page + pages_per_doc, total_pages)
@@ -61,11 +60,6 @@ def split_is_fixed(input_pdf, output_dir="is_split_output", pages_per_doc=7):
             doc_text = "\n".join(all_text[start_page:end_page])
             file_number = extract_file_number(doc_text)
 
-            # Create output PDF
-            writer = PdfWriter()
-            for page_num in range(start_page, end_page):
-                writer.add_page(reader.pages[page_num])
-
             # Output filename
             if file_number:
                 output_file = output_path / f"{file_number}_IS.pdf"
@@ -74,9 +68,7 @@ def split_is_fixed(input_pdf, output_dir="is_split_output", pages_per_doc=7):
                 output_file = output_path / f"INCOMPLETE_{doc_count:02d}_IS.pdf"
                 status = "Incomplete (no file number)"
 
-            with open(output_file, 'wb') as f:
-                writer.write(f)
-
+            split_jobs.append((range(start_page, end_page), output_file))
             logger.info(f"Created: {output_file.name} (pages {start_page+1}-{end_page}) - {status}")
 
             results.append({
@@ -86,6 +78,9 @@ def split_is_fixed(input_pdf, output_dir="is_split_output", pages_per_doc=7):
                 'status': status
             })
 
+        # Write all PDFs from one open copy of the input
+        write_splits(input_pdf, split_jobs)
+
         # Summary
         logger.info(f"\n✅ Split into {doc_count} documents")
         complete = sum(1 for r in results if r['file_number'])
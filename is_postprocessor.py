@@ -8,21 +8,42 @@ import os
 import logging
 from pathlib import Path
 from typing import Dict, Optional
-import pdfplumber
+
+import file_number_patterns
+import rule_profiler
+import rule_registry
+from document_context import DocumentContext
+from text_backends import DEFAULT_BACKEND, available_backends
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# "Attorney for Judgment Creditor" on page 2, with OCR variations: spaces
+# within words and line breaks (searched IGNORECASE | DOTALL, in order)
+ATTORNEY_PATTERNS = [
+    r'Attorney\s+for\s+Judgment\s+Creditor',
+    r'Attorney\s+for\s+Ju\s*dgment\s+Creditor',  # Space in Judgment
+    r'Attorney\s+for\s+J',  # Minimum pattern - just "Attorney for J"
+    r'Attorney.*Creditor',  # Flexible across lines
+    r'Attorn.*for.*Creditor'  # Even more flexible for bad OCR
+]
+
 
 class ISPostProcessor:
     """Post-process IS documents to extract and correct file numbers"""
 
-    def validate_is_document_structure(self, pdf_path: Path) -> Dict[str, any]:
+    def __init__(self, text_backend: str = DEFAULT_BACKEND):
+        self.text_backend = text_backend
+
+    def validate_is_document_structure(self, pdf_path: Path,
+                                       context: Optional[DocumentContext] = None) -> Dict[str, any]:
         """
         Validate that IS document has correct structure:
         - Page 2 should contain "Attorney for Judgment Creditor" and "File No."
         - Document should be 7 pages (or less for last document)
 
+        Pass a shared DocumentContext to reuse page text across checks.
+
         Returns dict with validation results
         """
         validation = {
@@ -34,131 +55,102 @@ class ISPostProcessor:
             'issues': []
         }
 
+        ctx = context or DocumentContext(pdf_path, backend=self.text_backend)
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                validation['page_count'] = len(pdf.pages)
-
-                # Check if it's a valid IS document size (7 pages or less)
-                if validation['page_count'] > 7:
-                    validation['issues'].append(f"Document has {validation['page_count']} pages, expected 7 or less")
-
-                # Check page 2 for required patterns
-                if len(pdf.pages) >= 2:
-                    page2_text = pdf.pages[1].extract_text() or ''
-
-                    # Check for "Attorney for Judgment Creditor" (with OCR variations)
-                    # Allow for spaces within words and line breaks
-                    attorney_patterns = [
-                        r'Attorney\s+for\s+Judgment\s+Creditor',
-                        r'Attorney\s+for\s+Ju\s*dgment\s+Creditor',  # Space in Judgment
-                        r'Attorney\s+for\s+J',  # Minimum pattern - just "Attorney for J"
-                        r'Attorney.*Creditor',  # Flexible across lines
-                        r'Attorn.*for.*Creditor'  # Even more flexible for bad OCR
-                    ]
-
-                    found_attorney = False
-                    for pattern in attorney_patterns:
-                        if re.search(pattern, page2_text, re.IGNORECASE | re.DOTALL):
-                            validation['has_attorney_pattern'] = True
-                            found_attorney = True
-                            break
-
-                    if not found_attorney:
-                        validation['issues'].append("Page 2 missing 'Attorney for J...' pattern")
-
-                    # Check for "File No."
-                    file_no_match = re.search(r'File\s*No[.:]\s*([A-Z0-9]{2,8})', page2_text, re.IGNORECASE)
-                    if file_no_match:
-                        validation['has_file_number'] = True
-                        file_number = file_no_match.group(1).strip().upper()
-                        validation['file_number'] = self.apply_ocr_corrections(file_number)
-                    else:
-                        validation['issues'].append("Page 2 missing 'File No.' pattern")
+            validation['page_count'] = ctx.page_count
+
+            # Check if it's a valid IS document size (7 pages or less)
+            if validation['page_count'] > 7:
+                validation['issues'].append(f"Document has {validation['page_count']} pages, expected 7 or less")
+
+            # Check page 2 for required patterns
+            if validation['page_count'] >= 2:
+                page2_text = ctx.get_page_text(1)
+
+                # Check for "Attorney for Judgment Creditor" (with OCR variations)
+                found_attorney = False
+                for i, pattern in enumerate(ATTORNEY_PATTERNS):
+                    if rule_profiler.search(f'is_attorney.{i}', pattern, page2_text, re.IGNORECASE | re.DOTALL):
+                        validation['has_attorney_pattern'] = True
+                        found_attorney = True
+                        break
+
+                if not found_attorney:
+                    validation['issues'].append("Page 2 missing 'Attorney for J...' pattern")
+
+                # Check for "File No."
+                candidates = file_number_patterns.IS_SIGNATURE.scan(page2_text)
+                if candidates:
+                    validation['has_file_number'] = True
+                    file_number = candidates[0].value.strip().upper()
+                    validation['file_number'] = self.apply_ocr_corrections(file_number)
                 else:
-                    validation['issues'].append("Document has less than 2 pages")
+                    validation['issues'].append("Page 2 missing 'File No.' pattern")
+            else:
+                validation['issues'].append("Document has less than 2 pages")
 
-                # Document is valid if it has the required patterns on page 2
-                validation['valid'] = (validation['has_attorney_pattern'] and
-                                      validation['has_file_number'] and
-                                      validation['page_count'] <= 7)
+            # Document is valid if it has the required patterns on page 2
+            validation['valid'] = (validation['has_attorney_pattern'] and
+                                  validation['has_file_number'] and
+                                  validation['page_count'] <= 7)
 
         except Exception as e:
             validation['issues'].append(f"Error reading PDF: {e}")
+        finally:
+            if context is None:
+                ctx.close()
 
         return validation
 
     def apply_ocr_corrections(self, file_number: str) -> str:
-        """Apply OCR corrections to file numbers"""
+        """Apply OCR corrections to file numbers (rules file, each rule in turn)"""
         if not file_number:
             return file_number
 
-        # Fix first character if it's '1' and should be 'L'
-        if len(file_number) >= 7 and file_number[0] == '1':
-            if file_number[1:].isdigit() or (len(file_number) == 8 and file_number[1:].isdigit()):
-                file_number = 'L' + file_number[1:]
-
-        # Fix YL -> Y1 (second char should be 1 not L)
-        if file_number.startswith('YL'):
-            file_number = 'Y1' + file_number[2:]
-
-        # Fix truncated file numbers (add missing zeros)
-        if file_number.startswith('L') and len(file_number) == 7:
-            # Check if it looks like L240029 should be L2400290
-            if file_number[1:4].isdigit() and file_number[4:].isdigit():
-                # Likely missing a trailing 0
-                file_number = file_number + '0'
+        return rule_registry.current().corrections['is_split'].apply(file_number)
 
-        return file_number
-
-    def extract_file_number_comprehensive(self, pdf_path: Path) -> Optional[str]:
+    def extract_file_number_comprehensive(self, pdf_path: Path,
+                                          context: Optional[DocumentContext] = None) -> Optional[str]:
         """
         Comprehensive file number extraction from IS document
         Checks multiple pages and handles edge cases
         """
+        ctx = context or DocumentContext(pdf_path, backend=self.text_backend)
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                # Check first 3 pages for file number
-                for page_idx in range(min(3, len(pdf.pages))):
-                    text = pdf.pages[page_idx].extract_text() or ''
-
-                    # Patterns to search for
-                    patterns = [
-                        r'File\s*No[.:]\s*([A-Z0-9]{6,8})',
-                        r'Attorney.*\n.*File\s*No[.:]\s*([A-Z0-9]{6,8})',
-                        # Handle truncated at line end
-                        r'File\s*No[.:]\s*([A-Z0-9]{2,7})$',  # At end of line
-                        r'Account\s*Number[.:]\s*([A-Z0-9]{6,8})',
-                    ]
-
-                    for pattern in patterns:
-                        matches = re.finditer(pattern, text, re.IGNORECASE | re.MULTILINE)
-                        for match in matches:
-                            file_number = match.group(1).strip().upper()
-                            # Apply corrections
-                            file_number = self.apply_ocr_corrections(file_number)
-                            if len(file_number) >= 6:  # Valid file number length
+            page_count = ctx.page_count
+
+            # Check first 3 pages for file number
+            for page_idx in range(min(3, page_count)):
+                text = ctx.get_page_text(page_idx)
+
+                for candidate in file_number_patterns.IS_SPLIT.scan(text):
+                    # Apply corrections
+                    file_number = self.apply_ocr_corrections(candidate.value.strip().upper())
+                    if len(file_number) >= 6:  # Valid file number length
+                        return file_number
+
+            # Special case: check for truncated file numbers at page boundaries
+            if page_count >= 2:
+                page2_text = ctx.get_page_text(1)
+                lines = page2_text.split('\n')
+                for i, line in enumerate(lines):
+                    if 'File No.' in line:
+                        # Get this line and next few lines
+                        file_num_text = line
+                        for j in range(i + 1, min(i + 3, len(lines))):
+                            file_num_text += ' ' + lines[j]
+
+                        candidates = file_number_patterns.IS_WRAPPED.scan(file_num_text)
+                        if candidates:
+                            file_number = self.apply_ocr_corrections(candidates[0].value.strip().upper())
+                            if len(file_number) >= 6:
                                 return file_number
 
-                # Special case: check for truncated file numbers at page boundaries
-                if len(pdf.pages) >= 2:
-                    page2_text = pdf.pages[1].extract_text() or ''
-                    lines = page2_text.split('\n')
-                    for i, line in enumerate(lines):
-                        if 'File No.' in line:
-                            # Get this line and next few lines
-                            file_num_text = line
-                            for j in range(i + 1, min(i + 3, len(lines))):
-                                file_num_text += ' ' + lines[j]
-
-                            match = re.search(r'File\s*No[.:]\s*([A-Z0-9]{2,})', file_num_text, re.IGNORECASE)
-                            if match:
-                                file_number = match.group(1).strip().upper()
-                                file_number = self.apply_ocr_corrections(file_number)
-                                if len(file_number) >= 6:
-                                    return file_number
-
         except Exception as e:
             logger.error(f"Error extracting from {pdf_path}: {e}")
+        finally:
+            if context is None:
+                ctx.close()
 
         return None
 
@@ -183,55 +175,57 @@ class ISPostProcessor:
         validation_results = []
 
         for pdf_file in is_files:
-            # Validate document structure if requested
-            if validate_splits:
-                validation = self.validate_is_document_structure(pdf_file)
-                validation['filename'] = pdf_file.name
-                validation_results.append(validation)
-
-                if not validation['valid']:
-                    logger.warning(f"Invalid IS document structure: {pdf_file.name}")
-                    for issue in validation['issues']:
-                        logger.warning(f"  - {issue}")
-                    invalid_count += 1
-
-                    # Use file number from validation if found
-                    if validation['file_number'] and "UNKNOWN" in pdf_file.name:
-                        new_name = f"IS_{validation['file_number']}.pdf"
-                        new_path = pdf_file.parent / new_name
+            # One parsed handle per file, shared by validation and extraction
+            with DocumentContext(pdf_file, backend=self.text_backend) as context:
+                # Validate document structure if requested
+                if validate_splits:
+                    validation = self.validate_is_document_structure(pdf_file, context=context)
+                    validation['filename'] = pdf_file.name
+                    validation_results.append(validation)
+
+                    if not validation['valid']:
+                        logger.warning(f"Invalid IS document structure: {pdf_file.name}")
+                        for issue in validation['issues']:
+                            logger.warning(f"  - {issue}")
+                        invalid_count += 1
+
+                        # Use file number from validation if found
+                        if validation['file_number'] and "UNKNOWN" in pdf_file.name:
+                            new_name = f"IS_{validation['file_number']}.pdf"
+                            new_path = pdf_file.parent / new_name
+                            if not new_path.exists():
+                                os.rename(pdf_file, new_path)
+                                logger.info(f"Renamed invalid doc: {pdf_file.name} -> {new_name}")
+                                renamed_count += 1
+                        continue
+                # Skip if already has a valid file number
+                if "UNKNOWN" not in pdf_file.name:
+                    # Check if needs correction (like YL -> Y1)
+                    current_file_num = pdf_file.stem.replace("IS_", "")
+                    corrected = self.apply_ocr_corrections(current_file_num)
+                    if corrected != current_file_num:
+                        new_path = pdf_file.parent / f"IS_{corrected}.pdf"
                         if not new_path.exists():
                             os.rename(pdf_file, new_path)
-                            logger.info(f"Renamed invalid doc: {pdf_file.name} -> {new_name}")
-                            renamed_count += 1
+                            logger.info(f"Corrected: {pdf_file.name} -> IS_{corrected}.pdf")
+                            fixed_count += 1
                     continue
-            # Skip if already has a valid file number
-            if "UNKNOWN" not in pdf_file.name:
-                # Check if needs correction (like YL -> Y1)
-                current_file_num = pdf_file.stem.replace("IS_", "")
-                corrected = self.apply_ocr_corrections(current_file_num)
-                if corrected != current_file_num:
-                    new_path = pdf_file.parent / f"IS_{corrected}.pdf"
-                    if not new_path.exists():
-                        os.rename(pdf_file, new_path)
-                        logger.info(f"Corrected: {pdf_file.name} -> IS_{corrected}.pdf")
-                        fixed_count += 1
-                continue
 
-            # Extract file number
-            file_number = self.extract_file_number_comprehensive(pdf_file)
+                # Extract file number
+                file_number = self.extract_file_number_comprehensive(pdf_file, context=context)
 
-            if file_number:
-                new_name = f"IS_{file_number}.pdf"
-                new_path = pdf_file.parent / new_name
+                if file_number:
+                    new_name = f"IS_{file_number}.pdf"
+                    new_path = pdf_file.parent / new_name
 
-                if not new_path.exists():
-                    os.rename(pdf_file, new_path)
-                    logger.info(f"Renamed: {pdf_file.name} -> {new_name}")
-                    renamed_count += 1
+                    if not new_path.exists():
+                        os.rename(pdf_file, new_path)
+                        logger.info(f"Renamed: {pdf_file.name} -> {new_name}")
+                        renamed_count += 1
+                    else:
+                        logger.warning(f"Cannot rename {pdf_file.name}: {new_name} already exists")
                 else:
-                    logger.warning(f"Cannot rename {pdf_file.name}: {new_name} already exists")
-            else:
-                logger.warning(f"Could not extract file number from {pdf_file.name}")
+                    logger.warning(f"Could not extract file number from {pdf_file.name}")
 
         logger.info(f"Post-processing complete: {renamed_count} renamed, {fixed_count} corrected")
 
@@ -270,10 +264,13 @@ def main():
     parser = argparse.ArgumentParser(description='Post-process IS documents')
     parser.add_argument('-d', '--directory', default='output',
                        help='Directory containing IS documents (default: output)')
+    parser.add_argument('--text-backend', default=DEFAULT_BACKEND,
+                       choices=available_backends(),
+                       help=f'Text extraction backend (default: {DEFAULT_BACKEND})')
 
     args = parser.parse_args()
 
-    processor = ISPostProcessor()
+    processor = ISPostProcessor(text_backend=args.text_backend)
     processor.process_directory(args.directory)
 
 
@@ -11,7 +11,7 @@ import logging
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-import pdfplumber
+from document_context import DocumentContext
 from collections import Counter
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -168,10 +168,10 @@ class IterativeOCRTrainer:
 
             try:
                 # Extract text
-                with pdfplumber.open(pdf_file) as pdf:
+                with DocumentContext(pdf_file, backend="pdfplumber") as context:
                     all_text = ""
-                    for page in pdf.pages:
-                        page_text = page.extract_text() or ""
+                    for page_num in range(context.page_count):
+                        page_text = context.get_page_text(page_num)
                         all_text += page_text + "\n"
 
                 # Extract candidates
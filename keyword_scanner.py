@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Keyword Scanner
+One multi-keyword automaton over every keyword table the classifiers use
+(document type, jurisdiction, priority, IS start/continuation markers, blank
+page notes; all in the rules file, mailroom_rules.json), built once per
+process. A page is case-folded and scanned once; the result is a hit vector
+(keyword -> start offsets) that every decision reads from instead of
+case-folding and substring-searching the text again.
+
+Uses pyahocorasick (Aho-Corasick in C) when it's installed; otherwise each
+keyword is looked up with str.find on the one folded copy of the page, which
+gives the same hits (a combined regex is several times slower than either).
+"""
+
+import string
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import rule_profiler
+
+# Length-preserving case folding, so hit offsets index the original text
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Module attribute -> keyword table of the rules file
+_TABLES = {
+    'IS_TITLE': 'is_title',
+    'IS_SECONDARY': 'is_secondary',
+    'LTD_INDICATORS': 'ltd_indicators',
+    'HIGH_PRIORITY_TERMS': 'high_priority',
+    'IS_START_MARKERS': 'is_start_markers',
+    'IS_CONTINUATION_MARKERS': 'is_continuation_markers',
+    'BLANK_PAGE_INDICATORS': 'blank_page',
+}
+
+
+def _fold(text: str) -> str:
+    """Lower-case without changing length (str.lower is much faster on ASCII)"""
+    return text.lower() if text.isascii() else text.translate(_ASCII_LOWER)
+
+
+class KeywordHits:
+    """Hit vector of one scan: lower-cased keyword -> start offsets in the text"""
+
+    def __init__(self, text: str, positions: Dict[str, List[int]], keywords: frozenset):
+        self.text = text
+        self.positions = positions
+        self._keywords = keywords
+
+    def find(self, term: str, case_sensitive: bool = False) -> List[int]:
+        """
+        Start offsets of a keyword
+
+        Args:
+            term: A keyword the scanner was built with
+            case_sensitive: Only count hits cased exactly like term
+
+        Raises:
+            KeyError: The scanner doesn't know the keyword
+        """
+        folded = _fold(term)
+        if folded not in self._keywords:
+            raise KeyError(f"Keyword not in scanner: {term!r}")
+        starts = self.positions.get(folded, [])
+        if case_sensitive:
+            starts = [start for start in starts if self.text.startswith(term, start)]
+        return starts
+
+    def has(self, term: str, case_sensitive: bool = False) -> bool:
+        return bool(self.find(term, case_sensitive))
+
+    def any(self, terms: Iterable[str], case_sensitive: bool = False) -> bool:
+        return any(self.has(term, case_sensitive) for term in terms)
+
+    def count(self, terms: Iterable[str], case_sensitive: bool = False) -> int:
+        """How many of the terms occur at least once"""
+        return sum(self.has(term, case_sensitive) for term in terms)
+
+
+class KeywordScanner:
+    """Case-insensitive multi-keyword automaton, built once from keyword tables"""
+
+    def __init__(self, keywords: Iterable[str], backend: Optional[str] = None):
+        """
+        Args:
+            keywords: Every keyword to find (case is ignored when scanning)
+            backend: 'ahocorasick' or 'find'; default is ahocorasick when
+                     pyahocorasick is installed
+        """
+        self.keywords = frozenset(_fold(keyword) for keyword in keywords)
+        self.backend = backend or ('ahocorasick' if _ahocorasick_available() else 'find')
+        # Text and hits of the last scan: callers deciding several things
+        # about one page share a single scan
+        self._last: Tuple[Optional[str], Optional[KeywordHits]] = (None, None)
+
+        if self.backend == 'ahocorasick':
+            import ahocorasick
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+        elif self.backend == 'find':
+            self._ordered = sorted(self.keywords)
+        else:
+            raise ValueError(f"Unknown keyword scanner backend: {backend}")
+
+    def scan(self, text: str) -> KeywordHits:
+        """
+        Every keyword occurrence in one pass over the case-folded text
+
+        Scanning the same string object again returns the previous hits.
+        """
+        last_text, last_hits = self._last
+        if text is last_text:
+            return last_hits
+
+        profiling = rule_profiler.PROFILER.enabled
+        if profiling:
+            start = time.perf_counter()
+        folded = _fold(text)
+        positions: Dict[str, List[int]] = {}
+        if self.backend == 'ahocorasick':
+            for end, keyword in self._automaton.iter(folded):
+                positions.setdefault(keyword, []).append(end - len(keyword) + 1)
+        else:
+            for keyword in self._ordered:
+                pos = folded.find(keyword)
+                while pos != -1:
+                    positions.setdefault(keyword, []).append(pos)
+                    pos = folded.find(keyword, pos + 1)
+
+        if profiling:
+            rule_profiler.PROFILER.record('keywords', f"<{len(self.keywords)} keywords, {self.backend}>",
+                                          time.perf_counter() - start, bool(positions))
+        hits = KeywordHits(text, positions, self.keywords)
+        self._last = (text, hits)
+        return hits
+
+
+def _ahocorasick_available() -> bool:
+    try:
+        import ahocorasick  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def __getattr__(name: str):
+    """
+    Keyword tables of the rules file (IS_TITLE, HIGH_PRIORITY_TERMS, ...,
+    DOCUMENT_TYPE_TERMS, JURISDICTION_TERMS) and KEYWORDS, the shared
+    scanner over all of them
+
+    Looked up on each access, so an edited rules file takes effect without
+    re-importing (see rule_registry).
+    """
+    import rule_registry
+
+    rules = rule_registry.current()
+    if name in _TABLES:
+        return rules.keyword_tables[_TABLES[name]]
+    if name == 'DOCUMENT_TYPE_TERMS':
+        return rules.document_types
+    if name == 'JURISDICTION_TERMS':
+        return rules.jurisdictions
+    if name == 'KEYWORDS':
+        return rules.keywords
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def scan(text: str) -> KeywordHits:
+    """Hit vector of a page (or document) text against the shared keyword tables"""
+    import rule_registry
+
+    return rule_registry.current().keywords.scan(text)
@@ -15,6 +15,9 @@ from dataclasses import dataclass, asdict
 import hashlib
 from enum import Enum
 
+import keyword_scanner
+import rule_registry
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -184,18 +187,11 @@ class EnhancedVirtualMailroom:
             'SETTLEMENT_DEPT': [],
             'GENERAL_PROCESSING': []
         }
-        
-        self.routing_rules = {
-            'REGF': 'FILING_DEPT',
-            'AFF': 'LEGAL_DEPT',
-            'ICD': 'CASE_MANAGEMENT',
-            'NOTICE': 'COMPLIANCE_DEPT',
-            'SUMMONS': 'LEGAL_DEPT',
-            'MOTION': 'LITIGATION_DEPT',
-            'JUDGMENT': 'COLLECTIONS_DEPT',
-            'DISCOVERY': 'LITIGATION_DEPT',
-            'SETTLEMENT': 'SETTLEMENT_DEPT'
-        }
+
+    @property
+    def routing_rules(self) -> Dict[str, str]:
+        """Document type -> department, current with the rules file (see rule_registry)"""
+        return rule_registry.current().routing
     
     def process_document(self, text: str, filename: str = None) -> DocumentMetadata:
         """Process document using ChatPS"""
@@ -231,32 +227,39 @@ class EnhancedVirtualMailroom:
         
         metadata.priority = self._determine_priority(text, metadata)
         
-        metadata.routing_department = self.routing_rules.get(
+        rules = rule_registry.current()
+        metadata.routing_department = rules.routing.get(
             metadata.document_type, 
-            'GENERAL_PROCESSING'
+            rules.default_department
         )
         
-        if metadata.priority == 'HIGH' and metadata.routing_department != 'URGENT_PROCESSING':
-            metadata.routing_department = 'URGENT_PROCESSING'
+        if metadata.priority == 'HIGH' and metadata.routing_department != rules.urgent_department:
+            metadata.routing_department = rules.urgent_department
         
         self.processed_documents.append(metadata)
         
         if metadata.routing_department:
-            self.routing_queue[metadata.routing_department].append(metadata)
+            # Departments added to the rules file get a queue on first use
+            self.routing_queue.setdefault(metadata.routing_department, []).append(metadata)
         
         return metadata
     
+    def process_document_context(self, context, start_page: int, end_page: int,
+                                 filename: str = None) -> DocumentMetadata:
+        """Process a page range of an already-parsed source PDF
+
+        Args:
+            context: DocumentContext of the source PDF the document was split from
+            start_page: First page of the document (0-indexed)
+            end_page: Last page of the document (0-indexed, inclusive)
+            filename: Output filename used for hashing/logging
+        """
+        text = context.get_text_range(start_page, end_page)
+        return self.process_document(text, filename)
+    
     def _determine_priority(self, text: str, metadata: DocumentMetadata) -> str:
         """Determine document priority"""
-        text_lower = text.lower()
-        
-        high_priority_keywords = [
-            'urgent', 'immediate', 'emergency', 'expedite',
-            'time sensitive', 'deadline', 'court date',
-            'hearing scheduled', 'response required'
-        ]
-        
-        if any(keyword in text_lower for keyword in high_priority_keywords):
+        if keyword_scanner.scan(text).any(keyword_scanner.HIGH_PRIORITY_TERMS):
             return 'HIGH'
         
         if metadata.document_type in ['SUMMONS', 'MOTION']:
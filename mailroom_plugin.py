@@ -14,7 +14,6 @@ from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
 from typing import List, Dict, Optional, Any
-import pdfplumber
 from PyPDF2 import PdfReader
 import tempfile
 import shutil
@@ -28,6 +27,8 @@ if str(current_dir) not in sys.path:
 from pdf_splitter import PDFSplitter
 from infosub_processor import InfoSubProcessor
 from document_detector import DocumentTypeDetector
+from document_context import DocumentContext, parse_page_range
+from text_backends import DEFAULT_BACKEND, available_backends
 from mailroom_chatps_integration import (
     EnhancedVirtualMailroom,
     ChatPSEnvironment,
@@ -217,12 +218,16 @@ class VirtualMailroomPlugin(ChatPSPlugin):
                 temp_path = Path(temp_dir) / uploaded_file.name
                 temp_path.write_bytes(uploaded_file.getvalue())
                 
+                # Parse once; detection, splitting and AI enrichment share it
+                context = DocumentContext(
+                    temp_path, backend=self.settings.get('text_backend', DEFAULT_BACKEND)
+                )
                 try:
                     # Auto-detect document type if needed
                     actual_doc_type = doc_type
                     if doc_type is None:  # Auto-Detect selected
                         detector = DocumentTypeDetector()
-                        detected_type = detector.quick_detect(str(temp_path))
+                        detected_type = detector.quick_detect(str(temp_path), context=context)
                         if detected_type == "IS":
                             actual_doc_type = "IS"
                         elif detected_type == "LTD":
@@ -233,7 +238,7 @@ class VirtualMailroomPlugin(ChatPSPlugin):
                     if actual_doc_type == "IS":
                         # Use InfoSub processor for Information Subpoenas
                         processor = InfoSubProcessor(output_dir=str(output_dir))
-                        results = processor.process_pdf(str(temp_path))
+                        results = processor.process_pdf(str(temp_path), context=context)
                     else:
                         # Use standard PDF splitter for LTD and other types
                         splitter = PDFSplitter(output_dir=str(output_dir))
@@ -241,18 +246,20 @@ class VirtualMailroomPlugin(ChatPSPlugin):
                             str(temp_path),
                             doc_type=actual_doc_type,
                             pages_per_doc=pages_per_doc if pages_per_doc > 0 else None,
-                            auto_detect=auto_detect
+                            auto_detect=auto_detect,
+                            context=context
                         )
                     
                     # Enhance with AI if enabled
                     if use_ai and st.session_state.mailroom_instance:
                         for doc_info in results:
-                            output_file = output_dir / doc_info['output_file']
-                            with pdfplumber.open(output_file) as pdf:
-                                text = "\n".join(page.extract_text() or "" for page in pdf.pages)
-                            
-                            metadata = st.session_state.mailroom_instance.process_document(
-                                text,
+                            # Reuse source page text instead of reopening the split file
+                            pages = doc_info.get('original_pages') or doc_info['pages']
+                            start_page, end_page = parse_page_range(pages)
+                            metadata = st.session_state.mailroom_instance.process_document_context(
+                                context,
+                                start_page,
+                                end_page,
                                 doc_info['output_file']
                             )
                             
@@ -273,6 +280,8 @@ class VirtualMailroomPlugin(ChatPSPlugin):
                     
                 except Exception as e:
                     st.error(f"Error processing {uploaded_file.name}: {e}")
+                finally:
+                    context.close()
             
             # Copy processed files to permanent output directory
             permanent_output = Path(self.settings.get('default_output_dir', 'output'))
@@ -457,7 +466,10 @@ class VirtualMailroomPlugin(ChatPSPlugin):
         progress_bar = st.progress(0)
         status_text = st.empty()
         
-        splitter = PDFSplitter(output_dir=output_dir)
+        splitter = PDFSplitter(
+            output_dir=output_dir,
+            text_backend=self.settings.get('text_backend', DEFAULT_BACKEND)
+        )
         total_processed = 0
         
         for idx, pdf_file in enumerate(pdf_files):
@@ -537,6 +549,14 @@ class VirtualMailroomPlugin(ChatPSPlugin):
                 value=self.settings.get('max_file_size_mb', 100)
             )
         
+        backends = available_backends()
+        self.settings['text_backend'] = st.selectbox(
+            "Text extraction backend",
+            backends,
+            index=backends.index(self.settings.get('text_backend', DEFAULT_BACKEND)),
+            help="pymupdf is fastest; pdfplumber preserves layout best"
+        )
+        
         # Output settings
         st.write("### Output Settings")
         
@@ -13,10 +13,10 @@ from datetime import datetime, timedelta
 import plotly.express as px
 import plotly.graph_objects as go
 from typing import List, Dict, Optional
-import pdfplumber
 from PyPDF2 import PdfReader
 
 from pdf_splitter import PDFSplitter
+from document_context import DocumentContext, parse_page_range
 from mailroom_chatps_integration import (
     EnhancedVirtualMailroom,
     ChatPSEnvironment,
@@ -122,25 +122,27 @@ def process_pdf_page():
                 doc_type_param = None if doc_type == 'Auto-Detect' else doc_type
                 pages_param = None if pages_per_doc == 0 else pages_per_doc
                 
-                results = splitter.split_pdf(
-                    str(temp_path),
-                    doc_type=doc_type_param,
-                    pages_per_doc=pages_param,
-                    auto_detect=True
-                )
-                
-                if use_ai and st.session_state.mailroom:
-                    for doc_info in results:
-                        with pdfplumber.open(f"output/{doc_info['output_file']}") as pdf:
-                            text = "\n".join(page.extract_text() or "" for page in pdf.pages)
-                        
-                        metadata = st.session_state.mailroom.process_document(
-                            text, 
-                            doc_info['output_file']
-                        )
-                        
-                        doc_info.update(metadata.to_dict())
-                        st.session_state.processed_docs.append(doc_info)
+                with DocumentContext(temp_path) as context:
+                    results = splitter.split_pdf(
+                        str(temp_path),
+                        doc_type=doc_type_param,
+                        pages_per_doc=pages_param,
+                        auto_detect=True,
+                        context=context
+                    )
+                    
+                    if use_ai and st.session_state.mailroom:
+                        for doc_info in results:
+                            start_page, end_page = parse_page_range(doc_info['pages'])
+                            metadata = st.session_state.mailroom.process_document_context(
+                                context,
+                                start_page,
+                                end_page,
+                                doc_info['output_file']
+                            )
+                            
+                            doc_info.update(metadata.to_dict())
+                            st.session_state.processed_docs.append(doc_info)
                 
                 st.success(f"Processed {len(results)} documents")
                 temp_path.unlink()
@@ -249,19 +251,19 @@ def batch_processing_page():
             
             if process_mode in ["Split Only", "Split + AI Analysis"]:
                 splitter = PDFSplitter(output_dir=output_dir)
-                results = splitter.split_pdf(str(pdf_file))
-                
-                if process_mode == "Split + AI Analysis" and st.session_state.mailroom:
-                    for doc_info in results:
-                        output_file = Path(output_dir) / doc_info['output_file']
-                        with pdfplumber.open(output_file) as pdf:
-                            text = "\n".join(page.extract_text() or "" for page in pdf.pages)
-                        
-                        metadata = st.session_state.mailroom.process_document(
-                            text,
-                            doc_info['output_file']
-                        )
-                        doc_info.update(metadata.to_dict())
+                with DocumentContext(pdf_file) as context:
+                    results = splitter.split_pdf(str(pdf_file), context=context)
+                    
+                    if process_mode == "Split + AI Analysis" and st.session_state.mailroom:
+                        for doc_info in results:
+                            start_page, end_page = parse_page_range(doc_info['pages'])
+                            metadata = st.session_state.mailroom.process_document_context(
+                                context,
+                                start_page,
+                                end_page,
+                                doc_info['output_file']
+                            )
+                            doc_info.update(metadata.to_dict())
                 
                 st.session_state.processed_docs.extend(results)
         
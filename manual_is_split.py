@@ -5,9 +5,11 @@ Splits a 28-page IS document into 4 documents of 7 pages each
 """
 import sys
 from pathlib import Path
-from PyPDF2 import PdfReader, PdfWriter
 import logging
 
+from document_context import DocumentContext
+from split_writer import write_splits
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -18,29 +20,26 @@ def manual_split_is(input_pdf, output_dir="manual_split_output"):
     output_path.mkdir(exist_ok=True)
 
     try:
-        reader = PdfReader(input_pdf)
-        total_pages = len(reader.pages)
-        logger.info(f"Input PDF has {total_pages} pages")
-
-        # IS documents are typically 7 pages each
-        pages_per_doc = 7
-        doc_count = 0
-
-        for start_page in range(0, total_pages, pages_per_doc):
-            end_page = min(start_page + pages_per_doc, total_pages)
-            doc_count += 1
-
-            writer = PdfWriter()
-            for page_num in range(start_page, end_page):
-                writer.add_page(reader.pages[page_num])
-
-            # Output filename
-            output_file = output_path / f"IS_Document_{doc_count:02d}_pages_{start_page+1}-{end_page}.pdf"
-
-            with open(output_file, 'wb') as f:
-                writer.write(f)
-
-            logger.info(f"Created: {output_file.name} (pages {start_page+1}-{end_page})")
+        with DocumentContext(input_pdf) as context:
+            total_pages = context.page_count
+            logger.info(f"Input PDF has {total_pages} pages")
+
+            # IS documents are typically 7 pages each
+            pages_per_doc = 7
+            doc_count = 0
+            split_jobs = []
+
+            for start_page in range(0, total_pages, pages_per_doc):
+                end_page = min(start_page + pages_per_doc, total_pages)
+                doc_count += 1
+
+                # Output filename
+                output_file = output_path / f"IS_Document_{doc_count:02d}_pages_{start_page+1}-{end_page}.pdf"
+                split_jobs.append((range(start_page, end_page), output_file))
+
+            # All documents from one open copy of the input
+            for output_file in write_splits(context.fitz_doc, split_jobs):
+                logger.info(f"Created: {output_file.name}")
 
         logger.info(f"\n✅ Successfully split into {doc_count} documents")
         logger.info(f"Output files saved in: {output_path}")
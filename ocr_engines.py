@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+OCR Engines
+Interchangeable Tesseract front ends used by the OCR code paths. pytesseract
+starts a tesseract process and reloads the traineddata for every image;
+tesserocr keeps a TessBaseAPI handle (model loaded once) per process, so
+small region crops cost only recognition time. Process pools (see
+DocumentContext.process_pool) then give one persistent engine per worker.
+"""
+
+import logging
+import os
+import shlex
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# "auto" picks tesserocr when it's installed, pytesseract otherwise
+DEFAULT_ENGINE = os.environ.get('MAILROOM_OCR_ENGINE', 'auto')
+
+# Orientation guesses below this Tesseract confidence are ignored
+MIN_OSD_CONFIDENCE = 2.0
+
+
+class OCREngine(ABC):
+    """Runs Tesseract on a PIL image with a pytesseract-style config string"""
+
+    name = ""
+
+    def available(self) -> bool:
+        """Whether the engine's library is installed"""
+        return True
+
+    def version(self) -> str:
+        """Tesseract version; OCR output can change between releases"""
+        return ""
+
+    def cache_config(self) -> str:
+        """Prefix for OCR entries in the persistent text cache"""
+        return f"{self.name}-{self.version()}"
+
+    @abstractmethod
+    def image_to_string(self, image, config: str = "") -> str:
+        """
+        OCR one image
+
+        Args:
+            image: PIL Image
+            config: Tesseract options, e.g. "--psm 6 --oem 1 -c name=value"
+
+        Returns:
+            Recognized text
+        """
+
+    def detect_rotation(self, image) -> Optional[int]:
+        """
+        Quarter turns a page needs, from Tesseract's orientation detection
+
+        Args:
+            image: PIL Image of the whole page
+
+        Returns:
+            Degrees to rotate clockwise (0, 90, 180 or 270), or None when
+            the engine can't tell (no OSD model, too little text)
+        """
+        return None
+
+
+class PytesseractEngine(OCREngine):
+    """tesseract command line via pytesseract (one process per image)"""
+
+    name = "tesseract"
+
+    def available(self) -> bool:
+        try:
+            import pytesseract  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    @lru_cache(maxsize=1)
+    def version(self) -> str:
+        try:
+            import pytesseract
+            return str(pytesseract.get_tesseract_version())
+        except Exception:
+            return "unknown"
+
+    def image_to_string(self, image, config: str = "") -> str:
+        import pytesseract
+        return pytesseract.image_to_string(image, config=config)
+
+    def detect_rotation(self, image) -> Optional[int]:
+        import pytesseract
+        try:
+            osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+        except Exception as e:
+            logger.debug(f"tesseract: orientation detection failed: {e}")
+            return None
+        if osd.get('orientation_conf', 0) < MIN_OSD_CONFIDENCE:
+            return None
+        return int(osd['rotate']) % 360
+
+
+def parse_config(config: str) -> Tuple[Optional[int], Optional[int], str, Optional[int], Tuple[Tuple[str, str], ...]]:
+    """
+    Split a tesseract command line config into its settings
+
+    Args:
+        config: e.g. "--psm 6 --oem 1 -l eng -c tessedit_do_invert=0"
+
+    Returns:
+        Tuple of (psm, oem, lang, dpi, variables); psm/oem/dpi are None when
+        not given, variables are sorted (name, value) pairs
+    """
+    psm = oem = dpi = None
+    lang = "eng"
+    variables = {}
+    tokens = shlex.split(config)
+    i = 0
+    while i < len(tokens):
+        option = tokens[i]
+        if option in ('--psm', '--oem', '--dpi', '-l', '-c') and i + 1 < len(tokens):
+            value = tokens[i + 1]
+            i += 2
+        else:
+            raise ValueError(f"Unsupported tesseract option in config: {config!r}")
+        if option == '--psm':
+            psm = int(value)
+        elif option == '--oem':
+            oem = int(value)
+        elif option == '--dpi':
+            dpi = int(value)
+        elif option == '-l':
+            lang = value
+        else:
+            name, _, var_value = value.partition('=')
+            variables[name] = var_value
+    return psm, oem, lang, dpi, tuple(sorted(variables.items()))
+
+
+class TesserocrEngine(OCREngine):
+    """libtesseract in process via tesserocr, one loaded model per thread and setting"""
+
+    name = "tesserocr"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def available(self) -> bool:
+        try:
+            import tesserocr  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    @lru_cache(maxsize=1)
+    def version(self) -> str:
+        import tesserocr
+        # "tesseract 5.3.0\n leptonica-1.82.0 ..." -> "5.3.0"
+        return tesserocr.tesseract_version().split()[1]
+
+    def _api(self, lang: str, oem: Optional[int], variables: Tuple[Tuple[str, str], ...]):
+        """Handle for these init-time settings, created on first use in this thread"""
+        import tesserocr
+
+        handles: Dict[tuple, object] = getattr(self._local, 'handles', None)
+        if handles is None:
+            handles = self._local.handles = {}
+        key = (lang, oem, variables)
+        if key not in handles:
+            api = tesserocr.PyTessBaseAPI(lang=lang, oem=tesserocr.OEM.DEFAULT if oem is None else oem)
+            # Variables stay set on the handle, which is why they're part of the key
+            for name, value in variables:
+                if not api.SetVariable(name, value):
+                    logger.warning(f"tesserocr: unknown variable {name}")
+            handles[key] = api
+        return handles[key]
+
+    def image_to_string(self, image, config: str = "") -> str:
+        import tesserocr
+
+        psm, oem, lang, dpi, variables = parse_config(config)
+        api = self._api(lang, oem, variables)
+        api.SetPageSegMode(tesserocr.PSM.AUTO if psm is None else psm)
+        api.SetImage(image)
+        if dpi:
+            api.SetSourceResolution(dpi)
+        return api.GetUTF8Text()
+
+    def detect_rotation(self, image) -> Optional[int]:
+        import tesserocr
+
+        handles: Dict[tuple, object] = getattr(self._local, 'handles', None)
+        if handles is None:
+            handles = self._local.handles = {}
+        try:
+            if 'osd' not in handles:
+                # Needs osd.traineddata, which not every install ships
+                handles['osd'] = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.OSD_ONLY)
+            handles['osd'].SetImage(image)
+            osd = handles['osd'].DetectOrientationScript()
+        except RuntimeError as e:
+            logger.debug(f"tesserocr: orientation detection failed: {e}")
+            return None
+        if not osd or osd['orient_conf'] < MIN_OSD_CONFIDENCE:
+            return None
+        # orient_deg is how far the page is turned counter-clockwise
+        return (360 - osd['orient_deg']) % 360
+
+    def close(self):
+        """Free this thread's model handles"""
+        for api in getattr(self._local, 'handles', {}).values():
+            api.End()
+        self._local.handles = {}
+
+
+ENGINES: Dict[str, OCREngine] = {
+    engine.name: engine
+    for engine in (TesserocrEngine(), PytesseractEngine())
+}
+
+
+def available_engines() -> List[str]:
+    """Installed engine names, preferred first, accepted by get_engine and --ocr-engine"""
+    return [name for name, engine in ENGINES.items() if engine.available()]
+
+
+def get_engine(name: Optional[str] = None) -> OCREngine:
+    """
+    Look up an engine by name
+
+    Args:
+        name: Engine name, "auto" or None for DEFAULT_ENGINE
+
+    Returns:
+        The engine; "auto" falls back to pytesseract when tesserocr isn't installed
+    """
+    name = name or DEFAULT_ENGINE
+    if name == 'auto':
+        installed = available_engines()
+        return ENGINES[installed[0] if installed else PytesseractEngine.name]
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown OCR engine: {name} "
+                         f"(choose from auto, {', '.join(ENGINES)})")
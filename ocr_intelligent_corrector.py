@@ -7,7 +7,9 @@ Handles common OCR misreads and applies business logic validation
 import re
 import logging
 from datetime import datetime
-from typing import Optional, Tuple, List
+from typing import Dict, Optional, Tuple, List
+
+import rule_registry
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -25,19 +27,14 @@ class OCRIntelligentCorrector:
         self.min_year = 20
         self.max_year = int(str(self.current_year)[-2:])
 
-        # Common OCR misreads
-        self.ocr_corrections = {
-            '1': 'L',  # 1 often misread for L
-            'I': 'L',  # I often misread for L
-            'l': 'L',  # lowercase l
-            '0': 'O',  # 0 for O (though less common in our case)
-            '5': 'S',  # 5 for S
-            '8': 'B',  # 8 for B
-        }
-
         # Valid prefixes for file numbers
         self.valid_prefixes = ['L', 'J', 'Y', 'JM', 'EF']
 
+    @property
+    def ocr_corrections(self) -> Dict[str, str]:
+        """Common OCR misreads (character -> intended), current with the rules file (see rule_registry)"""
+        return rule_registry.current().character_corrections
+
     def validate_year_portion(self, year_str: str) -> bool:
         """Validate if year portion makes sense"""
         try:
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+OCR Escalation Ladder
+File-number OCR that starts with the cheapest render (a low-zoom crop of the
+region where the number usually is) and only steps up to the full page,
+higher resolution and heavier preprocessing while the result fails the file
+number format rules. Per-rung counters show how often the expensive rungs
+are actually needed. A full-page rung can reuse full-width region crops
+already OCR'd for the page (e.g. the quick-mode header) and only OCR the
+bands they don't cover.
+"""
+
+import logging
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from image_preprocess import preprocessor
+from ocr_engines import get_engine
+from text_cache import ocr_config, region_key
+
+logger = logging.getLogger(__name__)
+
+Region = Tuple[float, float, float, float]
+
+# Firm file number formats: 1 letter + 7 digits, 2 letters + 6 digits, 8 digits
+FILE_NUMBER_FORMATS = [
+    (re.compile(r'^[A-Z]\d{7}$'), '1L+7N'),     # L2501375
+    (re.compile(r'^[A-Z]{2}\d{6}$'), '2L+6N'),  # JM221025
+    (re.compile(r'^\d{8}$'), '8N'),             # 12345678
+]
+
+
+def file_number_format(value: Optional[str]) -> Optional[str]:
+    """Format label ('1L+7N', '2L+6N', '8N') if value is a valid file number"""
+    if not value:
+        return None
+    for pattern, label in FILE_NUMBER_FORMATS:
+        if pattern.match(value):
+            return label
+    return None
+
+
+class Rung(NamedTuple):
+    """One step of the ladder: how to render, crop and preprocess before OCR"""
+    name: str
+    zoom: float                              # Scale from PDF points (72 dpi)
+    regions: Optional[Tuple[Region, ...]]    # Crops to OCR, None for the full page
+    preprocess: str = 'none'                 # image_preprocess.PREPROCESSORS name or step chain
+    config: str = ""                         # Tesseract options
+    # Full-page rungs: region rungs whose cached crops stand in for those bands
+    reuse: Tuple['Rung', ...] = ()
+
+
+def rung_config(rung: Rung, engine: Optional[str] = None, orientation=None) -> str:
+    """
+    OCR cache config for a rung; a plain full page shares entries with other full-page OCR
+
+    Args:
+        rung: Render/crop/preprocess settings
+        engine: OCR engine name (see ocr_engines)
+        orientation: The context's page_orientation.Orientation; straightened
+                     renders are cached apart from raw ones
+    """
+    parts = ["fitz", f"x{rung.zoom:g}", "gray"]
+    if orientation is not None and not orientation.upright:
+        parts.append(orientation.key())
+    parts += [region_key(region) for region in rung.regions or ()]
+    if rung.preprocess != 'none':
+        parts.append(rung.preprocess)
+    if rung.config:
+        parts.append(rung.config)
+    if rung.reuse:
+        # Stitched text differs from a single full-page pass
+        parts.append("reuse-" + "+".join(source.name for source in rung.reuse))
+    return ocr_config(*parts, engine=engine)
+
+
+def page_bands(context, page_num: int, rung: Rung,
+               engine: Optional[str] = None) -> List[Tuple[Optional[Region], Optional[str]]]:
+    """
+    Split a full page into horizontal bands, top to bottom, filling in the
+    text of bands already OCR'd by the rung's reuse rungs
+
+    Only full-width crops OCR'd on their own with the same preprocessing and
+    tesseract options are reused (at whatever zoom they were rendered), so
+    stitching the bands keeps reading order.
+
+    Returns:
+        List of (region, text) with text None for bands still to OCR; a
+        single (None, None) when nothing can be reused
+    """
+    covered = []
+    for source in rung.reuse:
+        if (source.preprocess, source.config) != (rung.preprocess, rung.config):
+            continue
+        for region in source.regions or ():
+            x0, top, x1, bottom = region
+            if x0 > 0 or x1 < 1:
+                continue
+            text = context.get_ocr_text(page_num, config=rung_config(source._replace(regions=(region,)), engine,
+                                                                     context.orientation))
+            if text is not None:
+                covered.append((top, bottom, text))
+    if not covered:
+        return [(None, None)]
+
+    bands = []
+    y = 0.0
+    for top, bottom, text in sorted(covered):
+        if top < y:
+            continue  # Overlaps a band already taken
+        if top > y:
+            bands.append(((0.0, y, 1.0, top), None))
+        bands.append(((0.0, top, 1.0, bottom), text))
+        y = bottom
+    if y < 1:
+        bands.append(((0.0, y, 1.0, 1.0), None))
+    return bands
+
+
+def uncovered_bands(regions: Sequence[Region]) -> Optional[Tuple[Region, ...]]:
+    """
+    Horizontal bands of the page that full-width regions leave out, top to bottom
+
+    Returns:
+        Tuple of bands (empty when the regions cover the page), or None if
+        any region is narrower than the page
+    """
+    bands = []
+    y = 0.0
+    for x0, top, x1, bottom in sorted(regions, key=lambda region: region[1]):
+        if x0 > 0 or x1 < 1:
+            return None
+        if top > y:
+            bands.append((0.0, y, 1.0, top))
+        y = max(y, bottom)
+    if y < 1:
+        bands.append((0.0, y, 1.0, 1.0))
+    return tuple(bands)
+
+
+def ocr_rung(context, page_num: int, rung: Rung, engine: Optional[str] = None) -> Optional[str]:
+    """
+    OCR a page the way a rung says, through the context's OCR cache
+
+    Args:
+        context: DocumentContext for the PDF
+        page_num: Page number (0-indexed)
+        rung: Render/crop/preprocess settings
+        engine: OCR engine name (see ocr_engines)
+
+    Returns:
+        Text (crops or page bands joined by newlines), or None if OCR failed
+    """
+    config = rung_config(rung, engine, context.orientation)
+    cached = context.get_ocr_text(page_num, config=config)
+    if cached is not None:
+        return cached
+
+    if rung.regions:
+        bands = [(region, None) for region in rung.regions]
+    else:
+        bands = page_bands(context, page_num, rung, engine)
+        reused = sum(region[3] - region[1] for region, text in bands if text is not None)
+        if reused:
+            logger.debug(f"Page {page_num + 1}: {rung.name} reuses {reused:.0%} of the page from region OCR")
+
+    try:
+        preprocess = preprocessor(rung.preprocess)
+        ocr = get_engine(engine)
+        texts = [text if text is not None else
+                 ocr.image_to_string(preprocess(context.render_page(page_num, zoom=rung.zoom, region=region)),
+                                     config=rung.config)
+                 for region, text in bands]
+    except Exception as e:
+        logger.error(f"OCR ({rung.name}) failed for page {page_num}: {e}")
+        return None
+
+    text = "\n".join(texts)
+    context.set_ocr_text(page_num, text, config=config)
+    return text
+
+
+class OCRLadder:
+    """Rungs tried in order until the extracted file number passes the format rules"""
+
+    def __init__(self, rungs: Sequence[Rung], engine: Optional[str] = None):
+        """
+        Args:
+            rungs: Cheapest first
+            engine: OCR engine name (see ocr_engines)
+        """
+        self.rungs = list(rungs)
+        self.engine = engine
+        # rung name -> {'attempts': pages OCR'd at this rung, 'hits': valid file numbers found}
+        self.counters: Dict[str, Dict[str, int]] = {}
+        # Pages where no rung produced a valid file number
+        self.misses = 0
+        self.reset()
+
+    def read(self, context, page_num: int, extract: Callable[[str], Optional[str]],
+             ocr: Optional[Callable[[int, Rung], Optional[str]]] = None) -> Tuple[Optional[str], str, Optional[str]]:
+        """
+        Climb the ladder for one page
+
+        Args:
+            context: DocumentContext for the PDF
+            page_num: Page number (0-indexed)
+            extract: Pulls a candidate file number out of OCR text
+            ocr: (page_num, rung) -> text, to route OCR through a pool;
+                 defaults to ocr_rung on this process
+
+        Returns:
+            Tuple of (file number, text it was read from, rung name). When
+            no rung validates, the first unvalidated candidate (if any) is
+            returned with the last rung's text and a rung name of None.
+        """
+        ocr = ocr or (lambda num, rung: ocr_rung(context, num, rung, self.engine))
+        fallback = None
+        texts: List[str] = []
+        for rung in self.rungs:
+            text = ocr(page_num, rung) or ""
+            texts.append(text)
+            value = extract(text)
+            self.counters[rung.name]['attempts'] += 1
+            if file_number_format(value):
+                self.counters[rung.name]['hits'] += 1
+                logger.debug(f"Page {page_num + 1}: {value} at rung {rung.name}")
+                return value, text, rung.name
+            fallback = fallback or value
+        self.misses += 1
+        return fallback, texts[-1] if texts else "", None
+
+    def reset(self):
+        """Zero the counters (e.g. in a worker whose counts are merged back)"""
+        self.counters = {rung.name: {'attempts': 0, 'hits': 0} for rung in self.rungs}
+        self.misses = 0
+
+    def merge(self, counters: Dict[str, Dict[str, int]], misses: int):
+        """Add counters from another copy of this ladder, e.g. a worker process's"""
+        for name, counts in counters.items():
+            for key, value in counts.items():
+                self.counters[name][key] += value
+        self.misses += misses
+
+    def hit_rates(self) -> Dict:
+        """Counters per rung with hit rates, for manifests"""
+        rungs = {}
+        for rung in self.rungs:
+            counts = self.counters[rung.name]
+            rungs[rung.name] = dict(counts, hit_rate=round(counts['hits'] / counts['attempts'], 3)
+                                    if counts['attempts'] else None)
+        return {'rungs': rungs, 'misses': self.misses}
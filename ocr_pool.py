@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+OCR Executor
+Runs InfoSubProcessor page OCR in a process pool while boundary detection
+reads the results back in page order. tesseract uses about one core per call,
+so scanned batches otherwise leave most of a machine idle. Results land in
+the shared DocumentContext, so the detector sees exactly what serial OCR
+would have produced and its state machine stays deterministic.
+"""
+
+import logging
+from concurrent.futures import Future
+from typing import Dict, Iterable, Optional, Tuple
+
+from document_context import DocumentContext, worker_context
+from ocr_ladder import Rung, rung_config
+
+logger = logging.getLogger(__name__)
+
+
+def _ocr_job(processor, page_num: int, rung: Rung) -> Optional[str]:
+    """Process-pool worker: OCR one page against the worker's own context, None on failure"""
+    context = worker_context()
+    text = processor.ocr_page(context, page_num, rung)
+    # The parent keeps the result; don't hold parsed page objects here
+    context.release_pages(page_num, page_num)
+    return text
+
+
+class OCRExecutor:
+    """Page OCR jobs submitted ahead of time and collected in any order"""
+
+    def __init__(self, processor, context: DocumentContext, workers: Optional[int] = None):
+        """
+        Args:
+            processor: InfoSubProcessor whose OCR settings the workers use
+            context: Shared DocumentContext results are stored in
+            workers: Worker processes; None or 1 runs OCR inline on demand
+        """
+        self.processor = processor
+        self.context = context
+        self.workers = workers if workers and workers > 1 else 1
+        self._pool = None
+        # (page_num, rung) -> pending OCR result
+        self._pending: Dict[Tuple[int, Rung], Future] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def submit(self, pages: Iterable[int], rung: Rung):
+        """
+        Start OCR for pages in the background
+
+        Pages already OCR'd or already submitted are skipped; without a pool
+        this does nothing and text() OCRs on demand.
+        """
+        if self.workers == 1:
+            return
+        for page_num in pages:
+            key = (page_num, rung)
+            if key in self._pending or self.context.get_ocr_text(page_num, config=self._config(rung)) is not None:
+                continue
+            if self._pool is None:
+                self._pool = self.context.process_pool(self.workers)
+                logger.info(f"OCR with {self.workers} workers")
+            self._pending[key] = self._pool.submit(_ocr_job, self.processor, page_num, rung)
+
+    def text(self, page_num: int, rung: Rung) -> str:
+        """OCR text for a page, waiting for a submitted job or running it now"""
+        future = self._pending.pop((page_num, rung), None)
+        if future is not None:
+            try:
+                text = future.result()
+            except Exception as e:
+                logger.error(f"OCR worker failed for page {page_num}: {e}")
+                text = None
+            if text is None:
+                return ""
+            # The worker already wrote the persistent cache
+            self.context.set_ocr_text(page_num, text, config=self._config(rung), persist=False)
+            return text
+        return self.processor.ocr_page(self.context, page_num, rung) or ""
+
+    def _config(self, rung: Rung) -> str:
+        return rung_config(rung, self.processor.ocr_engine, self.context.orientation)
+
+    def close(self):
+        """Cancel jobs nobody asked for and stop the workers"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        self._pending.clear()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+OCR Profiles
+Per document type and field OCR settings (crop, DPI, page segmentation,
+character whitelist, preprocessing) chosen by the trainers as the cheapest
+combination that met an accuracy target, and loaded by the extractors in
+place of their built-in first OCR rung.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from ocr_ladder import Region, Rung
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILES_PATH = Path(__file__).parent / "ocr_profiles.json"
+PROFILES_VERSION = 1
+
+# PDF points of a US letter page, for comparing render costs
+LETTER_SIZE = (612, 792)
+
+
+class OCRProfile(NamedTuple):
+    """How to OCR one field of one document type"""
+    doc_type: str                            # 'IS', 'LTD', ... or 'default'
+    field: str                               # 'file_number', 'start_marker'
+    regions: Optional[Tuple[Region, ...]]    # Crops to OCR, None for the full page
+    dpi: int
+    psm: Optional[int] = None
+    oem: Optional[int] = None
+    whitelist: str = ""                      # tessedit_char_whitelist
+    preprocess: str = 'none'                 # image_preprocess.PREPROCESSORS name or step chain
+    accuracy: Optional[float] = None         # Measured by the trainer
+    samples: int = 0                         # Files the accuracy was measured on
+
+    @property
+    def config(self) -> str:
+        """Tesseract options"""
+        options = []
+        if self.psm is not None:
+            options.append(f"--psm {self.psm}")
+        if self.oem is not None:
+            options.append(f"--oem {self.oem}")
+        if self.whitelist:
+            options.append(f"-c tessedit_char_whitelist={self.whitelist}")
+        return " ".join(options)
+
+    @property
+    def cost(self) -> float:
+        """Megapixels rendered and OCR'd for a letter-size page"""
+        area = sum((x1 - x0) * (bottom - top) for x0, top, x1, bottom in self.regions or ((0, 0, 1, 1),))
+        width, height = LETTER_SIZE
+        return area * width * height * (self.dpi / 72) ** 2 / 1e6
+
+    def rung(self, name: Optional[str] = None) -> Rung:
+        """Ladder rung that OCRs the way this profile says"""
+        return Rung(name or f"{self.field}_profile", self.dpi / 72, self.regions, self.preprocess, self.config)
+
+    def to_dict(self) -> Dict:
+        data = self._asdict()
+        if self.regions is not None:
+            data['regions'] = [list(region) for region in self.regions]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'OCRProfile':
+        data = {key: value for key, value in data.items() if key in cls._fields}
+        if data.get('regions') is not None:
+            data['regions'] = tuple(tuple(region) for region in data['regions'])
+        return cls(**data)
+
+
+def profiles_path(path=None) -> Path:
+    """Profile file: explicit path, MAILROOM_OCR_PROFILES, or ocr_profiles.json next to this module"""
+    return Path(path or os.environ.get('MAILROOM_OCR_PROFILES') or DEFAULT_PROFILES_PATH)
+
+
+def load_profiles(path=None) -> Dict[Tuple[str, str], OCRProfile]:
+    """
+    Read trained profiles
+
+    Args:
+        path: Profile file (see profiles_path)
+
+    Returns:
+        Dict of (doc_type, field) -> profile; empty if the file doesn't exist
+        or can't be read
+    """
+    path = profiles_path(path)
+    if not path.exists():
+        return {}
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        profiles = [OCRProfile.from_dict(entry) for entry in data.get('profiles', [])]
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning(f"Ignoring OCR profiles in {path}: {e}")
+        return {}
+    return {(profile.doc_type, profile.field): profile for profile in profiles}
+
+
+def get_profile(doc_type: str, field: str, path=None) -> Optional[OCRProfile]:
+    """Trained profile for a document type's field, None to use the built-in settings"""
+    return load_profiles(path).get((doc_type, field))
+
+
+def save_profiles(profiles: Iterable[OCRProfile], path=None) -> Path:
+    """
+    Write profiles, keeping those already in the file for other fields
+
+    Returns:
+        Path written
+    """
+    path = profiles_path(path)
+    merged = load_profiles(path)
+    merged.update({(profile.doc_type, profile.field): profile for profile in profiles})
+    with open(path, 'w') as f:
+        json.dump({
+            'version': PROFILES_VERSION,
+            'profiles': [profile.to_dict() for _, profile in sorted(merged.items())],
+        }, f, indent=2)
+    return path
+
+
+def choose_profile(candidates: List[OCRProfile], target: float) -> Optional[OCRProfile]:
+    """
+    Pick the profile to ship from scored candidates
+
+    Args:
+        candidates: Profiles with accuracy filled in
+        target: Minimum accuracy (0-1)
+
+    Returns:
+        The cheapest candidate meeting the target (most accurate on ties);
+        the most accurate (cheapest on ties) when none does; None if no
+        candidate read anything correctly
+    """
+    scored = [profile for profile in candidates if profile.accuracy]
+    passing = [profile for profile in scored if profile.accuracy >= target]
+    if passing:
+        return min(passing, key=lambda profile: (profile.cost, -profile.accuracy))
+    if scored:
+        logger.warning(f"No OCR profile reached {target:.0%} accuracy, using the most accurate")
+        return min(scored, key=lambda profile: (-profile.accuracy, profile.cost))
+    return None
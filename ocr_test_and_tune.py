@@ -2,6 +2,8 @@
 """
 OCR Testing and Tuning Script for Virtual Mailroom
 Tests different OCR configurations and preprocessing to improve accuracy
+against known file numbers, and writes the cheapest configuration that
+meets an accuracy target as the file number profile (see ocr_profiles)
 """
 
 import os
@@ -11,11 +13,13 @@ import logging
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import subprocess
-import tempfile
-from PIL import Image, ImageEnhance, ImageFilter
-import pdfplumber
-from PyPDF2 import PdfReader
-import pytesseract
+
+from document_context import DocumentContext
+from ocr_engines import available_engines, get_engine
+from image_preprocess import preprocessor
+from ocr_ladder import ocr_rung
+from ocr_profiles import OCRProfile, choose_profile, save_profiles
+from ocr_tuning import evaluate_grid
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -24,8 +28,23 @@ logger = logging.getLogger(__name__)
 class OCRTester:
     """Test and tune OCR configurations for better accuracy"""
 
-    def __init__(self):
+    def __init__(self, ocr_engine: Optional[str] = None, doc_type: str = 'IS',
+                 workers: Optional[int] = None, render_dir: Optional[str] = None):
         self.test_results = []
+        # Engine for every config tested (see ocr_engines)
+        self.ocr_engine = get_engine(ocr_engine).name
+        self.doc_type = doc_type
+        # Pages are OCR'd under every config in this many processes, each
+        # rendered once (see ocr_tuning); renders can be kept on disk
+        self.workers = workers
+        self.render_dir = render_dir
+
+        # Preprocessing levels as step chains (see image_preprocess)
+        self.preprocess_levels = {
+            "light": "contrast:1.5",
+            "medium": "contrast+sharpen",
+            "heavy": "median+contrast:2.5+sharpen+brightness:1.2",
+        }
 
         # Known ground truth for testing
         self.ground_truth = {
@@ -59,68 +78,36 @@ class OCRTester:
         """Extract text using pdfplumber (current method)"""
         pages_text = []
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text() or ""
-                    pages_text.append(text)
+            with DocumentContext(pdf_path, backend="pdfplumber") as context:
+                for page_num in range(context.page_count):
+                    pages_text.append(context.get_page_text(page_num))
         except Exception as e:
             logger.error(f"PDFPlumber extraction error: {e}")
         return pages_text
 
-    def extract_with_tesseract(self, pdf_path: str, config: str = "") -> List[str]:
-        """Extract text using Tesseract OCR with different configurations"""
+    def tesseract_profile(self, dpi: int = 300, enhance_level: str = "medium", **settings) -> OCRProfile:
+        """Full-page file number profile for one Tesseract configuration"""
+        return OCRProfile(self.doc_type, 'file_number', None, dpi,
+                          preprocess=self.preprocess_levels[enhance_level], **settings)
+
+    def extract_with_tesseract(self, pdf_path: str, profile: Optional[OCRProfile] = None) -> List[str]:
+        """Extract text using Tesseract OCR the way a profile says (results cached across runs)"""
         pages_text = []
+        rung = (profile or self.tesseract_profile()).rung()
         try:
-            # Convert PDF to images first
-            from pdf2image import convert_from_path
-
-            images = convert_from_path(pdf_path, dpi=300)
-
-            for i, image in enumerate(images):
-                # Apply preprocessing
-                processed_image = self.preprocess_image(image)
-
-                # Run OCR with specified config
-                text = pytesseract.image_to_string(processed_image, config=config)
-                pages_text.append(text)
-
+            with DocumentContext(pdf_path) as context:
+                for i in range(context.page_count):
+                    text = ocr_rung(context, i, rung, self.ocr_engine)
+                    if text is None:
+                        break
+                    pages_text.append(text)
         except Exception as e:
             logger.error(f"Tesseract extraction error: {e}")
         return pages_text
 
     def preprocess_image(self, image, enhance_level: str = "medium"):
         """Preprocess image for better OCR accuracy"""
-
-        if enhance_level == "light":
-            # Light preprocessing
-            image = image.convert('L')  # Grayscale
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(1.5)
-
-        elif enhance_level == "medium":
-            # Medium preprocessing
-            image = image.convert('L')
-            # Increase contrast
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(2.0)
-            # Sharpen
-            image = image.filter(ImageFilter.SHARPEN)
-
-        elif enhance_level == "heavy":
-            # Heavy preprocessing
-            image = image.convert('L')
-            # Denoise
-            image = image.filter(ImageFilter.MedianFilter(size=3))
-            # Increase contrast
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(2.5)
-            # Sharpen
-            image = image.filter(ImageFilter.SHARPEN)
-            # Brightness adjustment
-            enhancer = ImageEnhance.Brightness(image)
-            image = enhancer.enhance(1.2)
-
-        return image
+        return preprocessor(self.preprocess_levels[enhance_level])(image)
 
     def test_file_number_extraction(self, text: str, patterns: List[str]) -> Optional[str]:
         """Test file number extraction with various patterns"""
@@ -135,8 +122,16 @@ class OCRTester:
                     return file_number
         return None
 
-    def run_test_suite(self, test_dir: str = "ocr_training_data/incomplete_with_known_filenumbers"):
-        """Run comprehensive OCR tests on known problematic files"""
+    def run_test_suite(self, test_dir: str = "ocr_training_data/incomplete_with_known_filenumbers",
+                       target_accuracy: float = 0.9, profiles_path: Optional[str] = None):
+        """
+        Run comprehensive OCR tests on known problematic files
+
+        Args:
+            test_dir: Directory of PDFs; those not named in ground_truth are skipped
+            target_accuracy: Accuracy the written profile must reach (0-1)
+            profiles_path: Profile file to update (see ocr_profiles)
+        """
 
         test_dir_path = Path(test_dir)
         if not test_dir_path.exists():
@@ -145,27 +140,44 @@ class OCRTester:
 
         results = {
             "total_files": 0,
+            "unlabelled_files": [],
             "methods": {},
             "pattern_success": {},
             "file_results": {}
         }
 
-        # Test configurations
+        # Test configurations (Tesseract ones as profiles)
         ocr_configs = [
             ("pdfplumber", None),
-            ("tesseract_default", ""),
-            ("tesseract_legacy", "--oem 0"),  # Legacy OCR engine
-            ("tesseract_lstm", "--oem 1"),     # LSTM neural net
-            ("tesseract_combined", "--oem 2"),  # Legacy + LSTM
-            ("tesseract_psm3", "--psm 3"),      # Automatic page segmentation
-            ("tesseract_psm6", "--psm 6"),      # Uniform block of text
-            ("tesseract_psm11", "--psm 11"),    # Sparse text
+            ("tesseract_default", self.tesseract_profile()),
+            ("tesseract_legacy", self.tesseract_profile(oem=0)),    # Legacy OCR engine
+            ("tesseract_lstm", self.tesseract_profile(oem=1)),      # LSTM neural net
+            ("tesseract_combined", self.tesseract_profile(oem=2)),  # Legacy + LSTM
+            ("tesseract_psm3", self.tesseract_profile(psm=3)),      # Automatic page segmentation
+            ("tesseract_psm6", self.tesseract_profile(psm=6)),      # Uniform block of text
+            ("tesseract_psm11", self.tesseract_profile(psm=11)),    # Sparse text
         ]
 
+        # Only files with a known number can score a configuration
+        pdf_files = []
+        for pdf_file in sorted(test_dir_path.glob("*.pdf")):
+            if pdf_file.name in self.ground_truth:
+                pdf_files.append(pdf_file)
+            else:
+                results["unlabelled_files"].append(pdf_file.name)
+        if results["unlabelled_files"]:
+            logger.info(f"Skipping {len(results['unlabelled_files'])} files not in the ground truth: "
+                        f"{', '.join(results['unlabelled_files'])}")
+
+        # Every Tesseract config on every page, rendering each page once
+        tesseract_configs = [name for name, profile in ocr_configs if profile]
+        ocr_texts = evaluate_grid(pdf_files, [profile.rung() for _, profile in ocr_configs if profile],
+                                  engine=self.ocr_engine, workers=self.workers, render_dir=self.render_dir)
+
         # Test each file
-        for pdf_file in test_dir_path.glob("*.pdf"):
+        for pdf_file in pdf_files:
             filename = pdf_file.name
-            expected = self.ground_truth.get(filename, "UNKNOWN")
+            expected = self.ground_truth[filename]
 
             results["total_files"] += 1
             results["file_results"][filename] = {
@@ -176,7 +188,7 @@ class OCRTester:
             logger.info(f"\nTesting {filename} (Expected: {expected})")
 
             # Try each OCR method
-            for method_name, config in ocr_configs:
+            for method_name, profile in ocr_configs:
                 if method_name not in results["methods"]:
                     results["methods"][method_name] = {"success": 0, "total": 0}
 
@@ -186,7 +198,10 @@ class OCRTester:
                 if method_name == "pdfplumber":
                     pages_text = self.extract_with_pdfplumber(str(pdf_file))
                 else:
-                    pages_text = self.extract_with_tesseract(str(pdf_file), config or "")
+                    pages_text = ocr_texts[str(pdf_file)][tesseract_configs.index(method_name)]
+                    # Like extract_with_tesseract, stop at the first page OCR failed on
+                    if None in pages_text:
+                        pages_text = pages_text[:pages_text.index(None)]
 
                 # Try to find file number
                 all_text = " ".join(pages_text)
@@ -214,6 +229,20 @@ class OCRTester:
             success_rate = (stats["success"] / stats["total"]) * 100 if stats["total"] > 0 else 0
             logger.info(f"{method:20} {stats['success']}/{stats['total']} ({success_rate:.1f}%)")
 
+        # Ship the cheapest Tesseract configuration that meets the target
+        scored = [profile._replace(accuracy=round(results["methods"][name]["success"] /
+                                                  results["methods"][name]["total"], 3),
+                                   samples=results["methods"][name]["total"])
+                  for name, profile in ocr_configs if profile and results["methods"].get(name, {}).get("total")]
+        profile = choose_profile(scored, target_accuracy)
+        results["profile"] = profile.to_dict() if profile else None
+        if profile:
+            path = save_profiles([profile], profiles_path)
+            logger.info(f"\n{self.doc_type} file_number profile ({profile.accuracy:.0%} accurate, "
+                        f"{profile.config or 'default config'}) saved to {path}")
+        else:
+            logger.info(f"\nNo configuration read any file number correctly, {self.doc_type} profile not updated")
+
         # Save detailed results
         output_file = "ocr_test_results.json"
         with open(output_file, 'w') as f:
@@ -269,10 +298,22 @@ def main():
                        help='Directory containing test PDFs')
     parser.add_argument('--quick', action='store_true',
                        help='Run quick test with fewer methods')
+    parser.add_argument('--doc-type', default='IS', help='Document type the profile is for (default: IS)')
+    parser.add_argument('--target-accuracy', type=float, default=0.9,
+                       help='Accuracy the chosen profile must reach (default: 0.9)')
+    parser.add_argument('--profiles', default=None,
+                       help='Profile file to update (default: ocr_profiles.json)')
+    parser.add_argument('-j', '--workers', type=int,
+                       help='OCR pages in this many processes (default: serial)')
+    parser.add_argument('--render-cache', default=None,
+                       help='Directory to keep page renders in between runs')
+    parser.add_argument('--ocr-engine', default=None, choices=['auto'] + available_engines(),
+                       help='OCR engine (default: tesserocr if installed, else tesseract)')
 
     args = parser.parse_args()
 
-    tester = OCRTester()
+    tester = OCRTester(ocr_engine=args.ocr_engine, doc_type=args.doc_type, workers=args.workers,
+                       render_dir=args.render_cache)
 
     logger.info("Starting OCR Testing and Tuning")
     logger.info("================================")
@@ -284,15 +325,8 @@ def main():
     except:
         logger.warning("⚠️  Tesseract OCR not found. Install with: sudo apt-get install tesseract-ocr")
 
-    try:
-        import pdf2image
-        logger.info("✅ pdf2image installed")
-    except ImportError:
-        logger.warning("⚠️  pdf2image not installed. Install with: pip install pdf2image")
-        logger.warning("   Also need poppler-utils: sudo apt-get install poppler-utils")
-
     # Run tests
-    results = tester.run_test_suite(args.test_dir)
+    results = tester.run_test_suite(args.test_dir, args.target_accuracy, args.profiles)
 
     if results:
         tester.suggest_improvements(results)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+OCR Tuning Harness
+Scores a grid of OCR settings (rungs or trained profiles) on a set of PDFs
+without rasterizing a page once per setting. Each page is rendered once per
+zoom and crop, exactly as the extractors render it, and each preprocessing
+chain runs once per render; every Tesseract configuration then reads the
+same image. Pages are fanned out over a process pool, and results go through
+the persistent OCR cache under the extractors' keys, so reruns and the
+extractors themselves reuse them.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from document_context import DocumentContext
+from image_preprocess import preprocessor
+from ocr_engines import get_engine
+from ocr_ladder import Region, Rung, rung_config
+from text_cache import region_key
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCache:
+    """
+    Page renders by (page, zoom, region), optionally kept on disk
+
+    Without a directory renders only live for one page's evaluation; with
+    one they are saved as lossless PNGs named by the PDF's content hash, so
+    later tuning runs (e.g. with a different grid) skip rasterizing.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else None
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._images: Dict[Tuple[int, float, Optional[Region]], Image.Image] = {}
+
+    def path(self, context: DocumentContext, page_num: int, zoom: float, region: Optional[Region]) -> Path:
+        name = f"{context.pdf_hash[:16]}_p{page_num}_x{zoom:g}"
+        if region:
+            name += "_" + region_key(region).replace(",", "_")
+        return self.directory / f"{name}.png"
+
+    def get(self, context: DocumentContext, page_num: int, zoom: float,
+            region: Optional[Region] = None) -> Image.Image:
+        """Render of a page (or crop), rasterized at most once"""
+        key = (page_num, zoom, region)
+        if key not in self._images:
+            path = self.path(context, page_num, zoom, region) if self.directory else None
+            if path and path.exists():
+                with Image.open(path) as image:
+                    self._images[key] = image.convert('L')
+            else:
+                image = context.render_page(page_num, zoom=zoom, region=region)
+                if path:
+                    image.save(path)
+                self._images[key] = image
+        return self._images[key]
+
+    def clear(self):
+        self._images.clear()
+
+
+def ocr_page_grid(context: DocumentContext, page_num: int, rungs: Sequence[Rung],
+                  engine: Optional[str] = None, renders: Optional[RenderCache] = None) -> List[Optional[str]]:
+    """
+    OCR one page under many rungs, sharing renders and preprocessing
+
+    Args:
+        context: DocumentContext for the PDF
+        page_num: Page number (0-indexed)
+        rungs: Settings to OCR with; region crops are joined by newlines
+               like ocr_ladder.ocr_rung (reuse of other rungs is ignored)
+        engine: OCR engine name (see ocr_engines)
+        renders: Render cache to use (a fresh in-memory one by default)
+
+    Returns:
+        Text per rung, in order (None where OCR failed)
+    """
+    renders = renders or RenderCache()
+    ocr = get_engine(engine)
+    texts: List[Optional[str]] = [None] * len(rungs)
+
+    # Rungs sharing a render and preprocessing chain run back to back, so
+    # only one set of preprocessed images is held at a time
+    def image_key(index):
+        rung = rungs[index]
+        return rung.zoom, rung.regions or (), rung.preprocess
+
+    for (zoom, regions, chain), group in groupby(sorted(range(len(rungs)), key=image_key), key=image_key):
+        group = list(group)
+        try:
+            preprocess = preprocessor(chain)
+            images = [preprocess(renders.get(context, page_num, zoom, region)) for region in regions or (None,)]
+        except Exception as e:
+            logger.error(f"Render/preprocess ({chain}) failed for page {page_num}: {e}")
+            continue
+        for index in group:
+            try:
+                texts[index] = "\n".join(ocr.image_to_string(image, config=rungs[index].config)
+                                         for image in images)
+            except Exception as e:
+                logger.error(f"OCR ({rungs[index].name}) failed for page {page_num}: {e}")
+    renders.clear()
+    return texts
+
+
+# Per-process context for tuning workers: jobs arrive grouped by file, so
+# one open document per worker is enough
+_worker_document: Optional[DocumentContext] = None
+
+
+def _tune_job(pdf_path: str, page_num: int, rungs: Sequence[Rung], engine: Optional[str],
+              render_dir: Optional[str]) -> List[Optional[str]]:
+    """Process-pool worker: OCR one page under many rungs"""
+    global _worker_document
+    if _worker_document is None or str(_worker_document.pdf_path) != pdf_path:
+        if _worker_document is not None:
+            _worker_document.close()
+        # The parent reads and writes the persistent cache
+        _worker_document = DocumentContext(pdf_path, use_cache=False)
+    return ocr_page_grid(_worker_document, page_num, rungs, engine, RenderCache(render_dir))
+
+
+def evaluate_grid(pdf_paths: Sequence, rungs: Sequence[Rung], max_pages: Optional[int] = None,
+                  engine: Optional[str] = None, workers: Optional[int] = None,
+                  render_dir=None) -> Dict[str, List[List[Optional[str]]]]:
+    """
+    OCR the first pages of every PDF under every rung
+
+    Results already in the persistent OCR cache are read from it; only pages
+    with missing results are rendered and OCR'd, one job per page holding
+    every missing rung, across a process pool when workers > 1.
+
+    Args:
+        pdf_paths: PDFs to evaluate
+        rungs: Settings to compare (e.g. OCRProfile.rung() for each candidate)
+        max_pages: Pages per PDF, from the first (all pages by default)
+        engine: OCR engine name (see ocr_engines)
+        workers: Worker processes (None or 1 runs in this process)
+        render_dir: Directory to keep renders in between runs (see RenderCache)
+
+    Returns:
+        PDF path (as given, str) -> per rung, the text of each page (None
+        where OCR failed)
+    """
+    engine = get_engine(engine).name
+    render_dir = str(render_dir) if render_dir else None
+    results: Dict[str, List[List[Optional[str]]]] = {}
+    # (pdf path, page_num) -> rung indexes still to OCR
+    jobs: Dict[Tuple[str, int], List[int]] = {}
+    contexts: Dict[str, DocumentContext] = {}
+    try:
+        for pdf_path in map(str, pdf_paths):
+            context = contexts[pdf_path] = DocumentContext(pdf_path)
+            num_pages = context.page_count if max_pages is None else min(max_pages, context.page_count)
+            results[pdf_path] = [[None] * num_pages for _ in rungs]
+            for page_num in range(num_pages):
+                for index, rung in enumerate(rungs):
+                    text = context.get_ocr_text(page_num, config=rung_config(rung, engine, context.orientation))
+                    if text is None:
+                        jobs.setdefault((pdf_path, page_num), []).append(index)
+                    else:
+                        results[pdf_path][index][page_num] = text
+            # Workers open their own handles; keep only the cache connection here
+            context.close()
+
+        pages = sum(len(texts[0]) for texts in results.values() if texts)
+        logger.info(f"OCR grid: {len(rungs)} settings x {pages} pages, {len(jobs)} pages to OCR (the rest cached)")
+
+        def store(pdf_path, page_num, indexes, texts):
+            context = contexts[pdf_path]
+            for index, text in zip(indexes, texts):
+                results[pdf_path][index][page_num] = text
+                if text is not None:
+                    context.set_ocr_text(page_num, text, config=rung_config(rungs[index], engine, context.orientation))
+
+        workers = workers if workers and workers > 1 else 1
+        if workers == 1:
+            for (pdf_path, page_num), indexes in jobs.items():
+                context = contexts[pdf_path]
+                store(pdf_path, page_num, indexes,
+                      ocr_page_grid(context, page_num, [rungs[i] for i in indexes], engine, RenderCache(render_dir)))
+                context.release_pages(page_num, page_num)
+        elif jobs:
+            logger.info(f"OCR grid with {workers} workers")
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {key: pool.submit(_tune_job, key[0], key[1], [rungs[i] for i in indexes],
+                                            engine, render_dir)
+                           for key, indexes in jobs.items()}
+                for (pdf_path, page_num), future in futures.items():
+                    try:
+                        texts = future.result()
+                    except Exception as e:
+                        logger.error(f"OCR grid worker failed for {Path(pdf_path).name} page {page_num}: {e}")
+                        continue
+                    store(pdf_path, page_num, jobs[(pdf_path, page_num)], texts)
+    finally:
+        for context in contexts.values():
+            context.close()
+    return results
+
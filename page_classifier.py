@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Page Classifier
+Labels each page as text layer, scanned image, blank or mixed from its content
+stream operators and image placements, without running text layout, so
+processors can decide per page whether to read the text layer, OCR or skip
+"""
+
+import logging
+import re
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+PAGE_TEXT = 'text'        # Born-digital text, read the text layer
+PAGE_SCANNED = 'scanned'  # Image only, needs OCR
+PAGE_BLANK = 'blank'      # Nothing drawn worth reading
+PAGE_MIXED = 'mixed'      # Text over a page-sized image (e.g. an OCR'd scan): text layer first, OCR if it's empty
+
+# Share of the page an image must cover for a page with text to count as mixed
+SCAN_COVERAGE = 0.5
+# Images smaller than this (logos, signatures) don't make a textless page worth OCR
+MIN_IMAGE_COVERAGE = 0.05
+# Nested form XObjects followed when looking for text and images
+MAX_FORM_DEPTH = 5
+
+# Part of the persistent cache key, so changing the rules invalidates old labels
+CACHE_CONFIG = f"page_type:{SCAN_COVERAGE}:{MIN_IMAGE_COVERAGE}"
+
+Matrix = Tuple[float, float, float, float, float, float]
+IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+# String operands followed by a text-showing operator, ignoring empty and
+# space-only strings (an array counts if it holds any string)
+_TEXT_SHOW = re.compile(rb"""
+    (?: \((?:\\.|[^\\)])*[^\s\\)](?:\\.|[^\\)])*\)
+      | <[0-9A-Fa-f\s]*[1-9A-Fa-f][0-9A-Fa-f\s]*>
+      | \[[^\]]*[(<][^\]]*\]
+    )\s*(?:Tj|TJ|'|")
+""", re.X)
+# Literal and hex strings, blanked out before looking for graphics operators
+_STRINGS = re.compile(rb'\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>(?!>)')
+# Graphics state and drawing operators; inline images are skipped whole
+_GRAPHICS_OPS = re.compile(rb'(?<![\w/])(?:BI\b.*?\bEI|cm|Do|q|Q)(?![\w])', re.S)
+_NUMBERS = re.compile(rb'[+-]?(?:\d+\.?\d*|\.\d+)')
+_XOBJECT_NAME = re.compile(rb'(/[^\s/\[\]()<>{}%]+)\s*$')
+# Bytes before an operator searched for its operands
+_OPERAND_WINDOW = 160
+
+
+def _multiply(m: Matrix, n: Matrix) -> Matrix:
+    """m then n, in PDF row-vector convention"""
+    a, b, c, d, e, f = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (a * a2 + b * c2, a * b2 + b * d2,
+            c * a2 + d * c2, c * b2 + d * d2,
+            e * a2 + f * c2 + e2, e * b2 + f * d2 + f2)
+
+
+def _stream_data(obj) -> bytes:
+    """Decoded bytes of a content stream or an array of them"""
+    obj = obj.get_object()
+    if isinstance(obj, list):
+        return b"\n".join(part.get_object().get_data() for part in obj)
+    return obj.get_data()
+
+
+def _scan(data: bytes, resources, ctm: Matrix, depth: int) -> Tuple[int, float]:
+    """Count text-showing operators and sum image area (user space units²)"""
+    text_ops = len(_TEXT_SHOW.findall(data))
+    image_area = 0.0
+    stack: List[Matrix] = []
+
+    data = _STRINGS.sub(b'()', data)
+    for match in _GRAPHICS_OPS.finditer(data):
+        op = match.group()
+        if op == b'q':
+            stack.append(ctm)
+        elif op == b'Q':
+            ctm = stack.pop() if stack else ctm
+        elif op == b'cm':
+            operands = _NUMBERS.findall(data, max(0, match.start() - _OPERAND_WINDOW), match.start())
+            if len(operands) >= 6:
+                ctm = _multiply(tuple(float(v) for v in operands[-6:]), ctm)
+        elif op == b'Do':
+            name = _XOBJECT_NAME.search(data, max(0, match.start() - _OPERAND_WINDOW), match.start())
+            if name:
+                text, area = _draw_xobject(name.group(1).decode('latin-1'), resources, ctm, depth)
+                text_ops += text
+                image_area += area
+        else:
+            # Inline image, drawn into the unit square like an image XObject
+            image_area += abs(ctm[0] * ctm[3] - ctm[1] * ctm[2])
+
+    return text_ops, image_area
+
+
+def _draw_xobject(name: str, resources, ctm: Matrix, depth: int) -> Tuple[int, float]:
+    """Text operators and image area drawn by a named XObject"""
+    try:
+        xobject = resources['/XObject'].get_object()[name].get_object()
+    except (KeyError, TypeError, AttributeError):
+        return 0, 0.0
+
+    subtype = xobject.get('/Subtype')
+    if subtype == '/Image':
+        # Images are drawn into the unit square, so the CTM determinant is their area
+        return 0, abs(ctm[0] * ctm[3] - ctm[1] * ctm[2])
+    if subtype == '/Form' and depth < MAX_FORM_DEPTH:
+        matrix = tuple(float(v) for v in xobject.get('/Matrix', IDENTITY))
+        form_resources = xobject.get('/Resources')
+        form_resources = form_resources.get_object() if form_resources is not None else resources
+        return _scan(xobject.get_data(), form_resources, _multiply(matrix, ctm), depth + 1)
+    return 0, 0.0
+
+
+def page_stats(page) -> Tuple[int, float]:
+    """
+    Measure a PyPDF2 page without extracting its text
+
+    Args:
+        page: PyPDF2 PageObject
+
+    Returns:
+        Tuple of (text-showing operators with visible glyphs,
+                  fraction of the page covered by images, capped at 1)
+    """
+    contents = page.get('/Contents')
+    if contents is None:
+        return 0, 0.0
+    resources = page.get('/Resources')
+    resources = resources.get_object() if resources is not None else {}
+    text_ops, image_area = _scan(_stream_data(contents), resources, IDENTITY, 0)
+
+    page_area = float(page.mediabox.width) * float(page.mediabox.height)
+    coverage = min(image_area / page_area, 1.0) if page_area else 0.0
+    return text_ops, coverage
+
+
+def classify_page(page) -> str:
+    """
+    Classify a PyPDF2 page as PAGE_TEXT, PAGE_SCANNED, PAGE_BLANK or PAGE_MIXED
+
+    Args:
+        page: PyPDF2 PageObject
+
+    Returns:
+        Page type; unreadable content streams count as PAGE_MIXED so callers
+        try the text layer and fall back to OCR
+    """
+    try:
+        text_ops, coverage = page_stats(page)
+    except Exception as e:
+        logger.debug(f"Could not classify page: {e}")
+        return PAGE_MIXED
+
+    if text_ops:
+        return PAGE_MIXED if coverage >= SCAN_COVERAGE else PAGE_TEXT
+    return PAGE_SCANNED if coverage >= MIN_IMAGE_COVERAGE else PAGE_BLANK
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Page Orientation
+Estimates how a scanned batch sits on the glass (quarter-turn rotation and a
+small skew) from one downsampled page, so every later render of the file can
+be straightened before OCR. Rotation comes from Tesseract's orientation
+detection when the OCR engine supports it; skew from the projection profile
+of the page's ink, which is sharpest when text lines run level.
+"""
+
+import logging
+from typing import Iterable, NamedTuple, Optional
+
+import numpy as np
+from PIL import Image
+
+from image_preprocess import otsu, to_array
+from ocr_engines import get_engine
+
+logger = logging.getLogger(__name__)
+
+# Zoom of the one render orientation is estimated from (108 dpi)
+DETECT_ZOOM = 1.5
+# Skew search range and resolution, in degrees
+MAX_SKEW = 5.0
+SKEW_STEP = 0.5
+SKEW_REFINE_STEP = 0.1
+# Smaller skews are left alone: straightening costs a full-page render per crop
+MIN_SKEW = 0.3
+# Column strips whose row profiles are shifted against each other
+SKEW_STRIPS = 32
+# A skew must sharpen the row profile by this much over level to count (text
+# pages gain several times over even at small skews, noise well under half)
+MIN_PROFILE_GAIN = 1.0
+# Pages with less ink than this say nothing about orientation
+MIN_INK = 0.002
+# Candidate pages tried before giving up on a file
+SAMPLE_PAGES = 3
+
+# Part of the persistent cache key, so changing the rules invalidates old results
+CACHE_CONFIG = f"orientation:{DETECT_ZOOM}:{MAX_SKEW}:{MIN_SKEW}:{MIN_PROFILE_GAIN}"
+
+
+class Orientation(NamedTuple):
+    """Correction for a scan: quarter turns clockwise, then skew degrees counter-clockwise"""
+    rotation: int = 0
+    skew: float = 0.0
+
+    @property
+    def upright(self) -> bool:
+        return self.rotation == 0 and self.skew == 0
+
+    def key(self) -> str:
+        """Compact form for cache keys, e.g. "rot90:skew-1.5" """
+        return f"rot{self.rotation}:skew{self.skew:g}"
+
+    @classmethod
+    def parse(cls, key: str) -> 'Orientation':
+        """Inverse of key()"""
+        rotation, _, skew = key.partition(':')
+        return cls(int(rotation[len('rot'):]), float(skew[len('skew'):]))
+
+    def apply(self, image: Image.Image) -> Image.Image:
+        """Straighten a grayscale render of the page"""
+        if self.rotation:
+            # PIL turns counter-clockwise
+            image = image.rotate(-self.rotation, expand=True)
+        if self.skew:
+            image = image.rotate(self.skew, resample=Image.Resampling.BILINEAR, fillcolor=255)
+        return image
+
+
+def _profile_score(profiles: np.ndarray, offsets: np.ndarray, margin: int) -> float:
+    """
+    Sum of squared row-to-row ink changes with each column strip shifted by
+    its offset (peaks when the shifts line the text up level)
+    """
+    height = profiles.shape[0]
+    rows = sum(profiles[margin + offset:height - margin + offset, strip] for strip, offset in enumerate(offsets))
+    return float(np.sum(np.diff(rows) ** 2))
+
+
+def estimate_skew(image) -> Optional[float]:
+    """
+    Skew of the text lines on a page by projection profile
+
+    The page is cut into column strips whose row profiles are summed with
+    each strip shifted as a skewed line would run, so every pixel counts
+    once at every angle tried (no resampling).
+
+    Args:
+        image: Grayscale PIL image or uint8 array, dark text on light paper
+
+    Returns:
+        Degrees to rotate counter-clockwise to level the lines (0.0 when
+        under MIN_SKEW or not clearly better than level), None when the
+        page has too little ink to tell
+    """
+    ink = otsu(to_array(image)) == 0
+    if ink.mean() < MIN_INK:
+        return None
+    height, width = ink.shape
+    strip_width = max(width // SKEW_STRIPS, 1)
+    strips = width // strip_width
+    profiles = ink[:, :strips * strip_width].reshape(height, strips, strip_width).sum(axis=2, dtype=np.int64)
+    # Strip centres relative to the page centre
+    centres = (np.arange(strips) + 0.5) * strip_width - width / 2
+    margin = int(np.ceil(np.abs(centres).max() * np.tan(np.radians(MAX_SKEW + SKEW_STEP)))) + 1
+    if height <= 2 * margin + 1:
+        return None
+
+    def score(angle):
+        # Lines turned clockwise by angle run down to the right
+        return _profile_score(profiles, np.round(centres * np.tan(np.radians(angle))).astype(int), margin)
+
+    level = score(0.0)
+    coarse = np.arange(-MAX_SKEW, MAX_SKEW + SKEW_STEP / 2, SKEW_STEP)
+    best = max(coarse, key=score)
+    fine = np.arange(best - SKEW_STEP, best + SKEW_STEP + SKEW_REFINE_STEP / 2, SKEW_REFINE_STEP)
+    best = max(fine, key=score)
+
+    skew = round(float(best), 1)
+    if abs(skew) < MIN_SKEW or score(skew) < level * (1 + MIN_PROFILE_GAIN):
+        return 0.0
+    return skew
+
+
+def detect_orientation(context, pages: Iterable[int], engine: Optional[str] = None) -> Orientation:
+    """
+    Estimate the correction for a file from the first of its pages with enough ink
+
+    Args:
+        context: DocumentContext for the PDF
+        pages: Candidate page numbers (0-indexed), e.g. the scanned pages;
+               at most SAMPLE_PAGES are rendered
+        engine: OCR engine used for orientation detection (see ocr_engines)
+
+    Returns:
+        Orientation to apply to every render (upright if nothing was found)
+    """
+    ocr = get_engine(engine)
+    for page_num in list(pages)[:SAMPLE_PAGES]:
+        image = context.render_page(page_num, zoom=DETECT_ZOOM, correct=False)
+        rotation = ocr.detect_rotation(image) or 0
+        if rotation:
+            image = image.rotate(-rotation, expand=True)
+        skew = estimate_skew(image)
+        if skew is None:
+            continue
+        orientation = Orientation(rotation, skew)
+        if not orientation.upright:
+            logger.info(f"{context.pdf_path.name}: straightening scans by {orientation.key()} "
+                        f"(from page {page_num + 1})")
+        return orientation
+    return Orientation()
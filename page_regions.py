@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Page Regions of Interest
+Named page zones where file numbers and boundary markers appear, configured
+per document type so extraction can read a small crop before the full page
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+# (x0, top, x1, bottom) as fractions of the page width/height
+Region = Tuple[float, float, float, float]
+
+REGIONS: Dict[str, Region] = {
+    'top_third': (0.0, 0.0, 1.0, 1 / 3),
+    # Caption and document title ("INFORMATION SUBPOENA WITH RESTRAINING NOTICE")
+    'header': (0.0, 0.0, 1.0, 0.3),
+    # Attorney signature block with "File No." (IS page 2)
+    'signature_block': (0.0, 0.3, 1.0, 0.65),
+    # Debtor details with "Account Number:" (IS page 3)
+    'account_block': (0.0, 0.6, 1.0, 1.0),
+}
+
+# Document type -> field -> region names, checked in order
+DOC_TYPE_REGIONS: Dict[str, Dict[str, List[str]]] = {
+    'IS': {
+        'start_marker': ['header'],
+        'file_number': ['signature_block', 'account_block'],
+    },
+    # LTD letters and everything else put "Our File Number:" in the letterhead
+    'default': {
+        'file_number': ['top_third'],
+    },
+}
+
+
+def get_regions(doc_type: Optional[str], field: str,
+                overrides: Optional[Dict[str, Dict[str, List]]] = None) -> List[Region]:
+    """
+    Resolve the regions to read for a field of a document type
+
+    Args:
+        doc_type: Document type ('IS', 'LTD', ...) or None for the default
+        field: 'file_number' or 'start_marker'
+        overrides: Same shape as DOC_TYPE_REGIONS; entries may be region
+                   names or explicit (x0, top, x1, bottom) tuples
+
+    Returns:
+        List of fractional bounding boxes (empty if the field has no regions)
+    """
+    overrides = overrides or {}
+    for key in (doc_type, 'default'):
+        for table in (overrides, DOC_TYPE_REGIONS):
+            fields = table.get(key, {})
+            if field in fields:
+                return [REGIONS[r] if isinstance(r, str) else tuple(r) for r in fields[field]]
+    return []
@@ -9,35 +9,40 @@ import os
 import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 from datetime import datetime
 import argparse
 
-from PyPDF2 import PdfReader, PdfWriter
-import pdfplumber
+import file_number_patterns
+import keyword_scanner
+import regex_engine
+import rule_profiler
+import rule_registry
+from document_context import DocumentContext, PageTextSequence
+from page_regions import get_regions
+from split_writer import write_pages, write_splits
+from text_backends import DEFAULT_BACKEND, available_backends
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Complete IS file numbers: L2400290, JM221025, 12345678
+IS_FILE_NUMBER_FORMAT = re.compile(r'^(?:[A-Z]\d{7}|[A-Z]{2}\d{6}|\d{8})$')
+
 
 class PDFSplitter:
     """PDF Splitter with pattern-based extraction"""
     
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", text_backend: str = DEFAULT_BACKEND,
+                 regions: Optional[Dict[str, Dict[str, List]]] = None):
         self.output_dir = Path(output_dir)
+        # Extractor used when split_pdf opens its own DocumentContext
+        self.text_backend = text_backend
+        # Per-document-type region overrides (see page_regions.DOC_TYPE_REGIONS)
+        self.regions = regions
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.processed_files = []
         
-        self.file_patterns = [
-            r'Our File Number:\s*([A-Z0-9]{6,8})',  # Allow any mix of letters/digits
-            r'File Number:\s*([A-Z0-9]{6,8})',
-            r'File No[.:]?\s*([A-Z0-9]{6,8})',  # Added "File No." pattern
-            r'File #:\s*([A-Z0-9]{6,8})',
-            r'Case Number:\s*([A-Z0-9]{6,8})',
-            r'Case No[.:]?\s*([A-Z0-9]{6,8})',
-            r'Matter #:\s*([A-Z0-9]{6,8})'
-        ]
-        
         self.debtor_patterns = [
             r'To:\s*([^\n]+?)(?:\n|$)',
             r'Debtor:\s*([^\n]+?)(?:\n|$)',
@@ -50,29 +55,29 @@ class PDFSplitter:
             r'(\d+\s+[^\n]+(?:\n[^\n]+){0,2})'
         ]
     
+    @property
+    def file_patterns(self) -> file_number_patterns.PatternSet:
+        """Compiled once, shared with the other extractors, current with the rules file (see rule_registry)"""
+        return file_number_patterns.LETTER
+
     def extract_file_number(self, text: str) -> Optional[str]:
         """Extract file number from text"""
-        for pattern in self.file_patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                file_number = match.group(1).strip().upper()
-                file_number = re.sub(r'[^A-Z0-9]', '', file_number)
-
-                # Apply smart OCR correction: if starts with "1" and is 8 chars,
-                # likely should be "L" (common OCR error)
-                if len(file_number) == 8 and file_number[0] == '1':
-                    # Only correct if rest are digits (L + 7 digits pattern)
-                    if file_number[1:].isdigit():
-                        file_number = 'L' + file_number[1:]
-
-                if len(file_number) <= 8:
-                    return file_number
+        return self.file_patterns.first(text, self._clean_file_number)
+
+    @staticmethod
+    def _clean_file_number(value: str) -> Optional[str]:
+        """Normalize a captured file number, None if it can't be one"""
+        # Smart OCR correction (e.g. a leading "1" read for "L"), from the rules file
+        file_number = rule_registry.current().corrections['letter'].apply(file_number_patterns.normalize(value))
+
+        if len(file_number) <= 8:
+            return file_number
         return None
     
     def extract_debtor_name(self, text: str) -> Optional[str]:
         """Extract debtor name from text"""
-        for pattern in self.debtor_patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+        for i, pattern in enumerate(self.debtor_patterns):
+            match = rule_profiler.search(f'debtor.{i}', pattern, text, re.IGNORECASE | re.MULTILINE)
             if match:
                 name = match.group(1).strip()
                 name = re.sub(r'\s+', ' ', name)
@@ -83,8 +88,8 @@ class PDFSplitter:
     
     def extract_address(self, text: str) -> Optional[str]:
         """Extract address from text"""
-        for pattern in self.address_patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+        for i, pattern in enumerate(self.address_patterns):
+            match = rule_profiler.search(f'address.{i}', pattern, text, re.IGNORECASE | re.MULTILINE)
             if match:
                 address = match.group(1).strip()
                 address = re.sub(r'\s+', ' ', address)
@@ -94,41 +99,29 @@ class PDFSplitter:
     
     def detect_document_type(self, text: str, filename: Optional[str] = None) -> str:
         """Detect document type from content and filename"""
-        text_lower = text.lower()
-
         # Check filename patterns first for specific types
         if filename:
             filename_upper = filename.upper()
             if 'REG_F_SCAN' in filename_upper:
                 return "LTD"
 
+        # One keyword scan, shared with detect_jurisdiction on the same text
+        hits = keyword_scanner.scan(text)
+
         # Check for Information Subpoena first (most specific)
-        if 'information subpoena with restraining notice' in text_lower:
+        if hits.has('information subpoena with restraining notice'):
             return "IS"
-        elif any(term in text_lower for term in ['registration', 'register', 'filing']):
-            return "REGF"
-        elif any(term in text_lower for term in ['affidavit', 'sworn', 'notarized']):
-            return "AFF"
-        elif any(term in text_lower for term in ['initial', 'complaint', 'petition']):
-            return "ICD"
-        elif any(term in text_lower for term in ['notice', 'notification']):
-            return "NOTICE"
-        elif any(term in text_lower for term in ['summons', 'subpoena']):
-            return "SUMMONS"
-        elif any(term in text_lower for term in ['motion', 'brief']):
-            return "MOTION"
-        else:
-            return "UNKNOWN"
+        for document_type, terms in keyword_scanner.DOCUMENT_TYPE_TERMS:
+            if hits.any(terms):
+                return document_type
+        return "UNKNOWN"
     
     def detect_jurisdiction(self, text: str) -> Optional[str]:
         """Detect NY or NJ jurisdiction"""
-        text_lower = text.lower()
+        hits = keyword_scanner.scan(text)
         
-        ny_indicators = ['new york', 'ny ', 'n.y.', 'state of new york', 'county of']
-        nj_indicators = ['new jersey', 'nj ', 'n.j.', 'state of new jersey', 'superior court']
-        
-        ny_score = sum(1 for indicator in ny_indicators if indicator in text_lower)
-        nj_score = sum(1 for indicator in nj_indicators if indicator in text_lower)
+        ny_score = hits.count(keyword_scanner.JURISDICTION_TERMS["NY"])
+        nj_score = hits.count(keyword_scanner.JURISDICTION_TERMS["NJ"])
         
         if ny_score > nj_score:
             return "NY"
@@ -138,24 +131,64 @@ class PDFSplitter:
     
     def find_document_boundaries(self, pages_text: List[str]) -> List[Tuple[int, int]]:
         """Find document boundaries based on file number patterns"""
-        boundaries = []
+        boundaries = list(self.iter_document_boundaries(pages_text))
+        
+        if not boundaries and pages_text:
+            return [(0, len(pages_text) - 1)]
+        
+        return boundaries
+
+    def iter_document_boundaries(self, pages_text: Sequence[str],
+                                 full_text: Optional[Sequence[str]] = None) -> Iterator[Tuple[int, int]]:
+        """Yield each (start, end) boundary as soon as the next file number closes it
+
+        Args:
+            pages_text: Text to find file numbers in (e.g. the file-number regions)
+            full_text: Full page texts; a page whose pages_text has no file
+                       number is rescanned in full, for documents whose number
+                       sits outside the configured regions
+        """
         current_start = None
         
         for i, text in enumerate(pages_text):
             file_num = self.extract_file_number(text)
+            if not file_num and full_text is not None:
+                file_num = self.extract_file_number(full_text[i])
             
             if file_num:
                 if current_start is not None:
-                    boundaries.append((current_start, i - 1))
+                    yield current_start, i - 1
                 current_start = i
         
         if current_start is not None:
-            boundaries.append((current_start, len(pages_text) - 1))
-        
-        if not boundaries and pages_text:
-            return [(0, len(pages_text) - 1)]
+            yield current_start, len(pages_text) - 1
+
+    def _iter_boundaries(self, region_text: Sequence[str], pages_text: Sequence[str],
+                         doc_type: Optional[str], pages_per_doc: Optional[int],
+                         auto_detect: bool) -> Iterator[Tuple[int, int]]:
+        """Yield boundaries in page order for the selected split mode
+
+        Auto-detection reads the file-number regions and falls back to the
+        full page, page by page, where a page's regions contain no file number.
+        """
+        total_pages = len(pages_text)
+        if doc_type == "IS":
+            # Special handling for IS documents - always use fixed 7-page boundaries
+            pages_per_doc = 7
+        elif auto_detect and not pages_per_doc:
+            found = False
+            full_text = pages_text if region_text is not pages_text else None
+            for boundary in self.iter_document_boundaries(region_text, full_text):
+                found = True
+                yield boundary
+            if not found and total_pages:
+                yield 0, total_pages - 1
+            return
+        else:
+            pages_per_doc = pages_per_doc or 1
         
-        return boundaries
+        for i in range(0, total_pages, pages_per_doc):
+            yield i, min(i + pages_per_doc - 1, total_pages - 1)
     
     def extract_is_file_number(self, pages_text: List[str]) -> Optional[str]:
         """Extract IS file number from multiple sources with validation
@@ -166,48 +199,46 @@ class PDFSplitter:
 
         We check both and use validation to get the correct number.
         """
+        return self._select_is_file_number(self._is_file_number_sources(pages_text))
+
+    def extract_is_file_number_from_regions(self, region_pages: Sequence[str],
+                                            pages_text: Sequence[str]) -> Optional[str]:
+        """IS file number from the file-number regions, else from the full pages
+
+        The region result is only taken when it is the page 3 Account Number
+        (the source extract_is_file_number prefers) and has a complete file
+        number format; anything else (e.g. a partial "File No. L2" in the
+        signature block) could hide a page 3 number outside the regions, so
+        the full pages are read as without regions.
+        """
+        file_numbers = self._is_file_number_sources(region_pages)
+        if any(source == 'page3' for source, _ in file_numbers):
+            file_number = self._select_is_file_number(file_numbers)
+            if IS_FILE_NUMBER_FORMAT.match(file_number):
+                return file_number
+        return self.extract_is_file_number(pages_text)
+
+    def _is_file_number_sources(self, pages_text: Sequence[str]) -> List[Tuple[str, str]]:
+        """(source page, number) for each page that has an IS file number candidate"""
         file_numbers = []
 
         # Check Page 2 for File No.
         if len(pages_text) > 1:
             page2_text = pages_text[1]  # Page 2 (0-indexed)
 
-            # Look for file number after "File No."
-            patterns = [
-                r'File\s*No[.:]\s*([A-Z0-9]{2,8})',  # Allow partial numbers (L2)
-                r'Attorney.*\n.*File\s*No[.:]\s*([A-Z0-9]{2,8})',
-                r'Attorney\s+for\s+J[^\n]*\n\s*File\s*No[.:]\s*([A-Z0-9]{2,8})',
-                r'Attorney\s+for\s+[^\n]*\n\s*File\s*No[.:]\s*([A-Z0-9]{2,8})',
-                r'File\s*No[.:]\s*([A-Z0-9]{2,8})\s*\n\s*Creditor',
-            ]
-
-            for pattern in patterns:
-                match = re.search(pattern, page2_text, re.IGNORECASE | re.MULTILINE | re.DOTALL)
-                if match:
-                    file_number = match.group(1).strip().upper()
-                    if len(file_number) >= 2:  # Accept even partial numbers
-                        file_numbers.append(('page2', file_number))
-                        break
+            # Look for file number after "File No." (partial numbers like L2 count)
+            candidates = file_number_patterns.IS_SIGNATURE.scan(page2_text)
+            if candidates:
+                file_numbers.append(('page2', candidates[0].value.strip().upper()))
 
         # Check Page 3 for Account Number (more reliable)
         if len(pages_text) > 2:
             page3_text = pages_text[2]  # Page 3 (0-indexed)
 
             # Look for Account Number
-            account_patterns = [
-                r'Account\s*Number[.:]\s*([A-Z0-9]{6,8})',
-                r'Account\s*#[.:]\s*([A-Z0-9]{6,8})',
-                r'Acct\s*Number[.:]\s*([A-Z0-9]{6,8})',
-                r'Acct\s*No[.:]\s*([A-Z0-9]{6,8})',
-            ]
-
-            for pattern in account_patterns:
-                match = re.search(pattern, page3_text, re.IGNORECASE | re.MULTILINE)
-                if match:
-                    file_number = match.group(1).strip().upper()
-                    if len(file_number) >= 6:  # Account numbers should be complete
-                        file_numbers.append(('page3', file_number))
-                        break
+            candidates = file_number_patterns.IS_ACCOUNT.scan(page3_text)
+            if candidates:
+                file_numbers.append(('page3', candidates[0].value.strip().upper()))
 
         # Check other pages for additional validation
         for page_num, page_text in enumerate(pages_text[:5]):  # Check first 5 pages
@@ -215,22 +246,14 @@ class PDFSplitter:
                 continue
 
             # Look for any file/account number patterns
-            extra_patterns = [
-                r'Our\s*File\s*Number[.:]\s*([A-Z0-9]{6,8})',
-                r'File\s*#[.:]\s*([A-Z0-9]{6,8})',
-                r'Matter\s*Number[.:]\s*([A-Z0-9]{6,8})',
-                r'Case\s*Number[.:]\s*([A-Z0-9]{6,8})',
-            ]
-
-            for pattern in extra_patterns:
-                match = re.search(pattern, page_text, re.IGNORECASE | re.MULTILINE)
-                if match:
-                    file_number = match.group(1).strip().upper()
-                    if len(file_number) >= 6:
-                        file_numbers.append((f'page{page_num+1}', file_number))
-                        break
-
-        # Process and select best file number
+            candidates = file_number_patterns.IS_OTHER.scan(page_text)
+            if candidates:
+                file_numbers.append((f'page{page_num+1}', candidates[0].value.strip().upper()))
+        return file_numbers
+
+    @staticmethod
+    def _select_is_file_number(file_numbers: List[Tuple[str, str]]) -> Optional[str]:
+        """Best of the sources found, with OCR corrections"""
         if file_numbers:
             # Prefer page 3 Account Number (most reliable)
             page3_numbers = [num for source, num in file_numbers if source == 'page3']
@@ -263,108 +286,183 @@ class PDFSplitter:
         return None
 
     def split_pdf(self, input_pdf_path: str, doc_type: Optional[str] = None,
-                  pages_per_doc: Optional[int] = None, auto_detect: bool = True):
-        """Split PDF into individual documents"""
+                  pages_per_doc: Optional[int] = None, auto_detect: bool = True,
+                  context: Optional[DocumentContext] = None, workers: Optional[int] = None):
+        """Split PDF into individual documents
+
+        Pass a shared DocumentContext to reuse the parsed file and any page
+        text already extracted by the detector. workers > 1 extracts all
+        pages up front in a process pool; boundaries and output names are
+        the same as the serial path.
+        """
         input_path = Path(input_pdf_path)
         if not input_path.exists():
             logger.error(f"Input file not found: {input_pdf_path}")
             return []
         
+        ctx = context or DocumentContext(input_pdf_path, backend=self.text_backend)
         try:
-            reader = PdfReader(input_pdf_path)
-            total_pages = len(reader.pages)
+            return self._split_with_context(ctx, input_path, doc_type, pages_per_doc, auto_detect, workers)
+        finally:
+            if context is None:
+                ctx.close()
+
+    def _split_with_context(self, ctx: DocumentContext, input_path: Path, doc_type: Optional[str],
+                            pages_per_doc: Optional[int], auto_detect: bool, workers: Optional[int] = None):
+        """Split using an open DocumentContext"""
+        try:
+            total_pages = ctx.page_count
             logger.info(f"Processing: {input_path.name} ({total_pages} pages)")
         except Exception as e:
             logger.error(f"Error opening PDF: {e}")
             return []
         
-        pages_text = []
-        with pdfplumber.open(input_pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text() or ""
-                pages_text.append(text)
+        # Pages are extracted on first access, so fixed-length IS splits never
+        # read the pages file-number extraction doesn't look at
+        pages_text = PageTextSequence(ctx)
+        region_text = self._file_number_text(ctx, doc_type, pages_text)
+        if workers and workers > 1:
+            # Everything below then reads from memory in page order
+            ctx.prefetch(regions=region_text.regions, workers=workers)
         
-        # Special handling for IS documents - always use fixed 7-page boundaries
+        boundaries = list(self._iter_boundaries(region_text, pages_text, doc_type, pages_per_doc, auto_detect))
         if doc_type == "IS":
-            pages_per_doc = 7
-            boundaries = [(i, min(i + pages_per_doc - 1, total_pages - 1))
-                         for i in range(0, total_pages, pages_per_doc)]
-            logger.info(f"IS document: using fixed {pages_per_doc}-page boundaries, found {len(boundaries)} document(s)")
+            logger.info(f"IS document: using fixed 7-page boundaries, found {len(boundaries)} document(s)")
         elif auto_detect and not pages_per_doc:
-            boundaries = self.find_document_boundaries(pages_text)
             logger.info(f"Auto-detected {len(boundaries)} document(s)")
-        else:
-            pages_per_doc = pages_per_doc or 1
-            boundaries = [(i, min(i + pages_per_doc - 1, total_pages - 1))
-                         for i in range(0, total_pages, pages_per_doc)]
         
-        for doc_idx, (start_page, end_page) in enumerate(boundaries):
-            first_page_text = pages_text[start_page] if start_page < len(pages_text) else ""
-            all_pages_text = " ".join(pages_text[start_page:end_page+1])
-
-            # For IS documents, extract file number from page 2
-            if doc_type == "IS":
-                # Get pages for this document boundary
-                doc_pages = pages_text[start_page:end_page+1]
-                file_number = self.extract_is_file_number(doc_pages)
-                # If not found on page 2, try standard extraction on first page
-                if not file_number:
-                    file_number = self.extract_file_number(first_page_text)
-            else:
-                file_number = self.extract_file_number(first_page_text)
-
-            debtor_name = self.extract_debtor_name(first_page_text)
-            address = self.extract_address(first_page_text)
-            
-            if doc_type:
-                document_type = doc_type
-            elif auto_detect:
-                document_type = self.detect_document_type(all_pages_text, input_path.name)
-            else:
-                document_type = "REGF"
-            
-            jurisdiction = self.detect_jurisdiction(all_pages_text)
-            
-            if not file_number:
-                file_number = f"UNKNOWN_{doc_idx+1:03d}"
-            
-            output_filename = f"{document_type}_{file_number}.pdf"
-            output_path = self.output_dir / output_filename
-            
-            writer = PdfWriter()
-            for page_num in range(start_page, end_page + 1):
-                if page_num < len(reader.pages):
-                    writer.add_page(reader.pages[page_num])
-            
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
-            
-            doc_info = {
-                'file_number': file_number,
-                'debtor_name': debtor_name,
-                'address': address,
-                'document_type': document_type,
-                'jurisdiction': jurisdiction,
-                'output_file': output_filename,
-                'pages': f"{start_page + 1}-{end_page + 1}",
-                'page_count': end_page - start_page + 1,
-                'timestamp': datetime.now().isoformat()
-            }
-            
+        documents = [self._describe_document(input_path, pages_text, region_text, doc_type,
+                                             auto_detect, doc_idx, start_page, end_page)
+                     for doc_idx, (start_page, end_page) in enumerate(boundaries)]
+        
+        # All outputs from the one open source, streams copied verbatim
+        write_splits(ctx.fitz_doc, [(range(start_page, end_page + 1), self.output_dir / doc_info['output_file'])
+                                    for (start_page, end_page), doc_info in zip(boundaries, documents)])
+        for doc_info in documents:
+            self._log_document(doc_info)
             self.processed_files.append(doc_info)
-            
-            logger.info(f"Created: {output_filename}")
-            logger.info(f"  File Number: {file_number}")
-            logger.info(f"  Debtor: {debtor_name or 'Not found'}")
-            logger.info(f"  Type: {document_type}")
-            logger.info(f"  Jurisdiction: {jurisdiction or 'Unknown'}")
-            logger.info(f"  Pages: {doc_info['pages']}")
         
         self.save_manifest()
         self.print_summary()
         
         return self.processed_files
     
+    def iter_split_pdf(self, input_pdf_path: str, doc_type: Optional[str] = None,
+                       pages_per_doc: Optional[int] = None, auto_detect: bool = True,
+                       context: Optional[DocumentContext] = None) -> Iterator[Dict]:
+        """Split PDF in a single forward pass, yielding each document as it is written
+
+        Streaming mode for very large batches: each output PDF and its
+        manifest.jsonl record are written as soon as the document's last page
+        has been read, and the page text and parsed objects behind it are then
+        released, so peak memory follows the largest document rather than the
+        input file. Pages whose file-number regions miss are rescanned in
+        full one at a time, so the fallback stays bounded too. Records are
+        not accumulated in processed_files.
+        """
+        input_path = Path(input_pdf_path)
+        if not input_path.exists():
+            logger.error(f"Input file not found: {input_pdf_path}")
+            return
+        
+        ctx = context or DocumentContext(input_pdf_path, backend=self.text_backend)
+        manifest_path = self.output_dir / "manifest.jsonl"
+        try:
+            logger.info(f"Streaming: {input_path.name} ({ctx.page_count} pages)")
+            pages_text = PageTextSequence(ctx)
+            region_text = self._file_number_text(ctx, doc_type, pages_text)
+            
+            released = 0
+            with open(manifest_path, 'w') as manifest:
+                boundaries = self._iter_boundaries(region_text, pages_text, doc_type, pages_per_doc, auto_detect)
+                for doc_idx, (start_page, end_page) in enumerate(boundaries):
+                    doc_info = self._describe_document(input_path, pages_text, region_text, doc_type,
+                                                       auto_detect, doc_idx, start_page, end_page)
+                    write_pages(ctx.fitz_doc, range(start_page, end_page + 1),
+                                self.output_dir / doc_info['output_file'])
+                    self._log_document(doc_info)
+                    manifest.write(json.dumps(doc_info) + "\n")
+                    manifest.flush()
+                    
+                    # Pages before the first detected document are skipped,
+                    # same as split_pdf, so release everything up to here
+                    ctx.release_pages(released, end_page)
+                    released = end_page + 1
+                    yield doc_info
+            logger.info(f"Manifest saved: {manifest_path}")
+        finally:
+            if context is None:
+                ctx.close()
+    
+    def _file_number_text(self, ctx: DocumentContext, doc_type: Optional[str],
+                          pages_text: PageTextSequence) -> PageTextSequence:
+        """Page texts restricted to the file-number regions of a document type"""
+        file_number_regions = get_regions(doc_type, 'file_number', self.regions)
+        return PageTextSequence(ctx, regions=file_number_regions) if file_number_regions else pages_text
+    
+    def _describe_document(self, input_path: Path, pages_text: PageTextSequence,
+                           region_text: PageTextSequence, doc_type: Optional[str], auto_detect: bool,
+                           doc_idx: int, start_page: int, end_page: int) -> Dict:
+        """Extract the metadata and output name for one boundary as a manifest record"""
+        first_page_text = pages_text[start_page] if start_page < len(pages_text) else ""
+
+        # For IS documents, extract file number from page 2
+        if doc_type == "IS":
+            # Get pages for this document boundary
+            doc_pages = pages_text[start_page:end_page+1]
+            file_number = self.extract_is_file_number_from_regions(region_text[start_page:end_page+1],
+                                                                   doc_pages)
+            # If not found on page 2, try standard extraction on first page
+            if not file_number:
+                file_number = self.extract_file_number(first_page_text)
+        else:
+            file_number = (self.extract_file_number(region_text[start_page])
+                           or self.extract_file_number(first_page_text))
+
+        debtor_name = self.extract_debtor_name(first_page_text)
+        address = self.extract_address(first_page_text)
+        
+        if doc_type == "IS":
+            # The caption is on page 1 (repeated on page 4); read only the
+            # pages file-number extraction already touched
+            all_pages_text = " ".join(pages_text[start_page:min(start_page + 5, end_page + 1)])
+        else:
+            all_pages_text = " ".join(pages_text[start_page:end_page+1])
+
+        if doc_type:
+            document_type = doc_type
+        elif auto_detect:
+            document_type = self.detect_document_type(all_pages_text, input_path.name)
+        else:
+            document_type = "REGF"
+        
+        jurisdiction = self.detect_jurisdiction(all_pages_text)
+        
+        if not file_number:
+            file_number = f"UNKNOWN_{doc_idx+1:03d}"
+        
+        output_filename = f"{document_type}_{file_number}.pdf"
+        
+        return {
+            'file_number': file_number,
+            'debtor_name': debtor_name,
+            'address': address,
+            'document_type': document_type,
+            'jurisdiction': jurisdiction,
+            'output_file': output_filename,
+            'pages': f"{start_page + 1}-{end_page + 1}",
+            'page_count': end_page - start_page + 1,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def _log_document(self, doc_info: Dict):
+        logger.info(f"Created: {doc_info['output_file']}")
+        logger.info(f"  File Number: {doc_info['file_number']}")
+        logger.info(f"  Debtor: {doc_info['debtor_name'] or 'Not found'}")
+        logger.info(f"  Type: {doc_info['document_type']}")
+        logger.info(f"  Jurisdiction: {doc_info['jurisdiction'] or 'Unknown'}")
+        logger.info(f"  Pages: {doc_info['pages']}")
+    
     def save_manifest(self):
         """Save processing manifest to JSON"""
         manifest_path = self.output_dir / "manifest.json"
@@ -422,6 +520,8 @@ Examples:
   %(prog)s input.pdf -p 2                # NY format (2 pages per doc)
   %(prog)s input.pdf -t REGF              # Force document type
   %(prog)s input.pdf -o custom_output     # Custom output directory
+  %(prog)s input.pdf -j 4                # Extract text in 4 processes
+  %(prog)s batch.pdf --stream            # Very large batch, bounded memory
         """
     )
     
@@ -435,15 +535,44 @@ Examples:
                        help='Pages per document (1 for NJ, 2 for NY)')
     parser.add_argument('--no-auto', action='store_true',
                        help='Disable auto-detection of document boundaries')
+    parser.add_argument('--text-backend', default=DEFAULT_BACKEND,
+                       choices=available_backends(),
+                       help=f'Text extraction backend (default: {DEFAULT_BACKEND})')
+    parser.add_argument('-j', '--workers', type=int,
+                       help='Extract page text in this many processes (default: serial)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Write each document as soon as it is found, with a '
+                            'manifest.jsonl record per document, in bounded memory')
+    parser.add_argument('--profile-rules', metavar='REPORT', default=None,
+                       help='Write per-pattern calls, hits and timings to REPORT (.json for JSON)')
+    parser.add_argument('--regex-engine', default=None, choices=['auto'] + regex_engine.available_engines(),
+                       help='Regex engine for the extraction patterns (default: MAILROOM_REGEX_ENGINE or re)')
     
     args = parser.parse_args()
+    if args.profile_rules:
+        rule_profiler.enable(args.profile_rules)
+    if args.regex_engine:
+        regex_engine.set_engine(args.regex_engine)
+    
+    splitter = PDFSplitter(output_dir=args.output, text_backend=args.text_backend)
+    if args.stream:
+        documents = splitter.iter_split_pdf(
+            args.input_pdf,
+            doc_type=args.type,
+            pages_per_doc=args.pages,
+            auto_detect=not args.no_auto
+        )
+        total = sum(1 for _ in documents)
+        print(f"\nTotal documents: {total}")
+        print(f"Output directory: {splitter.output_dir}")
+        return
     
-    splitter = PDFSplitter(output_dir=args.output)
     splitter.split_pdf(
         args.input_pdf,
         doc_type=args.type,
         pages_per_doc=args.pages,
-        auto_detect=not args.no_auto
+        auto_detect=not args.no_auto,
+        workers=args.workers
     )
 
 
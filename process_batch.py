@@ -11,6 +11,7 @@ import zipfile
 from pathlib import Path
 from datetime import datetime
 from document_detector import DocumentTypeDetector
+from document_context import DocumentContext
 from pdf_splitter import PDFSplitter
 from infosub_processor import InfoSubProcessor
 
@@ -43,16 +44,18 @@ def process_batch(input_dir="input", output_dir="output", create_zip=True):
     for i, pdf_file in enumerate(pdf_files, 1):
         print(f"\n[{i}/{len(pdf_files)}] Processing: {pdf_file.name}")
 
+        # Parse once; detector and processor share page text
+        context = DocumentContext(pdf_file)
         try:
             # Auto-detect document type
-            doc_type = detector.quick_detect(str(pdf_file))
+            doc_type = detector.quick_detect(str(pdf_file), context=context)
             print(f"   📋 Auto-detected: {doc_type}")
 
             # Choose processor based on document type
             if doc_type == "IS":
                 # Use InfoSub processor for Information Subpoenas
                 processor = InfoSubProcessor(output_dir=str(output_path))
-                results = processor.process_pdf(str(pdf_file))
+                results = processor.process_pdf(str(pdf_file), context=context)
                 print(f"   ✅ Created {len(results)} IS documents")
             else:
                 # Use standard PDF splitter for LTD and other types
@@ -60,7 +63,8 @@ def process_batch(input_dir="input", output_dir="output", create_zip=True):
                 results = splitter.split_pdf(
                     str(pdf_file),
                     doc_type=None,  # Let auto-detection work
-                    auto_detect=True
+                    auto_detect=True,
+                    context=context
                 )
                 print(f"   ✅ Created {len(results)} documents")
 
@@ -73,6 +77,8 @@ def process_batch(input_dir="input", output_dir="output", create_zip=True):
 
         except Exception as e:
             print(f"   ❌ Error processing {pdf_file.name}: {e}")
+        finally:
+            context.close()
 
     print("\n" + "=" * 50)
     print(f"📊 PROCESSING COMPLETE")
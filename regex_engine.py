@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Regex Engine
+Backend for the extraction patterns. Python's re backtracks, so patterns
+like "Attorney.*Creditor" (DOTALL) or nested optional line groups can take
+time quadratic in the length of a page of OCR garbage; RE2 (google-re2)
+matches in time linear in the text for every pattern it accepts.
+
+RE2 has no lookaround, backreferences, conditionals, atomic groups or
+possessive repeats, and its $ only matches before a final newline in
+MULTILINE mode. check() flags patterns using any of these; with the re2
+engine they are logged once and stay on re. RE2's \\d, \\s, \\w and \\b are
+ASCII only (the fields we extract are ASCII).
+"""
+
+import functools
+import logging
+import os
+import re
+from typing import Dict, List, Tuple
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+# "re" (default), "re2", or "auto" for re2 when google-re2 is installed
+DEFAULT_ENGINE = os.environ.get('MAILROOM_REGEX_ENGINE', 're')
+
+# Flags RE2 takes inline; anything else (VERBOSE, ASCII, ...) keeps a pattern on re
+_INLINE_FLAGS = {re.IGNORECASE: 'i', re.MULTILINE: 'm', re.DOTALL: 's'}
+
+# Largest {n,m} count RE2 accepts
+MAX_RE2_REPEAT = 1000
+
+
+def _re2_available() -> bool:
+    try:
+        import re2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def available_engines() -> List[str]:
+    """Installed engine names, accepted by set_engine and --regex-engine"""
+    return ['re', 're2'] if _re2_available() else ['re']
+
+
+def resolve_engine(name: str) -> str:
+    """
+    Engine to use for a requested name
+
+    Raises:
+        ValueError: Unknown engine
+    """
+    if name == 'auto':
+        return 're2' if _re2_available() else 're'
+    if name not in ('re', 're2'):
+        raise ValueError(f"Unknown regex engine: {name} (choose from auto, re, re2)")
+    if name == 're2' and not _re2_available():
+        logger.warning("google-re2 isn't installed, using re")
+        return 're'
+    return name
+
+
+ENGINE = resolve_engine(DEFAULT_ENGINE)
+
+
+def set_engine(name: str) -> str:
+    """
+    Switch this process (and worker processes started after) to an engine
+
+    Returns:
+        The engine now in use
+    """
+    global ENGINE
+    ENGINE = resolve_engine(name)
+    os.environ['MAILROOM_REGEX_ENGINE'] = ENGINE
+    return ENGINE
+
+
+def _check_items(items, flags: int, problems: List[str]):
+    for op, av in items:
+        if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            problems.append("lookahead" if av[0] == 1 else "lookbehind")
+            _check_items(av[1], flags, problems)
+        elif op is sre_constants.GROUPREF:
+            problems.append("backreference")
+        elif op is sre_constants.GROUPREF_EXISTS:
+            problems.append("conditional group")
+            _check_items(av[1], flags, problems)
+            if av[2]:
+                _check_items(av[2], flags, problems)
+        elif str(op) == 'ATOMIC_GROUP':
+            problems.append("atomic group")
+            _check_items(av, flags, problems)
+        elif str(op) == 'POSSESSIVE_REPEAT':
+            problems.append("possessive repeat")
+            _check_items(av[2], flags, problems)
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, high, sub = av
+            if low > MAX_RE2_REPEAT or (high is not sre_constants.MAXREPEAT and high > MAX_RE2_REPEAT):
+                problems.append(f"repeat count over {MAX_RE2_REPEAT}")
+            _check_items(sub, flags, problems)
+        elif op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            _check_items(sub, (flags | add_flags) & ~del_flags, problems)
+        elif op is sre_constants.BRANCH:
+            for branch in av[1]:
+                _check_items(branch, flags, problems)
+        elif op is sre_constants.AT:
+            if av is sre_constants.AT_END and not flags & re.MULTILINE:
+                problems.append("$ without MULTILINE")
+            elif av is sre_constants.AT_END_STRING:
+                problems.append("\\Z")
+
+
+def check(pattern: str, flags: int = 0) -> List[str]:
+    """
+    What keeps a pattern from running on RE2
+
+    Args:
+        pattern: Python regex
+        flags: re flags it's compiled with
+
+    Returns:
+        Problems found (empty if RE2 can run it with the same meaning)
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error as e:
+        return [f"invalid pattern: {e}"]
+    problems: List[str] = []
+    unsupported = parsed.state.flags & ~(re.IGNORECASE | re.MULTILINE | re.DOTALL | re.UNICODE)
+    if unsupported:
+        problems.append(f"flags {re.RegexFlag(unsupported)!r}")
+    _check_items(parsed, parsed.state.flags, problems)
+    if not problems and _re2_available():
+        import re2
+        try:
+            re2.compile(_re2_pattern(pattern, flags), _re2_options())
+        except re2.error as e:
+            problems.append(f"rejected by RE2: {e}")
+    return list(dict.fromkeys(problems))
+
+
+def _re2_pattern(pattern: str, flags: int) -> str:
+    inline = "".join(letter for flag, letter in _INLINE_FLAGS.items() if flags & flag)
+    return f"(?{inline}){pattern}" if inline else pattern
+
+
+@functools.lru_cache(maxsize=None)
+def _re2_options():
+    import re2
+    options = re2.Options()
+    options.log_errors = False  # Rejections are reported by check()
+    return options
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile(pattern: str, flags: int, engine: str):
+    if engine == 're2':
+        problems = check(pattern, flags)
+        if not problems:
+            import re2
+            return re2.compile(_re2_pattern(pattern, flags), _re2_options())
+        logger.warning(f"Not RE2-compatible ({', '.join(problems)}), using re: {pattern}")
+    return re.compile(pattern, flags)
+
+
+def compile(pattern: str, flags: int = 0, engine: str = None):
+    """
+    Compile a pattern for the current (or given) engine, cached
+
+    Returns:
+        A compiled pattern with search/match/finditer; on re when the
+        engine can't run it
+    """
+    return _compile(pattern, flags, engine or ENGINE)
+
+
+def search(pattern: str, text: str, flags: int = 0):
+    """re.search on the current engine"""
+    return compile(pattern, flags).search(text)
+
+
+def check_rules(data: Dict) -> List[Tuple[str, str, List[str]]]:
+    """
+    Check every pattern set of a rules file (see rule_registry)
+
+    Returns:
+        (set.label, pattern, problems) for each pattern RE2 can't run
+    """
+    flagged = []
+    for name, entry in data.get('pattern_sets', {}).items():
+        flags = 0
+        for flag_name in entry.get('flags', []):
+            flags |= getattr(re, flag_name)
+        for label, pattern in entry['patterns']:
+            problems = check(pattern, flags)
+            if problems:
+                flagged.append((f"{name}.{label}", pattern, problems))
+    return flagged
+
+
+def main():
+    import argparse
+    import json
+
+    from rule_registry import rules_path
+
+    parser = argparse.ArgumentParser(description='Check the rules file patterns against RE2')
+    parser.add_argument('--rules', default=None, help='Rules file (default: mailroom_rules.json)')
+    args = parser.parse_args()
+
+    path = rules_path(args.rules)
+    with open(path) as f:
+        flagged = check_rules(json.load(f))
+    for rule, pattern, problems in flagged:
+        print(f"{rule}: {', '.join(problems)}\n    {pattern}")
+    print(f"{len(flagged)} pattern(s) in {path} can't run on RE2")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
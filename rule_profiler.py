@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Rule Profiler
+Opt-in statistics for every extraction rule evaluation: calls, hits,
+cumulative and worst-case time per pattern over a whole run, reported
+slowest first so dead patterns can be dropped and slow ones rewritten.
+
+Enable with MAILROOM_PROFILE_RULES=<report path> (or --profile-rules on
+the CLIs); the report is written when the process exits, as a text table,
+or as JSON for a .json path. Pattern sets are timed as a whole (what a
+page really costs) and, pattern by pattern, with each regex searched on
+its own. Off by default, when an evaluation costs one extra flag check.
+"""
+
+import atexit
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import regex_engine
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENV = 'MAILROOM_PROFILE_RULES'
+
+# Longest pattern text shown in the text report
+PATTERN_WIDTH = 60
+
+# (rule, pattern) -> [calls, hits, total seconds, worst seconds]
+Stats = Dict[Tuple[str, str], List]
+
+
+class RuleProfiler:
+    """Per-pattern counters and timings for one process"""
+
+    def __init__(self):
+        self.enabled = False
+        self.report_path: Optional[Path] = None
+        self.stats: Stats = {}
+
+    def record(self, rule: str, pattern: str, seconds: float, hit: bool):
+        """Count one evaluation of a pattern"""
+        entry = self.stats.get((rule, pattern))
+        if entry is None:
+            entry = self.stats[(rule, pattern)] = [0, 0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += hit
+        entry[2] += seconds
+        if seconds > entry[3]:
+            entry[3] = seconds
+
+    def search(self, rule: str, pattern: str, text: str, flags: int = 0):
+        """re.search on the current regex engine (see regex_engine), counted under rule when profiling"""
+        if not self.enabled:
+            return regex_engine.search(pattern, text, flags)
+        compiled = regex_engine.compile(pattern, flags)
+        start = time.perf_counter()
+        match = compiled.search(text)
+        self.record(rule, pattern, time.perf_counter() - start, match is not None)
+        return match
+
+    def reset(self):
+        """Drop the counters (e.g. in a worker whose counts are merged back)"""
+        self.stats = {}
+
+    def take(self) -> Stats:
+        """Counters since the last take, for a worker to hand back with its result"""
+        stats, self.stats = self.stats, {}
+        return stats
+
+    def merge(self, stats: Stats):
+        """Add counters from another process"""
+        for key, (calls, hits, total, worst) in stats.items():
+            entry = self.stats.setdefault(key, [0, 0, 0.0, 0.0])
+            entry[0] += calls
+            entry[1] += hits
+            entry[2] += total
+            entry[3] = max(entry[3], worst)
+
+    def rows(self) -> List[Dict]:
+        """One row per pattern, most cumulative time first"""
+        rows = [{
+            'rule': rule,
+            'pattern': pattern,
+            'calls': calls,
+            'hits': hits,
+            'hit_rate': round(hits / calls, 3) if calls else None,
+            'total_ms': round(total * 1e3, 3),
+            'mean_us': round(total / calls * 1e6, 1) if calls else None,
+            'worst_ms': round(worst * 1e3, 3),
+        } for (rule, pattern), (calls, hits, total, worst) in self.stats.items()]
+        rows.sort(key=lambda row: (-row['total_ms'], row['rule']))
+        return rows
+
+    def report(self) -> str:
+        """Text table of rows(), then the patterns that never matched"""
+        rows = self.rows()
+        width = max([len('rule')] + [len(row['rule']) for row in rows])
+        lines = [f"{'rule':<{width}} {'calls':>8} {'hits':>8} {'hit%':>6} {'total ms':>10} "
+                 f"{'mean us':>9} {'worst ms':>9}  pattern"]
+        for row in rows:
+            pattern = row['pattern']
+            if len(pattern) > PATTERN_WIDTH:
+                pattern = pattern[:PATTERN_WIDTH - 3] + "..."
+            lines.append(f"{row['rule']:<{width}} {row['calls']:>8} {row['hits']:>8} {row['hit_rate'] * 100:>5.1f}% "
+                         f"{row['total_ms']:>10.3f} {row['mean_us']:>9.1f} {row['worst_ms']:>9.3f}  {pattern}")
+        dead = [row['rule'] for row in rows if not row['hits']]
+        if dead:
+            lines.append("")
+            lines.append(f"Never matched ({len(dead)}): {', '.join(sorted(dead))}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path=None) -> Optional[Path]:
+        """
+        Write the report (JSON rows for a .json path, text otherwise)
+
+        Returns:
+            Path written, or None with nothing recorded
+        """
+        path = Path(path or self.report_path)
+        if not self.stats:
+            return None
+        with open(path, 'w') as f:
+            if path.suffix == '.json':
+                json.dump({'rules': self.rows()}, f, indent=2)
+            else:
+                f.write(self.report())
+        logger.info(f"Rule profile: {path}")
+        return path
+
+
+PROFILER = RuleProfiler()
+
+
+def enable(report_path=None):
+    """
+    Start profiling this process; the report is written at exit
+
+    Args:
+        report_path: Report file; also exported as MAILROOM_PROFILE_RULES so
+                     spawned worker processes profile too
+    """
+    if report_path:
+        PROFILER.report_path = Path(report_path)
+        os.environ[PROFILE_ENV] = str(report_path)
+    if not PROFILER.enabled:
+        PROFILER.enabled = True
+        atexit.register(_write_at_exit)
+
+
+def _write_at_exit():
+    # Workers hand their counters back with their results (see take/merge)
+    import multiprocessing
+    if PROFILER.report_path and multiprocessing.parent_process() is None:
+        PROFILER.write_report()
+
+
+def search(rule: str, pattern: str, text: str, flags: int = 0):
+    """re.search on the current regex engine (see regex_engine), counted under rule when profiling"""
+    return PROFILER.search(rule, pattern, text, flags)
+
+
+# A forked worker starts with its own counters, not a copy of the parent's
+os.register_at_fork(after_in_child=PROFILER.reset)
+
+if os.environ.get(PROFILE_ENV):
+    enable(os.environ[PROFILE_ENV])
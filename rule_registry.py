@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Rule Registry
+The extraction and classification rules (file number pattern sets, keyword
+tables, OCR correction tables, department routing) are data in a versioned
+rules file, mailroom_rules.json, rather than literals in each module. The
+registry compiles the file once per process into an immutable Rules
+snapshot that every processor shares; worker processes forked after the
+first lookup inherit it already compiled.
+
+The file is re-checked at most every few seconds and recompiled when it
+changes, so a long-running web or plugin process picks up edited patterns
+without a restart. Pattern sets and keyword scanners are cached by content:
+a reload only compiles what actually changed.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from file_number_patterns import PatternSet
+from keyword_scanner import KeywordScanner
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = Path(__file__).parent / "mailroom_rules.json"
+RULES_VERSION = 1
+
+# Seconds between checks of the rules file for changes
+CHECK_INTERVAL = 2.0
+
+SECTIONS = ('pattern_sets', 'keywords', 'document_types', 'jurisdictions',
+            'ocr_corrections', 'character_corrections', 'routing')
+
+# Entries the code looks up by name, so every rules file must define them
+REQUIRED = {
+    'pattern_sets': ('letter', 'is_signature', 'is_account', 'is_other', 'is_firm',
+                     'is_split', 'is_wrapped', 'ocr_top', 'hybrid', 'is_batch'),
+    'keywords': ('is_title', 'is_secondary', 'ltd_indicators', 'high_priority',
+                 'is_start_markers', 'is_continuation_markers', 'blank_page'),
+    'ocr_corrections': ('letter', 'is_file_number', 'is_split'),
+}
+
+_FLAGS = {'IGNORECASE': re.IGNORECASE, 'MULTILINE': re.MULTILINE, 'DOTALL': re.DOTALL}
+
+
+class RulesError(ValueError):
+    """The rules file can't be read or compiled"""
+
+
+class CorrectionTable(NamedTuple):
+    """Regex substitutions for OCR misreads of one kind of value"""
+    mode: str                                      # 'first': first matching rule only; 'all': each in turn
+    rules: Tuple[Tuple[re.Pattern, str], ...]      # (pattern, replacement)
+
+    def apply(self, value: str) -> str:
+        for pattern, replacement in self.rules:
+            if self.mode == 'all':
+                value = pattern.sub(replacement, value)
+            elif pattern.match(value):
+                return pattern.sub(replacement, value)
+        return value
+
+
+class Rules(NamedTuple):
+    """One compiled version of the rules file"""
+    version: int
+    pattern_sets: Dict[str, PatternSet]
+    keyword_tables: Dict[str, List[str]]
+    keywords: KeywordScanner                       # Over every keyword table, document type and jurisdiction term
+    document_types: List[Tuple[str, List[str]]]
+    jurisdictions: Dict[str, List[str]]
+    corrections: Dict[str, CorrectionTable]
+    character_corrections: Dict[str, str]
+    routing: Dict[str, str]
+    default_department: str
+    urgent_department: str
+
+
+# Compiled objects by content, shared by every snapshot of this process
+_pattern_set_cache: Dict[Tuple, PatternSet] = {}
+_scanner_cache: Dict[frozenset, KeywordScanner] = {}
+
+
+def _pattern_set(name: str, patterns, flag_names) -> PatternSet:
+    patterns = tuple((label, regex) for label, regex in patterns)
+    for label, regex in patterns:
+        # The captured value is the file number, name or address handed on
+        if re.compile(regex).groups != 1:
+            raise ValueError(f"Pattern {label!r} needs exactly one capturing group: {regex}")
+    flags = 0
+    for flag_name in flag_names:
+        flags |= _FLAGS[flag_name]
+    key = (name, patterns, flags)
+    if key not in _pattern_set_cache:
+        _pattern_set_cache[key] = PatternSet(patterns, flags, name)
+    return _pattern_set_cache[key]
+
+
+def _scanner(keywords) -> KeywordScanner:
+    key = frozenset(keywords)
+    if key not in _scanner_cache:
+        _scanner_cache[key] = KeywordScanner(key)
+    return _scanner_cache[key]
+
+
+def _correction_table(table: Dict) -> CorrectionTable:
+    mode = table.get('mode', 'first')
+    if mode not in ('first', 'all'):
+        raise ValueError(f"Unknown correction mode: {mode}")
+    # Rules are [pattern, replacement] with an optional note
+    return CorrectionTable(mode, tuple((re.compile(pattern), replacement)
+                                       for pattern, replacement, *_ in table['rules']))
+
+
+def compile_rules(data: Dict) -> Rules:
+    """
+    Compile the contents of a rules file
+
+    Raises:
+        RulesError: Unsupported version, missing section or bad pattern
+    """
+    if data.get('version') != RULES_VERSION:
+        raise RulesError(f"Unsupported rules version: {data.get('version')}")
+    missing = [section for section in SECTIONS if section not in data]
+    if missing:
+        raise RulesError(f"Rules missing sections: {', '.join(missing)}")
+    for section, names in REQUIRED.items():
+        missing = [name for name in names if name not in data[section]]
+        if missing:
+            raise RulesError(f"Rules missing {section}: {', '.join(missing)}")
+    pattern_sets = {}
+    for name, entry in data['pattern_sets'].items():
+        try:
+            pattern_sets[name] = _pattern_set(name, entry['patterns'], entry.get('flags', []))
+        except (KeyError, TypeError, ValueError, re.error) as e:
+            raise RulesError(f"Invalid pattern set {name!r}: {e!r}") from e
+    try:
+        keyword_tables = {name: list(table['terms']) for name, table in data['keywords'].items()}
+        document_types = [(name, list(terms)) for name, terms in data['document_types']['types']]
+        jurisdictions = {name: list(terms) for name, terms in data['jurisdictions']['terms'].items()}
+        terms = [term for table in keyword_tables.values() for term in table]
+        terms += [term for _, table in document_types for term in table]
+        terms += [term for table in jurisdictions.values() for term in table]
+        routing = data['routing']
+        return Rules(
+            version=data['version'],
+            pattern_sets=pattern_sets,
+            keyword_tables=keyword_tables,
+            keywords=_scanner(terms),
+            document_types=document_types,
+            jurisdictions=jurisdictions,
+            corrections={name: _correction_table(table) for name, table in data['ocr_corrections'].items()},
+            character_corrections=dict(data['character_corrections']['map']),
+            routing=dict(routing['departments']),
+            default_department=routing['default'],
+            urgent_department=routing['urgent'],
+        )
+    except (KeyError, TypeError, ValueError, re.error) as e:
+        raise RulesError(f"Invalid rules: {e!r}") from e
+
+
+def rules_path(path=None) -> Path:
+    """Rules file: explicit path, MAILROOM_RULES, or mailroom_rules.json next to this module"""
+    return Path(path or os.environ.get('MAILROOM_RULES') or DEFAULT_RULES_PATH)
+
+
+class RuleRegistry:
+    """Compiled rules of one rules file, reloaded when the file changes"""
+
+    def __init__(self, path=None, check_interval: float = CHECK_INTERVAL):
+        """
+        Args:
+            path: Rules file (see rules_path)
+            check_interval: Seconds between checks for changes; 0 checks on
+                            every access
+
+        Raises:
+            RulesError: The file can't be read or compiled
+        """
+        self.path = rules_path(path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._rules = self._load()
+        self._checked = time.monotonic()
+
+    def _file_stamp(self):
+        stat = self.path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> Rules:
+        try:
+            stamp = self._file_stamp()
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise RulesError(f"Can't read rules from {self.path}: {e}") from e
+        rules = compile_rules(data)
+        self._stamp = stamp
+        return rules
+
+    @property
+    def rules(self) -> Rules:
+        """Current rules, reloading first if the file changed since the last check"""
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            self.reload()
+        return self._rules
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Recompile the rules file if it changed
+
+        A file that fails to load is logged and the previous rules stay in
+        use, so a bad edit never takes down a running process.
+
+        Args:
+            force: Reload even if the file looks unchanged
+
+        Returns:
+            True if new rules were loaded
+        """
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                if not force and self._file_stamp() == self._stamp:
+                    return False
+                self._rules = self._load()
+            except (OSError, RulesError) as e:
+                logger.error(f"Keeping rules version {self._rules.version}: {e}")
+                # Don't retry (and log again) until the file changes again
+                try:
+                    self._stamp = self._file_stamp()
+                except OSError:
+                    pass
+                return False
+        logger.info(f"Loaded rules version {self._rules.version} from {self.path}")
+        return True
+
+
+_registry: Optional[RuleRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> RuleRegistry:
+    """Process-wide registry, loaded on first use"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = RuleRegistry()
+    return _registry
+
+
+def current() -> Rules:
+    """Current rules of the process-wide registry"""
+    return get_registry().rules
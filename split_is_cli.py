@@ -5,9 +5,9 @@ CLI tool to split NY_INFO_SUBS_9.19.2025.pdf
 import sys
 import os
 from pathlib import Path
-from PyPDF2 import PdfReader, PdfWriter
-import pdfplumber
-import re
+import file_number_patterns
+from document_context import DocumentContext
+from split_writer import write_splits
 import logging
 import json
 from datetime import datetime
@@ -17,22 +17,11 @@ logger = logging.getLogger(__name__)
 
 def extract_file_number(text):
     """Extract file number from text - looking for patterns like J2401735"""
-    patterns = [
-        r'Account\s+Number[.:]?\s*([JL]?\d{6,8})',
-        r'File\s+No[.:]?\s*([JL]?\d{6,8})',
-        r'Firm\s+File\s+No[.:]?\s*([JL]?\d{6,8})',
-        r'Our\s+File\s+No[.:]?\s*([JL]?\d{6,8})',
-        r'Account\s+#[.:]?\s*([JL]?\d{6,8})',
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-        if match:
-            file_num = match.group(1).strip().upper()
-            file_num = re.sub(r'[^A-Z0-9]', '', file_num)
-            if len(file_num) >= 6:
-                logger.debug(f"Found file number: {file_num}")
-                return file_num
+    for candidate in file_number_patterns.IS_BATCH.scan(text):
+        file_num = file_number_patterns.normalize(candidate.value)
+        if len(file_num) >= 6:
+            logger.debug(f"Found file number: {file_num}")
+            return file_num
     return None
 
 def split_is_document(input_pdf=None, output_dir="split_output", pages_per_doc=8):
@@ -62,16 +51,15 @@ def split_is_document(input_pdf=None, output_dir="split_output", pages_per_doc=8
     logger.info(f"Processing: {input_path.name}")
 
     try:
-        reader = PdfReader(input_pdf)
-        total_pages = len(reader.pages)
-        logger.info(f"Total pages: {total_pages}")
-        logger.info(f"Splitting into {pages_per_doc}-page documents")
-
         # Extract all text for analysis
         all_text = []
-        with pdfplumber.open(input_pdf) as pdf:
-            for i, page in enumerate(pdf.pages):
-                text = page.extract_text() or ""
+        with DocumentContext(input_pdf, backend="pdfplumber") as context:
+            total_pages = context.page_count
+            logger.info(f"Total pages: {total_pages}")
+            logger.info(f"Splitting into {pages_per_doc}-page documents")
+
+            for i in range(total_pages):
+                text = context.get_page_text(i)
                 all_text.append(text)
 
                 # Log file numbers found on each page
@@ -86,6 +74,7 @@ def split_is_document(input_pdf=None, output_dir="split_output", pages_per_doc=8
         complete_count = 0
         incomplete_count = 0
         file_number_counts = {}  # Track duplicates
+        split_jobs = []  # (pages, output file), written together below
 
         for start_page in range(0, total_pages, pages_per_doc):
             end_page = min(start_page + pages_per_doc, total_pages)
@@ -95,11 +84,6 @@ def split_is_document(input_pdf=None, output_dir="split_output", pages_per_doc=8
             doc_text = "\n".join(all_text[start_page:end_page])
             file_number = extract_file_number(doc_text)
 
-            # Create PDF writer
-            writer = PdfWriter()
-            for page_num in range(start_page, end_page):
-                writer.add_page(reader.pages[page_num])
-
             # Determine output location and filename
             if file_number and not file_number.startswith('UNKNOWN'):
                 # Handle duplicates by adding suffix
@@ -115,9 +99,7 @@ def split_is_document(input_pdf=None, output_dir="split_output", pages_per_doc=8
                 incomplete_count += 1
                 status = "❌ Incomplete"
 
-            # Write PDF
-            with open(output_file, 'wb') as f:
-                writer.write(f)
+            split_jobs.append((range(start_page, end_page), output_file))
 
             logger.info(f"{status} Document {doc_count}: {output_file.name} (pages {start_page+1}-{end_page})")
 
@@ -130,6 +112,9 @@ def split_is_document(input_pdf=None, output_dir="split_output", pages_per_doc=8
                 'status': 'complete' if file_number else 'incomplete'
             })
 
+        # Write all PDFs from one open copy of the input
+        write_splits(input_pdf, split_jobs)
+
         # Save manifest
         manifest = {
             'processing_date': datetime.now().isoformat(),
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Split Writer
+Writes every output document of a split from a single open source PDF.
+Page objects are grafted with PyMuPDF, so compressed streams (scan images,
+fonts) are copied byte-for-byte instead of being decoded and re-encoded, and
+resources shared by several pages of an output are copied into it once.
+"""
+
+import logging
+from pathlib import Path
+from typing import Iterable, List, Sequence, Tuple, Union
+
+import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+PageSpec = Union[range, Sequence[int]]
+
+
+def _runs(pages: PageSpec) -> List[Tuple[int, int]]:
+    """Collapse page numbers into inclusive (first, last) runs, keeping order"""
+    runs: List[Tuple[int, int]] = []
+    for page_num in pages:
+        if runs and page_num == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], page_num)
+        else:
+            runs.append((page_num, page_num))
+    return runs
+
+
+def write_pages(source: fitz.Document, pages: PageSpec, output_path) -> Path:
+    """
+    Copy pages of an open source document into a new PDF
+
+    Args:
+        source: Open PyMuPDF document (e.g. DocumentContext.fitz_doc)
+        pages: 0-indexed page numbers, in output order
+        output_path: Where to write the output
+
+    Returns:
+        Path to the written file
+    """
+    output_path = Path(output_path)
+    output = fitz.open()
+    try:
+        # Each run is one graft; PyMuPDF keeps a graft map per source, so
+        # objects shared between runs are still copied only once
+        for first, last in _runs(pages):
+            output.insert_pdf(source, from_page=first, to_page=last, links=True, annots=True)
+        # No deflate/garbage passes: streams are written exactly as grafted
+        output.save(str(output_path))
+    finally:
+        output.close()
+    return output_path
+
+
+def write_splits(source: Union[fitz.Document, str, Path],
+                 jobs: Iterable[Tuple[PageSpec, Union[str, Path]]]) -> List[Path]:
+    """
+    Write all outputs of a split from one open source document
+
+    Each output is grafted on its own (PyMuPDF's graft map belongs to the
+    output), so the source is opened and parsed once, but its objects are
+    walked once per output that uses them.
+
+    Args:
+        source: Open PyMuPDF document, or a path to open for the duration
+        jobs: (pages, output_path) for each output document, in page order
+
+    Returns:
+        Paths of the written files
+    """
+    doc = source if isinstance(source, fitz.Document) else fitz.open(str(source))
+    try:
+        written = [write_pages(doc, pages, output_path) for pages, output_path in jobs]
+    finally:
+        if doc is not source:
+            doc.close()
+    logger.debug(f"Wrote {len(written)} split outputs")
+    return written
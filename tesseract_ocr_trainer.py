@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """
 Tesseract OCR Training Script for Virtual Mailroom
-Processes image-only PDFs to extract file numbers using OCR
+Processes image-only PDFs to extract file numbers using OCR, and writes the
+cheapest crop/DPI/config/preprocessing that meets an accuracy target as the
+document type's file number profile (see ocr_profiles)
 """
 
 import re
@@ -12,10 +14,12 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import subprocess
-import tempfile
-from PIL import Image, ImageEnhance, ImageFilter, ImageOps
-import pytesseract
-from pdf2image import convert_from_path
+
+from ocr_engines import available_engines, get_engine
+from image_preprocess import preprocessor
+from ocr_profiles import OCRProfile, choose_profile, save_profiles
+from ocr_tuning import evaluate_grid
+from page_regions import get_regions
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -24,7 +28,22 @@ logger = logging.getLogger(__name__)
 class TesseractOCRTrainer:
     """OCR trainer using Tesseract for image-only PDFs"""
 
-    def __init__(self):
+    def __init__(self, ocr_engine: Optional[str] = None, doc_type: str = 'IS',
+                 workers: Optional[int] = None, render_dir: Optional[str] = None):
+        """
+        Args:
+            ocr_engine: OCR engine for every config tried (see ocr_engines)
+            doc_type: Document type the profile is for
+            workers: Processes to spread pages over (see ocr_tuning)
+            render_dir: Keep page renders here between runs
+        """
+        # One engine for every config tried; the in-process one (when
+        # installed) loads each model once instead of once per image
+        self.ocr_engine = get_engine(ocr_engine).name
+        self.doc_type = doc_type
+        self.workers = workers
+        self.render_dir = render_dir
+
         # Expected file number formats
         self.pattern_rules = [
             (r'^[A-Z]\d{7}$', '1L+7N'),     # L2501375
@@ -32,108 +51,52 @@ class TesseractOCRTrainer:
             (r'^\d{8}$', '8N'),               # 12345678
         ]
 
-        # OCR configurations to test
+        # OCR configurations to test (profile settings)
         self.ocr_configs = [
-            ("default", ""),
-            ("digits_focus", "--psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"),
-            ("single_column", "--psm 4"),
-            ("sparse_text", "--psm 11"),
-            ("single_line", "--psm 7"),
-            ("legacy", "--oem 0 --psm 6"),
+            ("default", {}),
+            ("digits_focus", {"psm": 6, "whitelist": "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"}),
+            ("single_column", {"psm": 4}),
+            ("sparse_text", {"psm": 11}),
+            ("single_line", {"psm": 7}),
+            ("legacy", {"oem": 0, "psm": 6}),
         ]
 
-        # Preprocessing methods to test
-        self.preprocess_methods = [
-            "none",
-            "basic",
-            "enhanced",
-            "aggressive",
-            "adaptive",
+        # Preprocessing methods to test, as step chains (see image_preprocess)
+        self.preprocess_methods = {
+            "none": "none",
+            "basic": "contrast",
+            "enhanced": "median+contrast:2.5+sharpen",
+            "aggressive": "upscale:2000+binarize:128+median+contrast:3+sharpen",
+            "adaptive": "adaptive",
+        }
+
+        # Where to read: the document type's file number regions, or the whole page
+        self.crops = [
+            ("regions", tuple(get_regions(doc_type, 'file_number')) or None),
+            ("page", None),
         ]
 
+        # Render resolutions to test
+        self.dpis = [150, 300]
+
         self.results = []
 
     def preprocess_image(self, image, method="basic"):
         """Apply different preprocessing methods to improve OCR"""
+        return preprocessor(self.preprocess_methods.get(method, method))(image)
 
-        if method == "none":
-            return image
-
-        elif method == "basic":
-            # Convert to grayscale and enhance contrast
-            image = image.convert('L')
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(2.0)
-            return image
-
-        elif method == "enhanced":
-            # Grayscale, denoise, contrast, sharpen
-            image = image.convert('L')
-            # Denoise
-            image = image.filter(ImageFilter.MedianFilter(size=3))
-            # Enhance contrast
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(2.5)
-            # Sharpen
-            image = image.filter(ImageFilter.SHARPEN)
-            return image
-
-        elif method == "aggressive":
-            # Heavy preprocessing for poor quality scans
-            image = image.convert('L')
-
-            # Resize for better OCR (if too small)
-            width, height = image.size
-            if width < 2000:
-                scale = 2000 / width
-                new_size = (int(width * scale), int(height * scale))
-                image = image.resize(new_size, Image.Resampling.LANCZOS)
-
-            # Binarization (convert to pure black and white)
-            threshold = 128
-            image = image.point(lambda p: p > threshold and 255)
-
-            # Remove noise
-            image = image.filter(ImageFilter.MedianFilter(size=3))
-
-            # Enhance contrast
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(3.0)
-
-            # Sharpen
-            image = image.filter(ImageFilter.SHARPEN)
-
-            return image
-
-        elif method == "adaptive":
-            # Adaptive thresholding and enhancement
-            import numpy as np
-            import cv2
-
-            # Convert PIL to OpenCV format
-            image = image.convert('L')
-            img_array = np.array(image)
-
-            # Apply adaptive threshold
-            img_thresh = cv2.adaptiveThreshold(
-                img_array, 255,
-                cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                cv2.THRESH_BINARY, 11, 2
-            )
-
-            # Denoise
-            img_denoised = cv2.medianBlur(img_thresh, 3)
-
-            # Morphological operations to clean up
-            kernel = np.ones((1,1), np.uint8)
-            img_morph = cv2.morphologyEx(img_denoised, cv2.MORPH_CLOSE, kernel)
-
-            # Convert back to PIL
-            image = Image.fromarray(img_morph)
-
-            return image
-
-        return image
+    def candidate_profiles(self) -> List[Tuple[str, str, str, OCRProfile]]:
+        """Every crop/DPI/config/preprocessing combination as (key, preprocess name, config name, profile)"""
+        candidates = []
+        for crop_name, regions in self.crops:
+            for dpi in self.dpis:
+                for preprocess_name, chain in self.preprocess_methods.items():
+                    for config_name, settings in self.ocr_configs:
+                        key = f"{preprocess_name}_{config_name}_{crop_name}_{dpi}dpi"
+                        candidates.append((key, preprocess_name, config_name,
+                                           OCRProfile(self.doc_type, 'file_number', regions, dpi,
+                                                      preprocess=chain, **settings)))
+        return candidates
 
     def extract_file_numbers_from_text(self, text: str) -> List[Tuple[str, str]]:
         """Extract potential file numbers from OCR text"""
@@ -187,39 +150,41 @@ class TesseractOCRTrainer:
 
         return unique_candidates
 
-    def process_pdf_with_ocr(self, pdf_path: Path, config: str, preprocess: str) -> List[str]:
-        """Convert PDF to images and run OCR"""
-        try:
-            # Convert PDF pages to images
-            images = convert_from_path(pdf_path, dpi=300)
-
-            all_text = []
-            for i, image in enumerate(images):
-                # Apply preprocessing
-                processed_image = self.preprocess_image(image, preprocess)
-
-                # Run OCR
-                text = pytesseract.image_to_string(processed_image, config=config)
-                all_text.append(text)
-
-                # Focus on first 2 pages for file numbers
-                if i >= 1:
-                    break
-
-            return all_text
-
-        except Exception as e:
-            logger.error(f"OCR processing error: {e}")
-            return []
-
-    def train_on_file(self, pdf_path: Path) -> Dict:
-        """Train OCR configurations on a single file"""
+    def ocr_candidates(self, pdf_paths: List[Path]) -> Dict[str, List[List[Optional[str]]]]:
+        """
+        OCR the first pages of each PDF under every candidate profile
+
+        Each page is rendered once per DPI and crop and preprocessed once per
+        method for the whole config grid (see ocr_tuning); results are
+        cached across runs.
+
+        Returns:
+            PDF path (str) -> per candidate, in candidate_profiles() order,
+            the text of each page (None where OCR failed)
+        """
+        rungs = [profile.rung() for _, _, _, profile in self.candidate_profiles()]
+        # Focus on first 2 pages for file numbers
+        return evaluate_grid(pdf_paths, rungs, max_pages=2, engine=self.ocr_engine,
+                             workers=self.workers, render_dir=self.render_dir)
+
+    def train_on_file(self, pdf_path: Path, expected: Optional[str] = None,
+                      ocr_texts: Optional[List[List[Optional[str]]]] = None) -> Dict:
+        """
+        Train OCR configurations on a single file
+
+        Args:
+            pdf_path: Scanned PDF
+            expected: Known file number; without one a configuration only
+                      counts as format-valid when it finds any valid candidate
+            ocr_texts: The file's entry from ocr_candidates(), when already run
+        """
 
         filename = pdf_path.name
         logger.info(f"\nProcessing: {filename}")
 
         file_results = {
             "filename": filename,
+            "expected": expected,
             "configurations": {},
             "best_config": None,
             "best_preprocess": None,
@@ -227,45 +192,52 @@ class TesseractOCRTrainer:
         }
 
         all_candidates = []
-
-        # Test each preprocessing method
-        for preprocess_method in self.preprocess_methods:
-            # Test each OCR configuration
-            for config_name, config_params in self.ocr_configs:
-                config_key = f"{preprocess_method}_{config_name}"
-
-                try:
-                    # Run OCR
-                    pages_text = self.process_pdf_with_ocr(pdf_path, config_params, preprocess_method)
-                    full_text = "\n".join(pages_text)
-
-                    # Extract file numbers
-                    candidates = self.extract_file_numbers_from_text(full_text)
-
-                    file_results["configurations"][config_key] = {
-                        "text_length": len(full_text),
-                        "candidates": candidates,
-                        "success": len(candidates) > 0
-                    }
-
-                    if candidates:
-                        all_candidates.extend(candidates)
-                        logger.info(f"  ✅ {config_key}: Found {candidates[0][0]} ({candidates[0][1]})")
-
-                except Exception as e:
-                    logger.debug(f"  ❌ {config_key}: Error - {e}")
-                    file_results["configurations"][config_key] = {"error": str(e)}
+        if ocr_texts is None:
+            ocr_texts = self.ocr_candidates([pdf_path])[str(pdf_path)]
+
+        # Test each crop, resolution, preprocessing method and OCR configuration
+        for (config_key, preprocess_method, config_name, profile), pages_text in zip(self.candidate_profiles(),
+                                                                                      ocr_texts):
+            try:
+                if None in pages_text:
+                    raise RuntimeError("OCR failed")
+                full_text = "\n".join(pages_text)
+
+                # Extract file numbers
+                candidates = self.extract_file_numbers_from_text(full_text)
+                format_valid = len(candidates) > 0
+                if expected:
+                    success = format_valid and candidates[0][0] == expected
+                else:
+                    success = format_valid
+
+                file_results["configurations"][config_key] = {
+                    "preprocess": preprocess_method,
+                    "config": config_name,
+                    "text_length": len(full_text),
+                    "candidates": candidates,
+                    "format_valid": format_valid,
+                    "success": success
+                }
+
+                if candidates:
+                    all_candidates.extend(candidates)
+                    logger.info(f"  ✅ {config_key}: Found {candidates[0][0]} ({candidates[0][1]})")
+
+            except Exception as e:
+                logger.debug(f"  ❌ {config_key}: Error - {e}")
+                file_results["configurations"][config_key] = {"error": str(e), "format_valid": False,
+                                                              "success": False}
 
         # Find best configuration
         best_score = 0
         for config_key, result in file_results["configurations"].items():
-            if "candidates" in result and result["candidates"]:
+            if result["success"] and result["candidates"]:
                 score = len(result["candidates"])
                 if score > best_score:
                     best_score = score
-                    parts = config_key.split('_', 1)
-                    file_results["best_preprocess"] = parts[0]
-                    file_results["best_config"] = parts[1] if len(parts) > 1 else "default"
+                    file_results["best_preprocess"] = result["preprocess"]
+                    file_results["best_config"] = result["config"]
 
         # Get unique candidates
         seen = set()
@@ -279,8 +251,24 @@ class TesseractOCRTrainer:
 
         return file_results
 
-    def run_training(self, input_dir: str):
-        """Run OCR training on a directory of PDFs"""
+    def run_training(self, input_dir: str, ground_truth: Optional[Dict[str, str]] = None,
+                     target_accuracy: float = 0.9, profiles_path: Optional[str] = None):
+        """
+        Run OCR training on a directory of PDFs
+
+        A profile is only scored (on the files with a known number) and saved
+        when there is ground truth: "found a number of a valid format" says
+        nothing about reading it right, and the extractors load the profile
+        file at runtime. Without ground truth the run only reports each
+        configuration's format-valid rate.
+
+        Args:
+            input_dir: Directory of scanned PDFs
+            ground_truth: Filename -> known file number
+            target_accuracy: Accuracy the written profile must reach (0-1)
+            profiles_path: Profile file to update (see ocr_profiles)
+        """
+        ground_truth = ground_truth or {}
 
         input_path = Path(input_dir)
         pdf_files = list(input_path.glob("*.pdf")) + list(input_path.glob("*.PDF"))
@@ -290,19 +278,29 @@ class TesseractOCRTrainer:
             return
 
         logger.info(f"Starting OCR training on {len(pdf_files)} files")
-        logger.info("This may take a few minutes per file...")
+        logger.info(f"{len(self.candidate_profiles())} configurations per page, "
+                    f"{self.workers or 1} worker(s)")
 
         training_results = {
             "total_files": len(pdf_files),
             "successful_files": 0,
+            "labelled_files": 0,
+            "correct_files": 0,
             "files": [],
             "best_configs": {},
             "best_preprocessing": {},
         }
 
+        # The whole grid for every file in one pass, so the pool stays busy
+        ocr_texts = self.ocr_candidates(pdf_files)
+
         for pdf_file in pdf_files:
-            file_result = self.train_on_file(pdf_file)
+            file_result = self.train_on_file(pdf_file, ground_truth.get(pdf_file.name), ocr_texts[str(pdf_file)])
             training_results["files"].append(file_result)
+            if file_result["expected"]:
+                training_results["labelled_files"] += 1
+                training_results["correct_files"] += any(result["success"] for result in
+                                                         file_result["configurations"].values())
 
             if file_result["candidates_found"]:
                 training_results["successful_files"] += 1
@@ -316,9 +314,37 @@ class TesseractOCRTrainer:
                     preprocess = file_result["best_preprocess"]
                     training_results["best_preprocessing"][preprocess] = training_results["best_preprocessing"].get(preprocess, 0) + 1
 
+        files = training_results["files"]
+        labelled = [f for f in files if f["expected"]]
+        # Share of files each combination found a valid-format number on (not accuracy)
+        training_results["format_valid_rates"] = {
+            key: round(sum(f["configurations"][key]["format_valid"] for f in files) / len(files), 3)
+            for key, _, _, _ in self.candidate_profiles()}
+
+        # Accuracy of every combination on the labelled files; ship the cheapest that meets the target
+        profile = None
+        if labelled:
+            scored = [profile._replace(accuracy=round(sum(f["configurations"][key]["success"]
+                                                          for f in labelled) / len(labelled), 3),
+                                       samples=len(labelled))
+                      for key, _, _, profile in self.candidate_profiles()]
+            profile = choose_profile(scored, target_accuracy)
+        training_results["profile"] = profile.to_dict() if profile else None
+
         # Print summary
         self.print_summary(training_results)
 
+        if profile:
+            path = save_profiles([profile], profiles_path)
+            logger.info(f"\n{self.doc_type} file_number profile ({profile.accuracy:.0%} accurate on "
+                        f"{profile.samples} labelled files, {profile.cost:.1f} MP/page, {profile.dpi} dpi, "
+                        f"{profile.config or 'default config'}, preprocess {profile.preprocess}) saved to {path}")
+        elif not labelled:
+            logger.warning(f"\nNo ground truth for these files: format-valid rates only, {self.doc_type} "
+                           f"profile not updated (pass --ground-truth to train one)")
+        else:
+            logger.info(f"\nNo configuration read any file number correctly, {self.doc_type} profile not updated")
+
         # Save results
         output_file = f"tesseract_training_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         with open(output_file, 'w') as f:
@@ -333,7 +359,19 @@ class TesseractOCRTrainer:
         logger.info("="*60)
 
         success_rate = (results["successful_files"] / results["total_files"]) * 100 if results["total_files"] > 0 else 0
-        logger.info(f"Success Rate: {results['successful_files']}/{results['total_files']} ({success_rate:.1f}%)")
+        logger.info(f"Format-valid rate: {results['successful_files']}/{results['total_files']} files "
+                    f"({success_rate:.1f}%) with a number of a valid format")
+        if results["labelled_files"]:
+            correct_rate = results["correct_files"] / results["labelled_files"] * 100
+            logger.info(f"Read correctly: {results['correct_files']}/{results['labelled_files']} labelled files "
+                        f"({correct_rate:.1f}%) by at least one configuration")
+        else:
+            logger.info("Read correctly: unknown (no ground truth)")
+
+        if results["format_valid_rates"]:
+            logger.info("\nHighest format-valid rates:")
+            for key, rate in sorted(results["format_valid_rates"].items(), key=lambda x: x[1], reverse=True)[:3]:
+                logger.info(f"  {key}: {rate:.0%} format-valid")
 
         if results["best_configs"]:
             logger.info("\nBest OCR Configurations:")
@@ -386,19 +424,13 @@ def check_dependencies():
         logger.error("❌ pytesseract not installed. Install with: pip install pytesseract")
         dependencies_ok = False
 
+    # Optional: in-process OCR, much faster on small crops
     try:
-        import pdf2image
-        logger.info("✅ pdf2image installed")
+        import tesserocr
+        logger.info("✅ tesserocr installed (in-process OCR engine)")
     except ImportError:
-        logger.error("❌ pdf2image not installed. Install with: pip install pdf2image")
-        dependencies_ok = False
-
-    try:
-        subprocess.run(['pdftoppm', '-v'], capture_output=True, check=True)
-        logger.info("✅ poppler-utils installed")
-    except:
-        logger.error("❌ poppler-utils not found. Install with: sudo apt-get install poppler-utils")
-        dependencies_ok = False
+        logger.info("ℹ️  tesserocr not installed, OCR runs the tesseract command per image. "
+                    "Install with: pip install tesserocr")
 
     return dependencies_ok
 
@@ -409,6 +441,19 @@ def main():
     parser = argparse.ArgumentParser(description='OCR training for file number extraction')
     parser.add_argument('input_dir', help='Directory containing PDF files to process')
     parser.add_argument('--check-only', action='store_true', help='Only check dependencies')
+    parser.add_argument('--doc-type', default='IS', help='Document type the profile is for (default: IS)')
+    parser.add_argument('--ground-truth', help='JSON file mapping PDF filenames to known file numbers '
+                                               '(required to save a profile)')
+    parser.add_argument('--target-accuracy', type=float, default=0.9,
+                        help='Accuracy the chosen profile must reach (default: 0.9)')
+    parser.add_argument('--profiles', default=None,
+                        help='Profile file to update (default: ocr_profiles.json)')
+    parser.add_argument('-j', '--workers', type=int,
+                        help='OCR pages in this many processes (default: serial)')
+    parser.add_argument('--render-cache', default=None,
+                        help='Directory to keep page renders in between runs')
+    parser.add_argument('--ocr-engine', default=None, choices=['auto'] + available_engines(),
+                        help='OCR engine (default: tesserocr if installed, else tesseract)')
 
     args = parser.parse_args()
 
@@ -423,8 +468,14 @@ def main():
         logger.info("\nDependencies check complete")
         return
 
-    trainer = TesseractOCRTrainer()
-    trainer.run_training(args.input_dir)
+    ground_truth = None
+    if args.ground_truth:
+        with open(args.ground_truth) as f:
+            ground_truth = json.load(f)
+
+    trainer = TesseractOCRTrainer(ocr_engine=args.ocr_engine, doc_type=args.doc_type, workers=args.workers,
+                                  render_dir=args.render_cache)
+    trainer.run_training(args.input_dir, ground_truth, args.target_accuracy, args.profiles)
 
 
 if __name__ == "__main__":
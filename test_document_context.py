@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared per-PDF DocumentContext
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+import pdfplumber
+
+from document_context import DocumentContext, PageTextSequence, parse_page_range
+from document_detector import DocumentTypeDetector
+from page_regions import REGIONS
+from pdf_splitter import PDFSplitter
+from split_writer import write_splits
+from text_backends import available_backends
+
+
+def create_test_pdf(filename: str, num_pages: int = 4):
+    """Create a small LTD-style PDF, one file number per page"""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+
+    c = canvas.Canvas(filename, pagesize=letter)
+    for page_num in range(num_pages):
+        c.setFont("Helvetica", 12)
+        c.drawString(100, 700, f"Our File Number: L250{page_num:04d}")
+        c.drawString(100, 680, "To: John Doe")
+        c.drawString(100, 660, "123 Main Street")
+        c.drawString(100, 640, "New York, NY 10001")
+        c.showPage()
+    c.save()
+    return filename
+
+
+def test_page_text_matches_pdfplumber():
+    """Cached text is identical to a direct pdfplumber extraction"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = create_test_pdf(os.path.join(temp_dir, "context.pdf"))
+
+        with pdfplumber.open(pdf_path) as pdf:
+            expected = [page.extract_text() or "" for page in pdf.pages]
+
+        with DocumentContext(pdf_path) as context:
+            assert context.page_count == len(expected)
+            for i, text in enumerate(expected):
+                assert context.get_page_text(i) == text
+            # Second read is served from the cache
+            assert context.get_page_text(0) is context.get_page_text(0)
+            assert context.get_text_range(1, 2) == "\n".join(expected[1:3])
+        print("  ✓ Page text matches pdfplumber")
+
+
+def test_detector_and_splitter_share_context():
+    """Pages read by the detector are not extracted again by the splitter"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = create_test_pdf(os.path.join(temp_dir, "shared.pdf"))
+
+        with DocumentContext(pdf_path) as context:
+            doc_type = DocumentTypeDetector().quick_detect(pdf_path, context=context)
+            assert doc_type == "LTD"
+            detected_pages = dict(context._text_cache)
+            assert len(detected_pages) == 3
+
+            splitter = PDFSplitter(output_dir=os.path.join(temp_dir, "output"))
+            results = splitter.split_pdf(pdf_path, auto_detect=True, context=context)
+
+            assert len(results) == 4
+            assert [doc['file_number'] for doc in results] == [f"L250{i:04d}" for i in range(4)]
+            for key, text in detected_pages.items():
+                assert context._text_cache[key] is text
+        print("  ✓ Detector and splitter share one context")
+
+
+def test_text_backends_agree_on_file_numbers():
+    """Every backend yields the same file numbers through the splitter"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = create_test_pdf(os.path.join(temp_dir, "backends.pdf"))
+
+        for backend in available_backends():
+            splitter = PDFSplitter(output_dir=os.path.join(temp_dir, backend), text_backend=backend)
+            results = splitter.split_pdf(pdf_path, auto_detect=True)
+            assert [doc['file_number'] for doc in results] == [f"L250{i:04d}" for i in range(4)], backend
+
+        try:
+            DocumentContext(pdf_path, backend="nope")
+            assert False, "unknown backend accepted"
+        except ValueError:
+            pass
+        print("  ✓ Text backends agree")
+
+
+def test_region_text_and_fallback():
+    """Regions crop the page; an empty region falls back to full-page text"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = create_test_pdf(os.path.join(temp_dir, "regions.pdf"))
+
+        with DocumentContext(pdf_path) as context:
+            for backend in ("pdfplumber", "pymupdf"):
+                assert "L2500000" in context.get_region_text(0, REGIONS['top_third'], backend)
+                assert context.get_region_text(0, (0.0, 0.5, 1.0, 1.0), backend).strip() == ""
+
+        bottom_half = {'default': {'file_number': [(0.0, 0.5, 1.0, 1.0)]}}
+        splitter = PDFSplitter(output_dir=os.path.join(temp_dir, "output"), regions=bottom_half)
+        results = splitter.split_pdf(pdf_path, auto_detect=True)
+        assert [doc['file_number'] for doc in results] == [f"L250{i:04d}" for i in range(4)]
+        print("  ✓ Region text and full-page fallback")
+
+
+def test_region_miss_rescans_page():
+    """A document whose file number sits outside the regions still starts its own split"""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = os.path.join(temp_dir, "mixed.pdf")
+        c = canvas.Canvas(pdf_path, pagesize=letter)
+        # Number at the top, a continuation page, number at the top, number at the bottom
+        for y, file_number in [(700, "L2500000"), (None, None), (700, "L2500002"), (100, "L2500003")]:
+            c.setFont("Helvetica", 12)
+            c.drawString(100, 400, "Continued from the previous page")
+            if file_number:
+                c.drawString(100, y, f"Our File Number: {file_number}")
+            c.showPage()
+        c.save()
+
+        splitter = PDFSplitter(output_dir=os.path.join(temp_dir, "output"))
+        results = splitter.split_pdf(pdf_path, auto_detect=True)
+        assert [(doc['file_number'], doc['pages']) for doc in results] == \
+            [("L2500000", "1-2"), ("L2500002", "3-3"), ("L2500003", "4-4")]
+        print("  ✓ Region miss rescans page")
+
+
+def test_is_region_number_needs_preferred_source():
+    """A partial page 2 number in the regions doesn't hide a page 3 number outside them"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        splitter = PDFSplitter(output_dir=temp_dir)
+
+    pages = ["", "File No. L2", "Account Number: L2400290\nDebtor: John Doe", "", ""]
+    region_pages = ["", "File No. L2", "Debtor: John Doe", "", ""]
+    assert splitter.extract_is_file_number(region_pages) == "L2"
+    assert splitter.extract_is_file_number_from_regions(region_pages, pages) == "L2400290"
+
+    # A complete page 3 number in the regions is taken without reading the full pages
+    region_pages[2] = pages[2]
+    assert splitter.extract_is_file_number_from_regions(region_pages, None) == "L2400290"
+    print("  ✓ IS region number needs preferred source")
+
+
+def test_page_text_sequence_is_lazy():
+    """Only indexed pages are extracted; fixed IS splits skip pages 6-7"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = create_test_pdf(os.path.join(temp_dir, "lazy.pdf"), num_pages=7)
+
+        with DocumentContext(pdf_path) as context:
+            pages = PageTextSequence(context)
+            view = pages[2:5]
+            assert len(view) == 3 and not context._text_cache
+            assert view[1] == context.get_page_text(3)
+            assert set(context._text_cache) == {("pdfplumber", 3)}
+
+        with DocumentContext(pdf_path) as context:
+            splitter = PDFSplitter(output_dir=os.path.join(temp_dir, "output"))
+            splitter.split_pdf(pdf_path, doc_type="IS", context=context)
+            assert {page for _, page in context._text_cache} == set(range(5))
+        print("  ✓ Page text sequence is lazy")
+
+
+def test_streaming_split_matches_split_pdf():
+    """Streaming yields the same documents, one at a time, releasing each one's pages"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = create_test_pdf(os.path.join(temp_dir, "stream.pdf"))
+        expected = PDFSplitter(output_dir=os.path.join(temp_dir, "batch")).split_pdf(pdf_path)
+
+        splitter = PDFSplitter(output_dir=os.path.join(temp_dir, "stream"))
+        with DocumentContext(pdf_path) as context:
+            documents = splitter.iter_split_pdf(pdf_path, context=context)
+            first = next(documents)
+            # Page 2 had to be read to close document 1, nothing after it
+            assert {key[1] for key in context._region_cache} == {1}
+            assert (Path(temp_dir) / "stream" / first['output_file']).exists()
+            streamed = [first] + list(documents)
+            assert not context._text_cache and not context._region_cache
+
+        manifest = (Path(temp_dir) / "stream" / "manifest.jsonl").read_text().splitlines()
+        assert [json.loads(line) for line in manifest] == streamed
+        assert not splitter.processed_files
+
+        def strip(docs):
+            return [{k: v for k, v in doc.items() if k != 'timestamp'} for doc in docs]
+        assert strip(streamed) == strip(expected)
+        print("  ✓ Streaming split matches split_pdf")
+
+
+def test_streaming_region_fallback_is_bounded():
+    """Pages rescanned in full are read and released one document at a time"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = create_test_pdf(os.path.join(temp_dir, "fallback.pdf"), num_pages=6)
+        bottom_half = {'default': {'file_number': [(0.0, 0.5, 1.0, 1.0)]}}
+        splitter = PDFSplitter(output_dir=os.path.join(temp_dir, "stream"), regions=bottom_half)
+        with DocumentContext(pdf_path) as context:
+            documents = splitter.iter_split_pdf(pdf_path, context=context)
+            assert next(documents)['file_number'] == "L2500000"
+            assert {page for _, page in context._text_cache} == {1}
+            assert [doc['file_number'] for doc in documents] == [f"L250{i:04d}" for i in range(1, 6)]
+            assert not context._text_cache and not context._region_cache
+
+        # Parser caches are internals; a parser without them doesn't stop pages being released
+        with DocumentContext(pdf_path) as context:
+            context.get_page_text(0)
+            context._plumber = SimpleNamespace(doc=SimpleNamespace(), close=lambda: None)
+            context.release_pages(0, 0)
+            assert not context._text_cache
+        print("  ✓ Streaming region fallback is bounded")
+
+
+def test_parallel_extraction_matches_serial():
+    """A process pool fills the context in page order with the serial results"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = create_test_pdf(os.path.join(temp_dir, "parallel.pdf"), num_pages=6)
+        serial = PDFSplitter(output_dir=os.path.join(temp_dir, "serial")).split_pdf(pdf_path)
+
+        with DocumentContext(pdf_path, use_cache=False) as context:
+            splitter = PDFSplitter(output_dir=os.path.join(temp_dir, "parallel"))
+            parallel = splitter.split_pdf(pdf_path, context=context, workers=2)
+            assert set(context._text_cache) == {("pdfplumber", i) for i in range(6)}
+            assert context._plumber is None  # only the workers parsed pages
+
+        def strip(docs):
+            return [{k: v for k, v in doc.items() if k != 'timestamp'} for doc in docs]
+        assert strip(parallel) == strip(serial)
+        print("  ✓ Parallel extraction matches serial")
+
+
+def test_split_writer_outputs():
+    """write_splits writes every output with the requested pages, in order"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = create_test_pdf(os.path.join(temp_dir, "writer.pdf"), num_pages=6)
+        jobs = [(range(0, 2), os.path.join(temp_dir, "a.pdf")),
+                ([2, 4, 5], os.path.join(temp_dir, "b.pdf"))]
+
+        with DocumentContext(pdf_path, use_cache=False) as context:
+            written = write_splits(context.fitz_doc, jobs)
+            expected = [[context.get_page_text(i) for i in pages] for pages, _ in jobs]
+
+        for path, texts in zip(written, expected):
+            with pdfplumber.open(path) as pdf:
+                assert [page.extract_text() or "" for page in pdf.pages] == texts
+        print("  ✓ Split writer outputs")
+
+
+def test_parse_page_range():
+    """Manifest page strings map back to 0-indexed ranges"""
+    assert parse_page_range("1-7") == (0, 6)
+    assert parse_page_range("8-14") == (7, 13)
+    assert parse_page_range("3") == (2, 2)
+    print("  ✓ Page range parsing")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("DocumentContext Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_page_text_matches_pdfplumber,
+        test_detector_and_splitter_share_context,
+        test_text_backends_agree_on_file_numbers,
+        test_region_text_and_fallback,
+        test_region_miss_rescans_page,
+        test_is_region_number_needs_preferred_source,
+        test_page_text_sequence_is_lazy,
+        test_streaming_split_matches_split_pdf,
+        test_streaming_region_fallback_is_bounded,
+        test_parallel_extraction_matches_serial,
+        test_split_writer_outputs,
+        test_parse_page_range,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for the FastOCRExtractor directory mode (JSONL output, resume)
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from fast_ocr_extractor import RESULTS_FILE, FastOCRExtractor
+
+
+def create_letter(filename: Path, file_number: str):
+    """One-page letter with the file number in the top third"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(str(filename), pagesize=letter)
+    c.setFont("Helvetica", 12)
+    c.drawString(100, 720, "Collection Department")
+    c.drawString(100, 700, f"Our File No. {file_number}")
+    c.showPage()
+    c.save()
+    return filename
+
+
+def read_records(path: Path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_directory_writes_jsonl():
+    """One record per file, written as files finish"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        folder = Path(temp_dir)
+        for i, number in enumerate(["L2501375", "JM221025", "87654321"]):
+            create_letter(folder / f"letter{i}.pdf", number)
+
+        summary = FastOCRExtractor().process_directory(str(folder))
+        records = read_records(folder / RESULTS_FILE)
+        assert summary['processed'] == 3 and summary['success'] == 3
+        assert {r['file']: r['file_number'] for r in records} == {
+            'letter0.pdf': "L2501375", 'letter1.pdf': "JM221025", 'letter2.pdf': "87654321"}
+        assert all(r['page'] == 1 and r['source'] == "text layer" and len(r['sha256']) == 64 for r in records)
+    print("  ✓ Directory writes JSONL")
+
+
+def test_directory_resumes():
+    """A rerun skips files already recorded (by content), in parallel too"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        folder = Path(temp_dir) / "backlog"
+        folder.mkdir()
+        output = Path(temp_dir) / "results.jsonl"
+        create_letter(folder / "first.pdf", "L2501375")
+        FastOCRExtractor().process_directory(str(folder), str(output))
+
+        # A crash mid-write leaves a torn line; new files and a renamed copy arrive
+        with open(output, 'a') as f:
+            f.write('{"file": "torn.pdf", "sha')
+        create_letter(folder / "second.pdf", "JM221025")
+        create_letter(folder / "third.pdf", "87654321")
+        shutil.copy(folder / "first.pdf", folder / "first_copy.pdf")
+
+        summary = FastOCRExtractor().process_directory(str(folder), str(output), workers=2)
+        assert summary['processed'] == 2 and summary['skipped'] == 2
+        with open(output) as f:
+            lines = f.read().splitlines()
+        records = [json.loads(line) for line in lines[:1] + lines[2:]]
+        assert sorted(r['file'] for r in records) == ['first.pdf', 'second.pdf', 'third.pdf']
+
+        # Nothing left to do
+        assert FastOCRExtractor().process_directory(str(folder), str(output))['processed'] == 0
+    print("  ✓ Directory resumes")
+
+
+def test_directory_retries_errors():
+    """A file whose first attempt failed is retried on the next run, not skipped"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        folder = Path(temp_dir)
+        create_letter(folder / "locked.pdf", "L2501375")
+
+        def locked(text):
+            raise OSError("file is locked")
+
+        extractor = FastOCRExtractor()
+        extractor.extract_file_number_from_text = locked
+        summary = extractor.process_directory(str(folder))
+        assert summary['processed'] == 1 and summary['success'] == 0
+        assert read_records(folder / RESULTS_FILE)[0]['error'] == "file is locked"
+
+        summary = FastOCRExtractor().process_directory(str(folder))
+        assert summary['processed'] == 1 and summary['skipped'] == 0 and summary['success'] == 1
+        assert read_records(folder / RESULTS_FILE)[-1]['file_number'] == "L2501375"
+        assert FastOCRExtractor().process_directory(str(folder))['skipped'] == 1
+    print("  ✓ Directory retries errors")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Fast OCR Extractor Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_directory_writes_jsonl,
+        test_directory_resumes,
+        test_directory_retries_errors,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared file number pattern sets
+"""
+
+import re
+import sys
+from pathlib import Path
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+import file_number_patterns
+from file_number_patterns import PATTERN_SETS, PatternSet
+
+PAGE = """SUPREME COURT OF THE STATE OF NEW YORK
+Index No. 2024-123456
+Attorney for Judgment Creditor
+Firm File No. 12400290
+Our File Number: jm221025
+Account Number: L2400290
+"""
+
+
+def search_each(pattern_set: PatternSet, text: str):
+    """Every match of each pattern, pattern by pattern (what the extractors did)"""
+    return [(rank, match.start(), match.group(1))
+            for rank, (_, regex) in enumerate(pattern_set)
+            for match in re.finditer(regex, text, pattern_set.flags)]
+
+
+def test_ranked_candidates():
+    """Candidates come back by pattern order, then position, as cased in the text"""
+    candidates = file_number_patterns.IS_OTHER.scan("Case Number: 20241234\nOur File Number: jm221025")
+    assert [(c.label, c.value) for c in candidates] == [('our_file_number', "jm221025"),
+                                                        ('case_number', "20241234")]
+    assert candidates[0].start == len("Case Number: 20241234\n")
+    print("  ✓ Ranked candidates")
+
+
+def test_overlapping_labels():
+    """A label inside a longer one is found too"""
+    labels = [c.label for c in file_number_patterns.LETTER.scan("Our File Number: L2501375")]
+    assert labels == ['our_file_number', 'file_number']
+    print("  ✓ Overlapping labels")
+
+
+def test_same_matches_as_pattern_by_pattern():
+    """One scan finds each pattern's matches, case-insensitive sets included"""
+    texts = [PAGE, PAGE.lower(), PAGE.upper(), "FILE NO.12345678\nACCOUNT # JM221025 x L2501375"]
+    for name, pattern_set in PATTERN_SETS.items():
+        for text in texts:
+            found = pattern_set.scan(text)
+            # Each candidate is a real match of its pattern at its offset
+            for candidate in found:
+                match = re.compile(pattern_set.patterns[candidate.rank][1], pattern_set.flags).match(text, candidate.start)
+                assert match and match.group(1) == candidate.value, name
+            # ...and every match is found, unless an earlier pattern matched at the same offset
+            for rank, start, value in search_each(pattern_set, text):
+                assert (rank, start, value) in {(c.rank, c.start, c.value) for c in found} or \
+                    any(c.start == start and c.rank < rank for c in found), name
+    print("  ✓ Same matches as pattern by pattern")
+
+
+def test_first_with_accept():
+    """first() skips candidates the caller rejects"""
+    assert file_number_patterns.IS_BATCH.first(PAGE) == "L2400290"
+    short_first = PatternSet([('file_no', r'File\s*No[.:]?\s*([A-Z0-9]+)')])
+    assert short_first.first("File No. L2 ... File No. L2401462",
+                             lambda value: value if len(value) >= 6 else None) == "L2401462"
+    assert short_first.first("nothing here") is None
+    print("  ✓ first() with accept")
+
+
+def test_escapes_survive_case_folding():
+    """Upper-case escapes keep their meaning in case-insensitive sets"""
+    pattern_set = PatternSet([('no_space', r'Ref\S*\s*(\d+)'), ('digits', r'\D(\d{3})\b')])
+    assert [(c.label, c.value) for c in pattern_set.scan("REF-ID 42 x123")] == [('no_space', "42"), ('digits', "123")]
+    print("  ✓ Escapes survive case folding")
+
+
+def test_top_level_alternation():
+    """A pattern with alternatives at its top level matches every one of them"""
+    pattern_set = PatternSet([('a', r'File No\.?\s*(\w+)|Ref\s*(\w+)'), ('b', r'\bCase\s*(\d+)|Docket\s*(\d+)')])
+    found = pattern_set.scan("Ref ABC123, File No. L2501375, Docket 42")
+    assert [(c.label, c.value) for c in found] == [('a', "ABC123"), ('a', "L2501375"), ('b', "42")]
+    print("  ✓ Top-level alternation")
+
+
+def test_extractors_share_sets():
+    """The extractors use the compiled sets"""
+    import tempfile
+
+    from infosub_processor import InfoSubProcessor
+    from pdf_splitter import PDFSplitter
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        splitter = PDFSplitter(output_dir=temp_dir)
+        processor = InfoSubProcessor(output_dir=temp_dir)
+    assert splitter.file_patterns is file_number_patterns.LETTER
+    assert processor.file_patterns is file_number_patterns.IS_FIRM
+    assert splitter.extract_file_number(PAGE) == "JM221025"
+    assert processor.extract_file_number(PAGE) == "L2400290"
+    print("  ✓ Extractors share sets")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("File Number Pattern Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_ranked_candidates,
+        test_overlapping_labels,
+        test_same_matches_as_pattern_by_pattern,
+        test_first_with_accept,
+        test_escapes_survive_case_folding,
+        test_top_level_alternation,
+        test_extractors_share_sets,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
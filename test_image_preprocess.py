@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for the NumPy OCR preprocessing steps
+"""
+
+import sys
+from pathlib import Path
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+
+import image_preprocess
+from image_preprocess import preprocessor, stack
+
+
+def scan_like(seed: int = 0, size=(90, 120)) -> np.ndarray:
+    """Noisy grayscale image with a darker band, like a faint scan"""
+    image = np.random.default_rng(seed).integers(0, 256, size, dtype=np.uint8)
+    image[: size[0] // 2] //= 3
+    return image
+
+
+def test_matches_pil():
+    """Steps that replaced PIL filters give the same pixels"""
+    array = scan_like()
+    image = Image.fromarray(array)
+    pairs = [
+        (ImageEnhance.Contrast(image).enhance(2.5), image_preprocess.contrast(array, 2.5)),
+        (ImageEnhance.Brightness(image).enhance(1.2), image_preprocess.brightness(array, 1.2)),
+        (ImageOps.autocontrast(image, cutoff=1), image_preprocess.autocontrast(array, 1)),
+        (image.filter(ImageFilter.SHARPEN), image_preprocess.sharpen(array)),
+        (image.filter(ImageFilter.MedianFilter(3)), image_preprocess.median(array, 3)),
+        (image.filter(ImageFilter.MedianFilter(5)), image_preprocess.median(array, 5)),
+        (image.point(lambda p: p > 128 and 255), image_preprocess.binarize(array, 128)),
+    ]
+    for expected, actual in pairs:
+        assert np.array_equal(np.asarray(expected), actual)
+    print("  ✓ Matches PIL")
+
+
+def test_otsu_threshold():
+    """Otsu splits a two-level image between its levels"""
+    array = np.full((20, 20), 40, dtype=np.uint8)
+    array[:, 10:] = 200
+    assert np.array_equal(image_preprocess.otsu(array) == 255, array == 200)
+    # A flat image has no ink: all background
+    assert image_preprocess.otsu(np.full((5, 5), 90, dtype=np.uint8)).min() == 255
+    print("  ✓ Otsu threshold")
+
+
+def test_batch_matches_single():
+    """A stack of crops is processed per image in one call"""
+    crops = [scan_like(seed) for seed in range(4)]
+    process = preprocessor('autocontrast:1+median+otsu')
+    batch = process(stack(crops))
+    assert batch.shape == (4, 90, 120)
+    for crop, result in zip(crops, batch):
+        assert np.array_equal(process(crop), result)
+    print("  ✓ Batch matches single")
+
+
+def test_chains():
+    """Named chains, step arguments and PIL in / PIL out"""
+    image = Image.linear_gradient('L').resize((64, 48))
+    expected = ImageOps.autocontrast(image, cutoff=1).filter(ImageFilter.SHARPEN)
+    assert preprocessor('enhance')(image).tobytes() == expected.tobytes()
+    assert preprocessor('none')(image) is image
+    binary = preprocessor('upscale:128+binarize:100')(image.convert('RGB'))
+    assert binary.size == (128, 96) and set(binary.tobytes()) == {0, 255}
+    assert set(np.unique(preprocessor('adaptive')(np.asarray(image)))) <= {0, 255}
+    try:
+        preprocessor('contrast+blur')
+        assert False, "unknown step accepted"
+    except ValueError:
+        pass
+    print("  ✓ Chains")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Image Preprocessing Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_matches_pil,
+        test_otsu_threshold,
+        test_batch_matches_single,
+        test_chains,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
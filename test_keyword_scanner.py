@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared keyword scanner
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+import keyword_scanner
+from keyword_scanner import KEYWORDS, KeywordScanner, _ahocorasick_available
+
+BACKENDS = ['ahocorasick', 'find'] if _ahocorasick_available() else ['find']
+
+PAGE = ("SUPREME COURT OF THE STATE OF NEW YORK, COUNTY OF KINGS\n"
+        "INFORMATION SUBPOENA WITH RESTRAINING NOTICE\n"
+        "File No. L2400290 - response required by the deadline")
+
+
+def test_backends_agree():
+    """Every backend finds the same offsets, overlapping and nested keywords included"""
+    scanners = [KeywordScanner(KEYWORDS.keywords, backend) for backend in BACKENDS]
+    for text in [PAGE, PAGE.lower(), "registrationregister nY n.j.N.J. [blank]", ""]:
+        vectors = [scanner.scan(text).positions for scanner in scanners]
+        assert all(vector == vectors[0] for vector in vectors)
+    hits = scanners[-1].scan(PAGE)
+    # "information subpoena" sits inside "information subpoena with restraining notice"
+    assert hits.find("INFORMATION SUBPOENA") == hits.find("information subpoena with restraining notice") == [56]
+    assert hits.find("state of new york") == [21] and hits.find("new york") == [30]
+    print("  ✓ Backends agree")
+
+
+def test_case_sensitive_hits():
+    """Case-sensitive lookups only count hits cased like the term"""
+    hits = keyword_scanner.scan(PAGE)
+    assert hits.has("INFORMATION SUBPOENA WITH RESTRAINING NOTICE", case_sensitive=True)
+    assert not hits.has("information subpoena with restraining notice", case_sensitive=True)
+    assert hits.has("information subpoena with restraining notice")
+    assert hits.count(["File No.", "file no."], case_sensitive=True) == 1
+    print("  ✓ Case-sensitive hits")
+
+
+def test_one_scan_per_page():
+    """Decisions about the same page share one scan; unknown keywords are errors"""
+    text = "".join(["Legal Notice of ", "hearing scheduled"])
+    hits = keyword_scanner.scan(text)
+    assert keyword_scanner.scan(text) is hits
+    assert keyword_scanner.scan(text.encode().decode()) is not hits
+    try:
+        hits.has("not a keyword")
+        assert False, "expected KeyError"
+    except KeyError:
+        pass
+    print("  ✓ One scan per page")
+
+
+def test_classifiers():
+    """Document type, jurisdiction and IS page markers read the hit vector"""
+    from infosub_processor import InfoSubProcessor
+    from pdf_splitter import PDFSplitter
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        splitter = PDFSplitter(output_dir=temp_dir)
+        processor = InfoSubProcessor(output_dir=temp_dir)
+    assert splitter.detect_document_type(PAGE) == "IS"
+    assert splitter.detect_document_type("NOTICE OF MOTION") == "NOTICE"
+    assert splitter.detect_document_type("Motion brief") == "MOTION"
+    assert splitter.detect_document_type("nothing", "REG_F_SCAN_1.pdf") == "LTD"
+    assert splitter.detect_jurisdiction(PAGE) == "NY"
+    assert splitter.detect_jurisdiction("Superior Court of New Jersey") == "NJ"
+    assert splitter.detect_jurisdiction("nothing") is None
+    assert processor.is_document_start("information\nsubpoena with") is False
+    assert processor.is_document_start("Information Subpoena With\nRestraining Notice")
+    assert processor.is_continuation_page("Exemption Claim Form")
+    assert processor.is_blank_page("This page intentionally left blank.")
+    print("  ✓ Classifiers")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Keyword Scanner Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_backends_agree,
+        test_case_sensitive_hits,
+        test_one_scan_per_page,
+        test_classifiers,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for the OCR engine abstraction
+"""
+
+import sys
+from pathlib import Path
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from ocr_engines import ENGINES, available_engines, get_engine, parse_config
+from text_cache import ocr_config
+
+
+def test_parse_config():
+    """pytesseract config strings map onto tesserocr settings"""
+    assert parse_config("") == (None, None, "eng", None, ())
+    assert parse_config("--psm 6 -c tessedit_do_invert=0 --oem 1") == \
+        (6, 1, "eng", None, (("tessedit_do_invert", "0"),))
+    assert parse_config("-l eng+spa --dpi 300 --psm 7") == (7, None, "eng+spa", 300, ())
+    try:
+        parse_config("--psm")
+        assert False, "incomplete option accepted"
+    except ValueError:
+        pass
+    print("  ✓ Config parsing")
+
+
+def test_engine_selection():
+    """auto prefers the in-process engine and falls back to pytesseract"""
+    installed = available_engines()
+    assert installed
+    # Preference order, whichever engines are installed
+    assert installed == [name for name in ENGINES if name in installed]
+    assert get_engine("auto").name == installed[0]
+    assert get_engine("tesseract") is ENGINES["tesseract"]
+    try:
+        get_engine("nope")
+        assert False, "unknown engine accepted"
+    except ValueError:
+        pass
+    # Each engine caches OCR results under its own key
+    assert ocr_config("fitz", engine="tesseract").startswith("tesseract-")
+    if "tesserocr" in installed:
+        assert ocr_config("fitz", engine="tesserocr").startswith("tesserocr-")
+    print("  ✓ Engine selection")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("OCR Engine Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_parse_config,
+        test_engine_selection,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test script for the OCR escalation ladder
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+import fitz
+
+from document_context import DocumentContext
+from infosub_processor import InfoSubProcessor
+from ocr_engines import ENGINES, OCREngine
+from ocr_ladder import OCRLadder, Rung, file_number_format, ocr_rung, page_bands, rung_config, uncovered_bands
+
+REGION = Rung('region', 1.5, ((0.0, 0.3, 1.0, 0.65),))
+PAGE = Rung('page', 2, None)
+HQ = Rung('page_hq', 300 / 72, None, 'enhance')
+
+
+def canned_ocr(texts):
+    """OCR stand-in returning fixed text per rung, recording the rungs climbed"""
+    climbed = []
+
+    def ocr(page_num, rung):
+        climbed.append(rung.name)
+        return texts.get(rung.name, "")
+    return ocr, climbed
+
+
+class RecordingEngine(OCREngine):
+    """Engine stand-in that returns the image size and records every call"""
+
+    name = "recording"
+
+    def __init__(self):
+        self.calls = []
+
+    def image_to_string(self, image, config: str = "") -> str:
+        self.calls.append(image.size)
+        return f"{image.size[0]}x{image.size[1]}"
+
+
+def test_file_number_formats():
+    """Only the three firm formats validate"""
+    assert file_number_format("L2501375") == '1L+7N'
+    assert file_number_format("JM221025") == '2L+6N'
+    assert file_number_format("12345678") == '8N'
+    assert file_number_format("L250137") is None
+    assert file_number_format(None) is None
+    print("  ✓ File number formats")
+
+
+def test_ladder_stops_at_first_valid_rung():
+    """Cheap rungs that validate keep the expensive ones from running"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        extract = InfoSubProcessor(output_dir=temp_dir).extract_file_number
+    ladder = OCRLadder([REGION, PAGE, HQ])
+
+    ocr, climbed = canned_ocr({'region': "File No. L2501375"})
+    assert ladder.read(None, 0, extract, ocr) == ("L2501375", "File No. L2501375", 'region')
+    assert climbed == ['region']
+
+    # A number missing a digit escalates until a rung reads it in full
+    ocr, climbed = canned_ocr({'region': "File No. 2501375", 'page': "Firm File No. L2501375"})
+    assert ladder.read(None, 1, extract, ocr)[0::2] == ("L2501375", 'page')
+    assert climbed == ['region', 'page']
+
+    # Nothing validates: the best unvalidated candidate is still returned
+    ocr, climbed = canned_ocr({'page': "File No. 2501375"})
+    assert ladder.read(None, 2, extract, ocr) == ("2501375", "", None)
+    assert climbed == ['region', 'page', 'page_hq']
+
+    stats = ladder.hit_rates()
+    assert stats['rungs']['region'] == {'attempts': 3, 'hits': 1, 'hit_rate': 0.333}
+    assert stats['rungs']['page'] == {'attempts': 2, 'hits': 1, 'hit_rate': 0.5}
+    assert stats['rungs']['page_hq'] == {'attempts': 1, 'hits': 0, 'hit_rate': 0.0}
+    assert stats['misses'] == 1
+    print("  ✓ Ladder stops at first valid rung")
+
+
+def test_rung_cache_keys():
+    """A plain full-page rung shares cache entries with the existing full-page OCR"""
+    assert rung_config(PAGE, "tesseract").endswith(":fitz:x2:gray")
+    assert len({rung_config(rung, "tesseract") for rung in (REGION, PAGE, HQ)}) == 3
+    print("  ✓ Rung cache keys")
+
+
+def test_full_page_reuses_region_ocr():
+    """A full page after quick-mode OCR only OCRs the bands the header didn't cover"""
+    engine = ENGINES[RecordingEngine.name] = RecordingEngine()
+    quick = Rung('start_marker', 1.5, ((0.0, 0.0, 1.0, 0.3),))
+    page = Rung('page', 2, None, reuse=(quick,))
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = Path(temp_dir) / "scan.pdf"
+            doc = fitz.open()
+            doc.new_page(width=600, height=800)
+            doc.new_page(width=600, height=800)
+            doc.save(str(pdf_path))
+            doc.close()
+
+            with DocumentContext(pdf_path, use_cache=False) as context:
+                # Nothing cached yet: one full-page pass, as before
+                assert page_bands(context, 0, page, engine.name) == [(None, None)]
+                assert ocr_rung(context, 1, page, engine.name) == "1200x1600"
+
+                header = ocr_rung(context, 0, quick, engine.name)
+                assert header == "900x360"
+                engine.calls.clear()
+                text = ocr_rung(context, 0, page, engine.name)
+                # Only the bottom 70% is rendered and OCR'd; header text comes first
+                assert engine.calls == [(1200, 1120)]
+                assert text == "900x360\n1200x1120"
+                assert rung_config(page, engine.name) != rung_config(page._replace(reuse=()), engine.name)
+    finally:
+        del ENGINES[RecordingEngine.name]
+    print("  ✓ Full page reuses region OCR")
+
+
+def test_region_hit_keeps_whole_page_text():
+    """A file number read from crops still leaves the whole page's text for the boundary checks"""
+    assert uncovered_bands([(0.0, 0.3, 1.0, 0.65), (0.0, 0.6, 1.0, 1.0)]) == ((0.0, 0.0, 1.0, 0.3),)
+    assert uncovered_bands([(0.0, 0.0, 1.0, 0.3), (0.0, 0.3, 1.0, 1.0)]) == ()
+    assert uncovered_bands([(0.1, 0.0, 0.9, 1.0)]) is None
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        processor = InfoSubProcessor(output_dir=temp_dir)
+    ocr, climbed = canned_ocr({'file_number_regions': "Firm File No. L2501375",
+                               'missing_bands': "Index No. 2024-123456"})
+    ocr = SimpleNamespace(text=ocr)
+
+    # No quick-mode header: only the band above the crops is OCR'd
+    file_number, text = processor._read_file_number(None, ocr, 1, "")
+    assert file_number == "L2501375"
+    assert climbed == ['file_number_regions', 'missing_bands']
+    assert text == "Index No. 2024-123456\nFirm File No. L2501375"
+    assert processor.extract_index_number(text) == "2024-123456"
+
+    # The quick-mode header fills that band without more OCR
+    climbed.clear()
+    file_number, text = processor._read_file_number(None, ocr, 1, "INFORMATION SUBPOENA\nIndex No. 2024-123456")
+    assert climbed == ['file_number_regions']
+    assert text.startswith("INFORMATION SUBPOENA") and text.endswith("L2501375")
+    print("  ✓ Region hit keeps whole page text")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("OCR Ladder Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_file_number_formats,
+        test_ladder_stops_at_first_valid_rung,
+        test_rung_cache_keys,
+        test_full_page_reuses_region_ocr,
+        test_region_hit_keeps_whole_page_text,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
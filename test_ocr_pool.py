@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for parallel OCR during InfoSub boundary detection
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from document_context import DocumentContext
+from infosub_processor import InfoSubProcessor
+from ocr_ladder import rung_config
+
+START = "INFORMATION SUBPOENA WITH RESTRAINING NOTICE"
+BODY = "The judgment debtor is required to answer the questions below under oath"
+
+# What OCR "reads" on each page of a 12-page scanned batch: two subpoenas,
+# the second with its file number past page 2 so the final scan has to find it
+PAGE_TEXT = {
+    0: START, 1: f"Firm File No. L1111111 {BODY}",
+    6: START, 7: BODY, 10: f"Firm File No. L2222222 {BODY}",
+}
+
+
+class CannedOCRProcessor(InfoSubProcessor):
+    """InfoSubProcessor with OCR replaced by fixed per-page text (no tesseract needed)"""
+
+    def ocr_page(self, context, page_num, rung):
+        text = PAGE_TEXT.get(page_num, BODY)
+        context.set_ocr_text(page_num, text, config=rung_config(rung, self.ocr_engine))
+        return text
+
+
+def create_scanned_pdf(filename: str, num_pages: int = 12):
+    """Image-only pages, so every page needs OCR"""
+    from PIL import Image
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    width, height = letter
+    c = canvas.Canvas(filename, pagesize=letter)
+    for page_num in range(num_pages):
+        c.drawImage(ImageReader(Image.new('L', (85, 110), 255 - page_num)), 0, 0, width=width, height=height)
+        c.showPage()
+    c.save()
+    return filename
+
+
+def test_parallel_ocr_matches_serial():
+    """Pool workers produce the same boundaries as serial OCR"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = create_scanned_pdf(os.path.join(temp_dir, "scanned.pdf"))
+        processor = CannedOCRProcessor(output_dir=os.path.join(temp_dir, "output"))
+
+        with DocumentContext(pdf_path, use_cache=False) as context:
+            serial = processor.find_document_boundaries(pdf_path, context=context)
+        with DocumentContext(pdf_path, use_cache=False) as context:
+            parallel = processor.find_document_boundaries(pdf_path, context=context, workers=2)
+        assert serial == [(0, 5, "L1111111", None), (6, 11, "L2222222", None)]
+        assert parallel == serial
+        print("  ✓ Parallel OCR matches serial")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("OCR Pool Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_parallel_ocr_matches_serial,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
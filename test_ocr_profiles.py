@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Test script for trained OCR profiles
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+import ocr_test_and_tune
+from fast_ocr_extractor import FastOCRExtractor
+from infosub_processor import InfoSubProcessor
+from ocr_profiles import OCRProfile, choose_profile, load_profiles, save_profiles
+from tesseract_ocr_trainer import TesseractOCRTrainer
+
+SIGNATURE = ((0.0, 0.3, 1.0, 0.65),)
+
+
+def test_profile_settings():
+    """A profile turns into tesseract options, a ladder rung and JSON"""
+    profile = OCRProfile('IS', 'file_number', SIGNATURE, 150, psm=6, whitelist="0123456789",
+                         preprocess='contrast+sharpen', accuracy=0.8, samples=5)
+    assert profile.config == "--psm 6 -c tessedit_char_whitelist=0123456789"
+    rung = profile.rung('file_number_regions')
+    assert rung.name == 'file_number_regions' and rung.zoom == 150 / 72
+    assert rung.regions == SIGNATURE and rung.config == profile.config
+    assert OCRProfile.from_dict(profile.to_dict()) == profile
+
+    # Cost scales with the area and the square of the resolution
+    page = OCRProfile('IS', 'file_number', None, 300)
+    assert abs(page.cost - 8.415) < 0.001
+    assert abs(profile.cost - page.cost * 0.35 / 4) < 0.001
+    print("  ✓ Profile settings")
+
+
+def test_choose_cheapest_meeting_target():
+    """The cheapest profile meeting the target wins; otherwise the most accurate"""
+    cheap = OCRProfile('IS', 'file_number', SIGNATURE, 150, accuracy=0.8)
+    mid = OCRProfile('IS', 'file_number', SIGNATURE, 300, accuracy=1.0)
+    page = OCRProfile('IS', 'file_number', None, 300, accuracy=1.0)
+    assert choose_profile([page, mid, cheap], 0.8) == cheap
+    assert choose_profile([page, mid, cheap], 0.9) == mid
+    assert choose_profile([cheap, mid._replace(accuracy=0.6)], 0.9) == cheap
+    assert choose_profile([cheap._replace(accuracy=None), mid._replace(accuracy=0.0)], 0.9) is None
+    print("  ✓ Choose cheapest profile meeting target")
+
+
+def test_save_merges_and_runtime_loads():
+    """Trainers update one field's profile; the extractors pick it up"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "profiles.json"
+        assert load_profiles(path) == {}
+
+        marker = OCRProfile('IS', 'start_marker', ((0.0, 0.0, 1.0, 0.3),), 100, psm=6)
+        save_profiles([marker, OCRProfile('IS', 'file_number', None, 300)], path)
+        file_number = OCRProfile('IS', 'file_number', SIGNATURE, 150, psm=6, accuracy=1.0)
+        letters = OCRProfile('default', 'file_number', ((0.0, 0.0, 1.0, 0.25),), 200, psm=4)
+        save_profiles([file_number, letters], path)
+        assert load_profiles(path) == {
+            ('IS', 'start_marker'): marker,
+            ('IS', 'file_number'): file_number,
+            ('default', 'file_number'): letters,
+        }
+
+        processor = InfoSubProcessor(output_dir=temp_dir, profiles=str(path))
+        assert processor.quick_rung == marker.rung('start_marker')
+        assert processor.file_number_ladder.rungs[0] == file_number.rung('file_number_regions')
+        assert processor.page_rung.reuse == (processor.quick_rung,)
+
+        extractor = FastOCRExtractor(profiles=str(path))
+        assert [rung.name for rung in extractor.file_number_ladder.rungs] == \
+            ['file_number_profile', 'page_300dpi_enhanced']
+        assert extractor.file_number_ladder.rungs[0].zoom == 200 / 72
+
+        # Unreadable profiles fall back to the built-in rungs
+        path.write_text("{not json")
+        assert load_profiles(path) == {}
+        assert FastOCRExtractor(profiles=str(path)).file_number_ladder.rungs[0].name == 'top_third'
+    print("  ✓ Save merges and runtime loads")
+
+
+def test_trainer_candidates():
+    """The trainer scores every crop/DPI/config/preprocessing combination as a profile"""
+    trainer = TesseractOCRTrainer(doc_type='IS')
+    candidates = trainer.candidate_profiles()
+    assert len(candidates) == (len(trainer.crops) * len(trainer.dpis) *
+                               len(trainer.preprocess_methods) * len(trainer.ocr_configs))
+    assert len({key for key, _, _, _ in candidates}) == len(candidates)
+    key, preprocess, config, profile = candidates[0]
+    assert (preprocess, config) == ("none", "default")
+    assert profile.doc_type == 'IS' and profile.regions == trainer.crops[0][1]
+    print("  ✓ Trainer candidates")
+
+
+def test_trainer_saves_only_with_ground_truth():
+    """Without known file numbers a run reports format-valid rates and leaves the profiles alone"""
+    trainer = TesseractOCRTrainer(doc_type='IS')
+    # Every configuration reads a valid-format number, but only one the right number
+    texts = [["File No. L2400290"] if config == "default" else ["File No. L9999999"]
+             for _, _, config, _ in trainer.candidate_profiles()]
+    trainer.ocr_candidates = lambda pdf_paths: {str(path): texts for path in pdf_paths}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in ("a.pdf", "b.pdf"):
+            Path(temp_dir, name).touch()
+        path = Path(temp_dir) / "profiles.json"
+        os.chdir(temp_dir)
+        try:
+            trainer.run_training(temp_dir, profiles_path=str(path))
+            assert not path.exists()
+
+            trainer.run_training(temp_dir, {"a.pdf": "L2400290"}, target_accuracy=1.0, profiles_path=str(path))
+            profile = load_profiles(path)[('IS', 'file_number')]
+            assert (profile.accuracy, profile.samples, profile.config) == (1.0, 1, "")
+        finally:
+            os.chdir(cwd)
+    print("  ✓ Trainer saves only with ground truth")
+
+
+def test_tuner_skips_unlabelled_files():
+    """Files missing from the ground truth neither count toward accuracy nor get OCR'd"""
+    tester = ocr_test_and_tune.OCRTester(doc_type='IS')
+    tester.ground_truth = {"a.pdf": "L2400290"}
+    tester.extract_with_pdfplumber = lambda pdf_path: [""]
+    graded = []
+
+    def evaluate_grid(pdf_files, rungs, **kwargs):
+        graded.extend(path.name for path in pdf_files)
+        return {str(path): [["File No. L2400290"]] * len(rungs) for path in pdf_files}
+
+    evaluate = ocr_test_and_tune.evaluate_grid
+    ocr_test_and_tune.evaluate_grid = evaluate_grid
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in ("a.pdf", "b.pdf"):
+            Path(temp_dir, name).touch()
+        path = Path(temp_dir) / "profiles.json"
+        os.chdir(temp_dir)
+        try:
+            results = tester.run_test_suite(temp_dir, target_accuracy=1.0, profiles_path=str(path))
+        finally:
+            ocr_test_and_tune.evaluate_grid = evaluate
+            os.chdir(cwd)
+        assert graded == ["a.pdf"] and results["unlabelled_files"] == ["b.pdf"]
+        assert results["methods"]["tesseract_default"] == {"success": 1, "total": 1}
+        profile = load_profiles(path)[('IS', 'file_number')]
+        assert (profile.accuracy, profile.samples) == (1.0, 1)
+    print("  ✓ Tuner skips unlabelled files")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("OCR Profile Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_profile_settings,
+        test_choose_cheapest_meeting_target,
+        test_save_merges_and_runtime_loads,
+        test_trainer_candidates,
+        test_trainer_saves_only_with_ground_truth,
+        test_tuner_skips_unlabelled_files,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
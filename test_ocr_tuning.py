@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script for the render-once OCR tuning harness
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+import fitz
+
+from document_context import DocumentContext
+from ocr_engines import ENGINES, OCREngine
+from ocr_ladder import Rung, ocr_rung
+from ocr_tuning import RenderCache, evaluate_grid
+from text_cache import TextCache
+
+REGIONS = ((0.0, 0.0, 1.0, 0.3), (0.0, 0.6, 1.0, 1.0))
+
+# 2 zooms x 2 crops x 2 preprocessing chains x 2 configs
+GRID = [Rung(f"{zoom}_{bool(regions)}_{chain}_{config}", zoom, regions, chain, config)
+        for zoom in (1.5, 2)
+        for regions in (REGIONS, None)
+        for chain in ('none', 'contrast')
+        for config in ("", "--psm 6")]
+
+
+class SizeEngine(OCREngine):
+    """Engine stand-in that reads back the image size and settings"""
+
+    name = "size"
+
+    def image_to_string(self, image, config: str = "") -> str:
+        return f"{image.size[0]}x{image.size[1]} {config}"
+
+
+def create_blank_pdf(pdf_path: Path, pages: int = 2):
+    doc = fitz.open()
+    for _ in range(pages):
+        doc.new_page(width=600, height=800)
+    doc.save(str(pdf_path))
+    doc.close()
+    return pdf_path
+
+
+def test_grid_renders_each_page_once_per_crop():
+    """Every setting is OCR'd; each page is rasterized once per zoom and crop"""
+    engine = ENGINES[SizeEngine.name] = SizeEngine()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = create_blank_pdf(Path(temp_dir) / "scan.pdf")
+            cache = TextCache(Path(temp_dir) / "cache.db")
+            with mock.patch('ocr_tuning.DocumentContext',
+                            lambda path, **kwargs: DocumentContext(path, cache=cache)), \
+                    mock.patch.object(DocumentContext, 'render_page', autospec=True,
+                                      side_effect=DocumentContext.render_page) as render:
+                results = evaluate_grid([pdf_path], GRID, engine=engine.name)[str(pdf_path)]
+                # 2 pages x 2 zooms x (2 regions + full page)
+                assert render.call_count == 2 * 2 * 3
+
+                # A rerun reads everything from the cache
+                render.reset_mock()
+                assert evaluate_grid([pdf_path], GRID, engine=engine.name)[str(pdf_path)] == results
+                assert render.call_count == 0
+
+            # Same text, under the same keys, as the extractors' OCR path
+            with DocumentContext(pdf_path, cache=cache) as context:
+                for rung, texts in zip(GRID, results):
+                    assert texts == [ocr_rung(context, page_num, rung, engine.name) for page_num in range(2)]
+            assert results[GRID.index(Rung("2_False_none_--psm 6", 2, None, 'none', "--psm 6"))] == \
+                ["1200x1600 --psm 6"] * 2
+            cache.close()
+    finally:
+        del ENGINES[SizeEngine.name]
+    print("  ✓ Grid renders each page once per crop")
+
+
+def test_pool_matches_serial():
+    """Fanning pages out over workers gives the serial results"""
+    engine = ENGINES[SizeEngine.name] = SizeEngine()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdfs = [create_blank_pdf(Path(temp_dir) / f"scan{i}.pdf", pages=i + 1) for i in range(2)]
+            with mock.patch('ocr_tuning.DocumentContext',
+                            lambda path, **kwargs: DocumentContext(path, use_cache=False)):
+                serial = evaluate_grid(pdfs, GRID, max_pages=2, engine=engine.name)
+                pooled = evaluate_grid(pdfs, GRID, max_pages=2, engine=engine.name, workers=2)
+            assert serial == pooled
+            assert [len(texts[0]) for texts in serial.values()] == [1, 2]
+    finally:
+        del ENGINES[SizeEngine.name]
+    print("  ✓ Pool matches serial")
+
+
+def test_render_cache_on_disk():
+    """Renders kept on disk are reused by a later cache"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = create_blank_pdf(Path(temp_dir) / "scan.pdf", pages=1)
+        with DocumentContext(pdf_path, use_cache=False) as context:
+            image = RenderCache(Path(temp_dir) / "renders").get(context, 0, 1.5, REGIONS[0])
+            with mock.patch.object(context, 'render_page') as render:
+                again = RenderCache(Path(temp_dir) / "renders").get(context, 0, 1.5, REGIONS[0])
+                render.assert_not_called()
+            assert again.tobytes() == image.tobytes()
+    print("  ✓ Render cache on disk")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("OCR Tuning Harness Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_grid_renders_each_page_once_per_crop,
+        test_pool_matches_serial,
+        test_render_cache_on_disk,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for per-document orientation and skew correction
+"""
+
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+import numpy as np
+from PIL import Image
+
+from document_context import DocumentContext
+from ocr_engines import ENGINES, OCREngine
+from ocr_ladder import Rung, rung_config
+from page_orientation import Orientation, estimate_skew
+from text_cache import TextCache
+
+
+class SidewaysEngine(OCREngine):
+    """Engine stand-in whose orientation detection says the page needs a quarter turn"""
+
+    name = "sideways"
+
+    def __init__(self):
+        self.osd_calls = 0
+
+    def image_to_string(self, image, config: str = "") -> str:
+        return ""
+
+    def detect_rotation(self, image):
+        self.osd_calls += 1
+        return 90
+
+
+def lined_page(angle: float = 0.0, size=(600, 800)) -> Image.Image:
+    """White page with dark text-like lines, turned counter-clockwise by angle"""
+    page = np.full(size[::-1], 255, dtype=np.uint8)
+    for top in range(60, size[1] - 60, 24):
+        for left in range(50, size[0] - 50, 70):
+            page[top:top + 8, left:left + 55] = 20
+    return Image.fromarray(page).rotate(angle, resample=Image.Resampling.BILINEAR, fillcolor=255)
+
+
+def create_scanned_pdf(filename: str, image: Image.Image):
+    """One-page PDF holding only the image, like a scanner's output"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    buffer.seek(0)
+    width, height = letter
+    c = canvas.Canvas(filename, pagesize=letter)
+    c.drawImage(ImageReader(buffer), 0, 0, width=width, height=height)
+    c.showPage()
+    c.save()
+    return filename
+
+
+def test_estimate_skew():
+    """Projection profile finds the turn that levels the lines"""
+    assert estimate_skew(lined_page()) == 0.0
+    assert abs(estimate_skew(lined_page(-2.5)) - 2.5) <= 0.2
+    assert abs(estimate_skew(lined_page(1.8)) + 1.8) <= 0.2
+    # Blank paper says nothing; noise has no lines to level
+    assert estimate_skew(Image.new('L', (300, 400), 255)) is None
+    noise = np.random.default_rng(0).integers(0, 256, (400, 300), dtype=np.uint8)
+    assert estimate_skew(noise) == 0.0
+    print("  ✓ Estimate skew")
+
+
+def test_orientation_keys_and_apply():
+    """Orientations round-trip through cache keys and straighten images"""
+    orientation = Orientation(90, -1.5)
+    assert Orientation.parse(orientation.key()) == orientation
+    assert Orientation().upright and not orientation.upright
+    assert Orientation(90).apply(Image.new('L', (30, 40))).size == (40, 30)
+
+    rung = Rung('region', 1.5, ((0.0, 0.0, 1.0, 0.3),))
+    assert rung_config(rung, 'tesseract', Orientation()) == rung_config(rung, 'tesseract')
+    assert rung_config(rung, 'tesseract', orientation) != rung_config(rung, 'tesseract')
+    print("  ✓ Orientation keys and apply")
+
+
+def test_context_detects_once_and_corrects_renders():
+    """Detection runs once per file; renders and crops come out straightened"""
+    engine = ENGINES[SidewaysEngine.name] = SidewaysEngine()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Scanned sideways (turned counter-clockwise) and a little crooked
+            page = lined_page(-2.0).rotate(90, expand=True).resize((600, 800))
+            pdf_path = create_scanned_pdf(os.path.join(temp_dir, "sideways.pdf"), page)
+            cache = TextCache(os.path.join(temp_dir, "cache.db"))
+
+            with DocumentContext(pdf_path, cache=cache) as context:
+                raw = context.render_page(0, zoom=1)
+                orientation = context.detect_orientation([0], engine.name)
+                assert orientation.rotation == 90 and orientation.skew != 0
+                assert context.detect_orientation([0], engine.name) is orientation
+                assert engine.osd_calls == 1
+
+                straight = context.render_page(0, zoom=1)
+                assert straight.size == (raw.height, raw.width)
+                crop = context.render_page(0, zoom=1, region=(0.0, 0.0, 1.0, 0.5))
+                assert crop.size == (straight.width, straight.height // 2)
+                assert context.render_page(0, zoom=1, correct=False).size == raw.size
+
+            # A later run over the same file reads the result from the cache
+            with DocumentContext(pdf_path, cache=cache) as context:
+                assert context.detect_orientation([0], engine.name) == orientation
+                assert engine.osd_calls == 1
+            cache.close()
+    finally:
+        del ENGINES[SidewaysEngine.name]
+    print("  ✓ Context detects once and corrects renders")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Page Orientation Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_estimate_skew,
+        test_orientation_keys_and_apply,
+        test_context_detects_once_and_corrects_renders,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
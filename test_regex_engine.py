@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test script for the regex engine option and its RE2 compatibility check
+"""
+
+import json
+import re
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+import regex_engine
+from file_number_patterns import PATTERN_SETS
+from infosub_processor import InfoSubProcessor
+from is_postprocessor import ATTORNEY_PATTERNS
+from pdf_splitter import PDFSplitter
+from rule_registry import DEFAULT_RULES_PATH
+
+ENGINES = regex_engine.available_engines()
+
+PAGES = [
+    """SUPREME COURT OF THE STATE OF NEW YORK
+Index No. 2024-123456
+Attorney for Judgment Creditor
+Firm File No. 12400290
+Our File Number: jm221025
+Account Number: L2400290
+To: JOHN DOE
+123 Main Street
+Newark, NJ 07102
+""",
+    "FILE NO.12345678\nACCOUNT # JM221025 x L2501375\nRe: Jane Roe  Case No. CV-2024/889",
+    "Our File Number: Our File Number: L2501375",
+    "Attorney for " * 200,
+    "To: Re: Debtor: x " * 100,
+]
+
+
+@contextmanager
+def engine(name: str):
+    """Run the block on one engine, then go back to re"""
+    regex_engine.set_engine(name)
+    try:
+        yield
+    finally:
+        regex_engine.set_engine('re')
+
+
+def extract_page(splitter: PDFSplitter, infosub: InfoSubProcessor, text: str):
+    values = [pattern_set.scan(text) for pattern_set in PATTERN_SETS.values()]
+    values += [splitter.extract_file_number(text), splitter.extract_debtor_name(text),
+               splitter.extract_address(text)]
+    values += [infosub.extract_file_number(text), infosub.extract_index_number(text)]
+    values += [bool(regex_engine.search(pattern, text, re.IGNORECASE | re.DOTALL)) for pattern in ATTORNEY_PATTERNS]
+    return values
+
+
+def test_check_flags_unsupported():
+    """Constructs RE2 can't run, or runs with another meaning, are flagged"""
+    flagged = {
+        r'File(?=\s+No)': 'lookahead',
+        r'(?<!Our )File': 'lookbehind',
+        r'(\d)\1': 'backreference',
+        r'(a)?(?(1)b|c)': 'conditional group',
+        r'To:\s*([^\n]+?)(?:\n|$)': '$ without MULTILINE',
+        r'No\.\s*(\d+)\Z': '\\Z',
+        r'x{1001}': 'repeat count over 1000',
+    }
+    if sys.version_info >= (3, 11):
+        flagged[r'(?>File)'] = 'atomic group'
+        flagged[r'\d++'] = 'possessive repeat'
+    for pattern, problem in flagged.items():
+        assert problem in regex_engine.check(pattern), pattern
+    assert regex_engine.check(r'To:\s*([^\n]+?)(?:\n|$)', re.MULTILINE) == []
+    assert regex_engine.check(r'File\s+No[.]?\s*([A-Z0-9\-/]+)', re.IGNORECASE) == []
+    assert regex_engine.check('x', re.VERBOSE)
+    assert regex_engine.check('(')[0].startswith('invalid pattern')
+    print("  ✓ Check flags unsupported constructs")
+
+
+def test_shipped_patterns_run_on_re2():
+    """Every shipped pattern set and extractor pattern passes the check"""
+    with open(DEFAULT_RULES_PATH) as f:
+        assert regex_engine.check_rules(json.load(f)) == []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        splitter = PDFSplitter(output_dir=temp_dir)
+    for pattern in splitter.debtor_patterns + splitter.address_patterns:
+        assert regex_engine.check(pattern, re.IGNORECASE | re.MULTILINE) == [], pattern
+    for pattern in ATTORNEY_PATTERNS:
+        assert regex_engine.check(pattern, re.IGNORECASE | re.DOTALL) == [], pattern
+    print("  ✓ Shipped patterns run on RE2")
+
+
+def test_engine_selection():
+    """Unknown engines are rejected; re2 compiles to RE2 and falls back to re for flagged patterns"""
+    try:
+        regex_engine.resolve_engine('pcre')
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert regex_engine.resolve_engine('auto') == ENGINES[-1]
+    assert isinstance(regex_engine.compile(r'File\s+No', engine='re'), re.Pattern)
+    if 're2' in ENGINES:
+        with engine('re2'):
+            assert regex_engine.ENGINE == 're2'
+            assert not isinstance(regex_engine.compile(r'File\s+No'), re.Pattern)
+            assert isinstance(regex_engine.compile(r'File(?=\s+No)'), re.Pattern)
+            match = regex_engine.search(r'file\s+no\.?\s*(\d+)', "Firm File No. 12400290", re.IGNORECASE)
+            assert match.group(1) == "12400290" and match.start() == len("Firm ")
+    assert regex_engine.ENGINE == 're'
+    print("  ✓ Engine selection")
+
+
+def test_engines_agree():
+    """Every extractor gets the same values on each engine"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        splitter = PDFSplitter(output_dir=temp_dir)
+        infosub = InfoSubProcessor(output_dir=temp_dir)
+        texts = PAGES + [page.lower() for page in PAGES[:3]] + [page.upper() for page in PAGES[:3]]
+        expected = [extract_page(splitter, infosub, text) for text in texts]
+        for name in ENGINES:
+            with engine(name):
+                assert [extract_page(splitter, infosub, text) for text in texts] == expected, name
+    print("  ✓ Engines agree")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Regex Engine Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_check_flags_unsupported,
+        test_shipped_patterns_run_on_re2,
+        test_engine_selection,
+        test_engines_agree,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-pattern rule profiler
+"""
+
+import json
+import multiprocessing
+import re
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+import file_number_patterns
+import keyword_scanner
+import rule_profiler
+from rule_profiler import PROFILER
+
+PAGE = ("Attorney for Judgment Creditor\n"
+        "File No. L2400290\n"
+        "Our File Number: jm221025\n")
+
+
+@contextmanager
+def profiling():
+    """Profile within the block only, starting from empty counters"""
+    saved = PROFILER.take()
+    PROFILER.enabled = True
+    try:
+        yield PROFILER
+    finally:
+        PROFILER.enabled = False
+        PROFILER.reset()
+        PROFILER.merge(saved)
+
+
+def _worker_stats():
+    return len(PROFILER.stats)
+
+
+def test_off_by_default():
+    """Nothing is recorded unless profiling is enabled"""
+    assert not PROFILER.enabled
+    before = dict(PROFILER.stats)
+    assert rule_profiler.search('unused', r'File\s+No', PAGE, re.IGNORECASE)
+    file_number_patterns.LETTER.scan(PAGE)
+    assert PROFILER.stats == before
+    print("  ✓ Off by default")
+
+
+def test_sets_and_searches():
+    """A set scan counts the set and each pattern alone; searches count under their rule"""
+    with profiling() as profiler:
+        letter = file_number_patterns.LETTER
+        assert letter.scan(PAGE) == letter._scan(PAGE)
+        letter.scan("nothing here")
+        rule_profiler.search('attorney.3', r'Attorney.*Creditor', PAGE, re.IGNORECASE | re.DOTALL)
+        keyword_scanner.scan(PAGE + " ")
+
+        rows = {row['rule']: row for row in profiler.rows()}
+        assert rows['letter']['calls'] == 2 and rows['letter']['hits'] == 1
+        assert rows['letter.our_file_number']['hits'] == 1
+        assert rows['letter.matter_hash']['hits'] == 0
+        assert rows['letter.file_no']['pattern'] == dict(letter.patterns)['file_no']
+        assert rows['attorney.3']['hit_rate'] == 1.0
+        assert rows['keywords']['calls'] == 1
+        for row in rows.values():
+            assert 0 <= row['worst_ms'] <= row['total_ms']
+        totals = [row['total_ms'] for row in profiler.rows()]
+        assert totals == sorted(totals, reverse=True)
+    print("  ✓ Sets and searches")
+
+
+def test_keyword_scan_latency():
+    """Each scanner backend records the time of its scan, not a text offset"""
+    backends = ['ahocorasick', 'find'] if keyword_scanner._ahocorasick_available() else ['find']
+    with profiling() as profiler:
+        for backend in backends:
+            scanner = keyword_scanner.KeywordScanner(keyword_scanner.KEYWORDS.keywords, backend)
+            scanner.scan(PAGE * 50)
+        rows = [row for row in profiler.rows() if row['rule'] == 'keywords']
+        assert len(rows) == len(backends)
+        for row in rows:
+            assert row['calls'] == 1 and row['hits'] == 1
+            assert 0 <= row['worst_ms'] < 1000, row
+    print("  ✓ Keyword scan latency")
+
+
+def test_report_and_merge():
+    """Worker counters merge in; the report lists dead patterns and writes JSON"""
+    with profiling() as profiler:
+        rule_profiler.search('index_number.0', r'Index\s+No', PAGE)
+        worker = rule_profiler.RuleProfiler()
+        worker.record('index_number.0', r'Index\s+No', 0.002, True)
+        worker.record('index_number.0', r'Index\s+No', 0.001, False)
+        profiler.merge(worker.take())
+        assert worker.stats == {}
+
+        row = profiler.rows()[0]
+        assert (row['calls'], row['hits'], row['worst_ms']) == (3, 1, 2.0)
+        profiler.record('dead', 'x', 0.0, False)
+        assert "Never matched (1): dead" in profiler.report()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = profiler.write_report(Path(temp_dir) / "rules.json")
+            with open(path) as f:
+                assert [row['rule'] for row in json.load(f)['rules']] == ['index_number.0', 'dead']
+    print("  ✓ Report and merge")
+
+
+def test_forked_worker_starts_empty():
+    """A forked worker doesn't carry the parent's counters (they'd be merged twice)"""
+    with profiling() as profiler:
+        profiler.record('parent', 'x', 0.0, True)
+        with multiprocessing.get_context('fork').Pool(1) as pool:
+            assert pool.apply(_worker_stats) == 0
+        assert len(profiler.stats) == 1
+    print("  ✓ Forked worker starts empty")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Rule Profiler Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_off_by_default,
+        test_sets_and_searches,
+        test_keyword_scan_latency,
+        test_report_and_merge,
+        test_forked_worker_starts_empty,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for the rules file and rule registry
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+import file_number_patterns
+import keyword_scanner
+import rule_registry
+from rule_registry import DEFAULT_RULES_PATH, RuleRegistry, RulesError, compile_rules
+
+
+def edit_rules(path: Path, change):
+    """Rewrite a rules file and move its mtime on, as an editor save would"""
+    with open(path) as f:
+        data = json.load(f)
+    change(data)
+    with open(path, 'w') as f:
+        json.dump(data, f)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_shipped_rules():
+    """The shipped rules file compiles and backs the pattern and keyword modules"""
+    rules = rule_registry.current()
+    assert rules.version == rule_registry.RULES_VERSION
+    assert file_number_patterns.LETTER is rules.pattern_sets['letter']
+    assert file_number_patterns.PATTERN_SETS is rules.pattern_sets
+    assert keyword_scanner.HIGH_PRIORITY_TERMS is rules.keyword_tables['high_priority']
+    assert keyword_scanner.KEYWORDS is rules.keywords
+    assert "superior court" in rules.keywords.keywords
+    try:
+        file_number_patterns.NOT_A_SET
+        assert False, "expected AttributeError"
+    except AttributeError:
+        pass
+    print("  ✓ Shipped rules")
+
+
+def test_corrections_and_routing():
+    """Correction tables apply first-match or in turn; routing has a default and an urgent queue"""
+    rules = rule_registry.current()
+    assert rules.corrections['is_file_number'].apply("12400290") == "L2400290"
+    assert rules.corrections['is_file_number'].apply("L240029") == "L2400290"
+    # 1 -> L, then the truncated L number gets its trailing 0
+    assert rules.corrections['is_split'].apply("1240029") == "L2400290"
+    assert rules.corrections['is_split'].apply("YL234567") == "Y1234567"
+    assert rules.corrections['letter'].apply("12501375") == "L2501375"
+    assert rules.routing['MOTION'] == 'LITIGATION_DEPT'
+    assert (rules.default_department, rules.urgent_department) == ('GENERAL_PROCESSING', 'URGENT_PROCESSING')
+    print("  ✓ Corrections and routing")
+
+
+def test_hot_reload():
+    """An edited file is picked up; unchanged sets keep their compiled objects"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "rules.json"
+        shutil.copy(DEFAULT_RULES_PATH, path)
+        registry = RuleRegistry(path, check_interval=0)
+        before = registry.rules
+        assert registry.rules is before
+
+        edit_rules(path, lambda data: data['routing']['departments'].update(MOTION='MOTIONS_DEPT'))
+        after = registry.rules
+        assert after is not before and after.routing['MOTION'] == 'MOTIONS_DEPT'
+        assert after.pattern_sets['letter'] is before.pattern_sets['letter']
+        assert after.keywords is before.keywords
+
+        edit_rules(path, lambda data: data['keywords']['high_priority']['terms'].append('asap'))
+        assert registry.rules.keywords.scan("Reply ASAP").has('asap')
+    print("  ✓ Hot reload")
+
+
+def test_bad_edit_keeps_rules():
+    """A file that doesn't compile is reported and the previous rules stay in use"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "rules.json"
+        shutil.copy(DEFAULT_RULES_PATH, path)
+        registry = RuleRegistry(path, check_interval=0)
+        before = registry.rules
+
+        edit_rules(path, lambda data: data['pattern_sets']['letter']['patterns'].append(['broken', r'File (No']))
+        assert registry.rules is before
+        assert registry.reload(force=True) is False
+
+        with open(DEFAULT_RULES_PATH) as f:
+            data = json.load(f)
+        for change in [lambda d: d.update(version=99), lambda d: d.pop('routing'),
+                       lambda d: d['ocr_corrections'].pop('is_split'),
+                       lambda d: d['ocr_corrections']['letter'].update(mode='last'),
+                       lambda d: d['pattern_sets']['letter'].update(patterns=[['no_group', 'File No']]),
+                       lambda d: d['pattern_sets']['letter'].update(patterns=[['two_groups', r'(File|Ref) No (\w+)']])]:
+            broken = json.loads(json.dumps(data))
+            change(broken)
+            try:
+                compile_rules(broken)
+                assert False, "expected RulesError"
+            except RulesError:
+                pass
+    print("  ✓ Bad edit keeps rules")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Rule Registry Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_shipped_rules,
+        test_corrections_and_routing,
+        test_hot_reload,
+        test_bad_edit_keeps_rules,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent SQLite text/OCR cache
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add current directory to path
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from document_context import DocumentContext
+from page_regions import REGIONS
+from text_cache import TextCache, file_hash
+from test_document_context import create_test_pdf
+
+
+def test_get_put_and_lru_eviction():
+    """Least recently used entries go first once the size limit is hit"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = TextCache(os.path.join(temp_dir, "cache.sqlite"), max_bytes=250)
+
+        cache.put("hash", 0, "cfg", "a" * 100)
+        time.sleep(0.01)
+        cache.put("hash", 1, "cfg", "b" * 100)
+        time.sleep(0.01)
+        assert cache.get("hash", 0, "cfg") == "a" * 100  # page 0 is now most recent
+        assert cache.get("hash", 0, "other-cfg") is None
+
+        cache.put("hash", 2, "cfg", "c" * 100)
+        assert cache.get("hash", 1, "cfg") is None
+        assert cache.get("hash", 0, "cfg") == "a" * 100
+        assert cache.get("hash", 2, "cfg") == "c" * 100
+        assert cache.stats()['bytes'] <= 250
+
+        assert cache.get_or_compute("hash", 3, "cfg", lambda: None) is None
+        assert cache.get("hash", 3, "cfg") is None  # failures aren't stored
+        cache.close()
+        print("  ✓ Get/put and LRU eviction")
+
+
+def test_hits_touch_in_batches():
+    """A hit doesn't write; last_used times are written in one batch"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = TextCache(os.path.join(temp_dir, "cache.sqlite"))
+        cache.put("hash", 0, "cfg", "text")
+
+        def last_used():
+            return cache.conn.execute("SELECT last_used FROM page_text").fetchone()[0]
+
+        stored = last_used()
+        time.sleep(0.01)
+        changes = cache.conn.total_changes
+        assert cache.get("hash", 0, "cfg") == "text"
+        assert cache.conn.total_changes == changes and last_used() == stored
+        cache.flush()
+        assert last_used() > stored
+        cache.close()
+        print("  ✓ Hits touch in batches")
+
+
+def test_context_reads_through_cache():
+    """A second context on the same file is served entirely from the cache"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = create_test_pdf(os.path.join(temp_dir, "cached.pdf"))
+        cache = TextCache(os.path.join(temp_dir, "cache.sqlite"))
+
+        with DocumentContext(pdf_path, cache=cache) as context:
+            expected = [context.get_page_text(i) for i in range(context.page_count)]
+            region = context.get_region_text(0, REGIONS['top_third'])
+            context.set_ocr_text(0, "ocr text", config="test-ocr")
+
+        with DocumentContext(pdf_path, cache=cache) as context:
+            assert context.page_count == len(expected)
+            assert [context.get_page_text(i) for i in range(len(expected))] == expected
+            assert context.get_region_text(0, REGIONS['top_third']) == region
+            assert context.get_ocr_text(0, config="test-ocr") == "ocr text"
+            # Nothing had to be parsed
+            assert context._reader is None and context._plumber is None
+
+        assert cache.stats()['entries'] == len(expected) + 3  # pages, region, OCR, page count
+        assert file_hash(pdf_path) == context.pdf_hash
+        cache.close()
+        print("  ✓ DocumentContext reads through the cache")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Text Cache Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_get_put_and_lru_eviction,
+        test_hits_touch_in_batches,
+        test_context_reads_through_cache,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"  ✗ {test.__name__} failed: {e}")
+
+    print(f"\nTotal: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
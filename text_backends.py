@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Text Extraction Backends
+Interchangeable page text extractors used by DocumentContext
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
+
+DEFAULT_BACKEND = "pdfplumber"
+
+
+class TextBackend(ABC):
+    """Extracts the text layer of one page from an open DocumentContext"""
+
+    name = ""
+
+    def version(self) -> str:
+        """Library version; extraction output can change between releases"""
+        return ""
+
+    def cache_config(self) -> str:
+        """Config string for the persistent text cache"""
+        return f"{self.name}-{self.version()}"
+
+    @abstractmethod
+    def extract_page(self, context, page_num: int) -> str:
+        """
+        Extract text for one page
+
+        Args:
+            context: DocumentContext holding the parsed handles
+            page_num: Page number (0-indexed)
+
+        Returns:
+            Page text ("" if the page has no text layer)
+        """
+
+    def extract_regions(self, context, page_num: int,
+                        bboxes: List[Tuple[float, float, float, float]]) -> List[str]:
+        """
+        Extract text inside parts of a page
+
+        Backends that can't crop return the full page text, which is always a
+        safe superset for pattern matching.
+
+        Args:
+            context: DocumentContext holding the parsed handles
+            page_num: Page number (0-indexed)
+            bboxes: (x0, top, x1, bottom) boxes as fractions of the page size
+
+        Returns:
+            Text for each region, in order
+        """
+        return [context.get_page_text(page_num, self.name)] * len(bboxes)
+
+
+class PdfplumberBackend(TextBackend):
+    """pdfplumber layout-aware extraction (most faithful, slowest)"""
+
+    name = "pdfplumber"
+
+    def version(self) -> str:
+        import pdfplumber
+        return pdfplumber.__version__
+
+    def extract_page(self, context, page_num: int) -> str:
+        page = context.plumber.pages[page_num]
+        text = page.extract_text() or ""
+        # Drop pdfplumber's cached layout objects, we only keep the text
+        page.close()
+        return text
+
+    def extract_regions(self, context, page_num: int, bboxes) -> List[str]:
+        page = context.plumber.pages[page_num]
+        texts = []
+        for x0, top, x1, bottom in bboxes:
+            crop = page.crop((x0 * page.width, top * page.height,
+                              x1 * page.width, bottom * page.height))
+            texts.append(crop.extract_text() or "")
+        # Parsing the page is nearly all of pdfplumber's cost, so keep the full
+        # text from the same parse and release the page instead of parsing it
+        # again when get_page_text is called
+        context.set_page_text(page_num, page.extract_text() or "", self.name)
+        page.close()
+        return texts
+
+
+class PyPDF2Backend(TextBackend):
+    """PyPDF2 content-stream extraction (no cropping, regions read the full page)"""
+
+    name = "pypdf2"
+
+    def version(self) -> str:
+        import PyPDF2
+        return PyPDF2.__version__
+
+    def extract_page(self, context, page_num: int) -> str:
+        return context.reader.pages[page_num].extract_text() or ""
+
+
+class PyMuPDFBackend(TextBackend):
+    """PyMuPDF (fitz) extraction - fastest of the three"""
+
+    name = "pymupdf"
+
+    def version(self) -> str:
+        import fitz
+        return fitz.VersionBind
+
+    def extract_page(self, context, page_num: int) -> str:
+        return context.fitz_doc[page_num].get_text() or ""
+
+    def extract_regions(self, context, page_num: int, bboxes) -> List[str]:
+        import fitz
+        page = context.fitz_doc[page_num]
+        rect = page.rect
+        texts = []
+        for x0, top, x1, bottom in bboxes:
+            clip = fitz.Rect(x0 * rect.width, top * rect.height,
+                             x1 * rect.width, bottom * rect.height)
+            # Regions are given in display orientation, text lives in unrotated space
+            clip = clip * page.derotation_matrix
+            texts.append(page.get_text(clip=clip) or "")
+        return texts
+
+
+BACKENDS: Dict[str, TextBackend] = {
+    backend.name: backend
+    for backend in (PdfplumberBackend(), PyPDF2Backend(), PyMuPDFBackend())
+}
+
+
+def available_backends() -> List[str]:
+    """Names accepted by get_backend and the --text-backend CLI flags"""
+    return list(BACKENDS)
+
+
+def get_backend(name: str) -> TextBackend:
+    """Look up a backend by name"""
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown text extraction backend: {name} "
+                         f"(choose from {', '.join(BACKENDS)})")
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Persistent Text/OCR Cache
+SQLite store of extracted page text keyed by PDF content hash, page, extractor
+config and region, so repeat runs on unchanged inputs skip extraction and OCR
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence
+
+from ocr_engines import get_engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "virtual_mailroom" / "text_cache.sqlite"
+DEFAULT_MAX_MB = 512
+
+# Cache hits whose last_used update is written in one batch
+TOUCH_BATCH = 256
+
+
+def file_hash(path) -> str:
+    """SHA-256 of a file's bytes, memoized while the file is unchanged"""
+    stat = os.stat(path)
+    return _hash_file(str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=256)
+def _hash_file(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def region_key(bbox: Optional[Sequence[float]]) -> str:
+    """Stable string for a fractional (x0, top, x1, bottom) region"""
+    if not bbox:
+        return ""
+    return ",".join(f"{value:.4f}" for value in bbox)
+
+
+def ocr_config(*parts, engine: Optional[str] = None) -> str:
+    """
+    Build an OCR cache config string from the settings that affect output
+
+    Args:
+        parts: Rendering and Tesseract settings
+        engine: OCR engine name (see ocr_engines); the engine and its
+                Tesseract version lead the string
+    """
+    return ":".join([get_engine(engine).cache_config()] + [str(part) for part in parts])
+
+
+class TextCache:
+    """Content-addressed page text cache with size-based LRU eviction"""
+
+    def __init__(self, path=None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            path: SQLite file (default ~/.cache/virtual_mailroom/text_cache.sqlite)
+            max_bytes: Evict least recently used entries above this total size
+        """
+        self.path = Path(path or DEFAULT_CACHE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes if max_bytes is not None else DEFAULT_MAX_MB * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        # key -> last hit time, not yet written (see flush)
+        self._touched: Dict[tuple, float] = {}
+
+        # Autocommit + WAL keeps each put cheap and lets several processes share the file
+        self.conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS page_text (
+                pdf_hash TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                config TEXT NOT NULL,
+                region TEXT NOT NULL,
+                text TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (pdf_hash, page, config, region)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON page_text (last_used)")
+        # Running size estimate; re-read from the table before evicting since
+        # other processes may be writing to the same file
+        self._approx_bytes = self.total_bytes()
+
+    def get(self, pdf_hash: str, page: int, config: str, region: str = "") -> Optional[str]:
+        """Return cached text, or None on a miss"""
+        key = (pdf_hash, page, config, region)
+        row = self.conn.execute(
+            "SELECT text FROM page_text WHERE pdf_hash=? AND page=? AND config=? AND region=?", key
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Reads stay read-only; recency is written in batches
+        self._touched[key] = time.time()
+        if len(self._touched) >= TOUCH_BATCH:
+            self.flush()
+        return row[0]
+
+    def flush(self):
+        """Write the last_used times of the hits since the last flush"""
+        if not self._touched:
+            return
+        touched, self._touched = self._touched, {}
+        self.conn.executemany(
+            "UPDATE page_text SET last_used=? WHERE pdf_hash=? AND page=? AND config=? AND region=?",
+            [(used,) + key for key, used in touched.items()]
+        )
+
+    def put(self, pdf_hash: str, page: int, config: str, text: str, region: str = ""):
+        """Store text for a page, evicting old entries if the cache is full"""
+        size = len(text.encode('utf-8'))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO page_text VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (pdf_hash, page, config, region, text, size, time.time())
+        )
+        self._approx_bytes += size
+        if self._approx_bytes > self.max_bytes:
+            self.evict()
+
+    def get_or_compute(self, pdf_hash: str, page: int, config: str,
+                       compute: Callable[[], Optional[str]], region: str = "") -> Optional[str]:
+        """Return cached text, computing and storing it on a miss
+
+        compute may return None to signal a failure; nothing is stored then,
+        so errors (e.g. a missing tesseract binary) aren't cached.
+        """
+        text = self.get(pdf_hash, page, config, region)
+        if text is None:
+            text = compute()
+            if text is not None:
+                self.put(pdf_hash, page, config, text, region)
+        return text
+
+    def total_bytes(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM page_text").fetchone()[0]
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        self.flush()
+        self._approx_bytes = self.total_bytes()
+        excess = self._approx_bytes - self.max_bytes
+        if excess <= 0:
+            return
+
+        rows = self.conn.execute(
+            "SELECT rowid, size FROM page_text ORDER BY last_used"
+        ).fetchall()
+        doomed = []
+        for rowid, size in rows:
+            if excess <= 0:
+                break
+            doomed.append((rowid,))
+            excess -= size
+        self.conn.executemany("DELETE FROM page_text WHERE rowid=?", doomed)
+        self._approx_bytes = self.total_bytes()
+        logger.debug(f"Text cache evicted {len(doomed)} entries")
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count, total size and hit/miss counters for this session"""
+        entries = self.conn.execute("SELECT COUNT(*) FROM page_text").fetchone()[0]
+        return {
+            'entries': entries,
+            'bytes': self.total_bytes(),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    def clear(self):
+        self._touched = {}
+        self.conn.execute("DELETE FROM page_text")
+        self._approx_bytes = 0
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+_default_cache = None
+_default_cache_pid = None
+
+
+def get_default_cache() -> Optional[TextCache]:
+    """
+    Shared cache for this process, configured from the environment
+
+    MAILROOM_CACHE_PATH overrides the SQLite file, MAILROOM_CACHE_MAX_MB the
+    size limit, and MAILROOM_CACHE=0 disables caching (returns None).
+    """
+    global _default_cache, _default_cache_pid
+    if os.environ.get('MAILROOM_CACHE', '1') == '0':
+        return None
+    # SQLite connections must not cross fork(), so worker processes open their own
+    if _default_cache is None or _default_cache_pid != os.getpid():
+        _default_cache_pid = os.getpid()
+        try:
+            max_mb = int(os.environ.get('MAILROOM_CACHE_MAX_MB', DEFAULT_MAX_MB))
+            _default_cache = TextCache(os.environ.get('MAILROOM_CACHE_PATH'), max_mb * 1024 * 1024)
+            atexit.register(_default_cache.flush)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Text cache unavailable, continuing without it: {e}")
+            return None
+    return _default_cache
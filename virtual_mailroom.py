@@ -11,8 +11,10 @@ from typing import Dict, List, Optional, Tuple
 import argparse
 
 # PDF processing
-from PyPDF2 import PdfReader, PdfWriter
-import pdfplumber
+import file_number_patterns
+import rule_profiler
+from document_context import DocumentContext
+from split_writer import write_pages
 
 # For local LLM approach
 import torch
@@ -174,22 +176,15 @@ class HybridPDFSplitter:
             'document_type': 'REGF'  # Default
         }
         
-        # File number patterns
-        file_patterns = [
-            r'Our File Number:\s*([A-Z]{1,2}\d{1,7}|\d{1,8})',
-            r'File #:\s*([A-Z]{1,2}\d{1,7}|\d{1,8})',
-            r'Case Number:\s*([A-Z]{1,2}\d{1,7}|\d{1,8})'
-        ]
+        # File number patterns (see file_number_patterns.HYBRID)
+        candidates = file_number_patterns.HYBRID.scan(text)
+        if candidates:
+            result['file_number'] = candidates[0].value.strip()
         
-        for pattern in file_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                result['file_number'] = match.group(1).strip()
-                break
-        
-        # Debtor name
-        name_pattern = r'To:\s*([^\n]+?)(?:\n|$|(?=\s{2,}))'
-        match = re.search(name_pattern, text, re.IGNORECASE)
+        # Debtor name: the rest of the line, up to a run of whitespace (no
+        # lookahead, so it runs on RE2 too; see regex_engine)
+        name_pattern = r'To:\s*([^\n]+?)(?:\n|\s{2}|$)'
+        match = rule_profiler.search('hybrid_debtor', name_pattern, text, re.IGNORECASE | re.MULTILINE)
         if match:
             result['debtor_name'] = re.sub(r'\s+', ' ', match.group(1).strip())
         
@@ -219,12 +214,14 @@ class HybridPDFSplitter:
         """
         Path(output_dir).mkdir(parents=True, exist_ok=True)
         
+        # One parse for the whole run; page text is also cached across runs
+        context = DocumentContext(input_pdf_path, backend="pdfplumber")
         try:
-            reader = PdfReader(input_pdf_path)
-            total_pages = len(reader.pages)
+            total_pages = context.page_count
             print(f"Total pages in PDF: {total_pages}")
         except Exception as e:
             print(f"Error opening PDF: {e}")
+            context.close()
             return []
         
         processed_files = []
@@ -232,10 +229,7 @@ class HybridPDFSplitter:
         # If using AI and no pages_per_doc specified, detect boundaries
         if self.use_ai and self.ai and pages_per_doc is None:
             print("Using AI to detect document boundaries...")
-            pages_text = []
-            for i in range(total_pages):
-                with pdfplumber.open(input_pdf_path) as pdf:
-                    pages_text.append(pdf.pages[i].extract_text() or "")
+            pages_text = [context.get_page_text(i) for i in range(total_pages)]
             
             boundaries = self.ai.find_document_boundaries(pages_text)
             print(f"Detected {len(boundaries)} documents")
@@ -250,8 +244,7 @@ class HybridPDFSplitter:
             print(f"\nProcessing document {doc_idx + 1} (pages {start_page + 1}-{end_page + 1})")
             
             # Extract text from first page for metadata
-            with pdfplumber.open(input_pdf_path) as pdf:
-                text = pdf.pages[start_page].extract_text() or ""
+            text = context.get_page_text(start_page)
             
             # Extract data
             data = self.extract_data(text)
@@ -270,12 +263,7 @@ class HybridPDFSplitter:
             output_path = os.path.join(output_dir, output_filename)
             
             # Write PDF
-            writer = PdfWriter()
-            for page_num in range(start_page, end_page + 1):
-                writer.add_page(reader.pages[page_num])
-            
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
+            write_pages(context.fitz_doc, range(start_page, end_page + 1), output_path)
             
             processed_files.append({
                 'file_number': file_number,
@@ -290,6 +278,8 @@ class HybridPDFSplitter:
             print(f"  Debtor Name: {data.get('debtor_name', 'Not found')}")
             print(f"  Document Type: {document_type}")
         
+        context.close()
+        
         # Summary
         print("\n" + "="*50)
         print("PROCESSING SUMMARY")
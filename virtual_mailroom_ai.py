@@ -21,6 +21,9 @@ from transformers import (
     pipeline
 )
 
+import regex_engine
+import rule_registry
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -211,25 +214,15 @@ Priority (HIGH/NORMAL/LOW):"""
         if not self.pipe:
             return "GENERAL"
         
-        routing_rules = {
-            'REGF': 'FILING_DEPT',
-            'AFF': 'LEGAL_DEPT',
-            'ICD': 'CASE_MANAGEMENT',
-            'NOTICE': 'COMPLIANCE_DEPT',
-            'SUMMONS': 'LEGAL_DEPT',
-            'MOTION': 'LITIGATION_DEPT',
-            'JUDGMENT': 'COLLECTIONS_DEPT',
-            'DISCOVERY': 'LITIGATION_DEPT',
-            'SETTLEMENT': 'SETTLEMENT_DEPT'
-        }
-        
-        if metadata.document_type in routing_rules:
-            return routing_rules[metadata.document_type]
+        # Department table shared with the ChatPS mailroom (see rule_registry)
+        rules = rule_registry.current()
+        if metadata.document_type in rules.routing:
+            return rules.routing[metadata.document_type]
         
         if metadata.priority == "HIGH":
-            return "URGENT_PROCESSING"
+            return rules.urgent_department
         
-        return "GENERAL_PROCESSING"
+        return rules.default_department
     
     def generate_summary(self, text: str) -> str:
         """Generate a brief summary of the document"""
@@ -329,12 +322,12 @@ class VirtualMailroom:
         import re
         
         file_pattern = r'(?:Our File Number|File #|Case Number):\s*([A-Z]{0,2}\d{1,8})'
-        match = re.search(file_pattern, text, re.IGNORECASE)
+        match = regex_engine.search(file_pattern, text, re.IGNORECASE)
         if match:
             metadata.file_number = match.group(1).strip().upper()
         
         debtor_pattern = r'To:\s*([^\n]+)'
-        match = re.search(debtor_pattern, text, re.IGNORECASE)
+        match = regex_engine.search(debtor_pattern, text, re.IGNORECASE)
         if match:
             metadata.debtor_name = match.group(1).strip()
         